@@ -0,0 +1,59 @@
+"""Bytes-per-second-of-speech and encode CPU cost for each audio transport format.
+
+Encodes a synthetic voiced signal (harmonics with a syllable-rate envelope) at the
+XTTS sample rate, sentence by sentence like the socket handlers do. Opus and MP3
+need pydub plus a local ffmpeg and are skipped when it is missing.
+
+    python Test/Benchmarks/bench_audio_transport.py --seconds 3 --sentences 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from audio_transport import FORMATS, AudioEncoder, available_formats  # noqa: E402
+
+
+def speech_like(seconds: float, sample_rate: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 120 + 20 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    noise = 0.02 * rng.standard_normal(len(t))
+    return (0.3 * voiced * envelope + noise).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0, help="speech per sentence")
+    parser.add_argument("--sentences", type=int, default=20)
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    args = parser.parse_args()
+
+    clips = [speech_like(args.seconds, args.sample_rate, seed) for seed in range(args.sentences)]
+    speech_seconds = args.seconds * args.sentences
+    available = available_formats()
+
+    for fmt in FORMATS:
+        if fmt not in available:
+            print(f"{fmt:>8}: skipped (no local encoder)")
+            continue
+        encoder = AudioEncoder(fmt, args.sample_rate)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        sizes = [len(encoder.encode(clip)) for clip in clips]
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        # External encoders run in an ffmpeg child process, so wall time is the fairer cost there
+        print(f"{fmt:>8}: {sum(sizes) / speech_seconds / 1024:7.1f} KiB/s of speech  "
+              f"encode {wall / speech_seconds * 1000:6.1f} ms wall / {cpu / speech_seconds * 1000:6.1f} ms "
+              f"in-process CPU per second of speech")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Boot-time benchmark for the profile/system-prompt cache.
+
+Each run happens in a fresh interpreter so it includes the PyPDF2 import and PDF
+parsing that a real worker boot or serverless cold start pays.
+
+    python Test/Benchmarks/bench_boot.py --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+CHILD = r"""
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+from profile_cache import load_profile
+
+def build(name, summary, resume, linkedin):
+    return f"You are {{name}}.\n{{summary}}\n{{resume}}\n{{linkedin}}"
+
+me = {me!r}
+profile, hit = load_profile(me + "/linkedin.pdf", me + "/Jai_Goswami_Resume.pdf", me + "/summary.txt",
+                            "Jai Goswami", build, cache_dir={cache_dir!r}, use_cache={use_cache!r})
+print(json.dumps({{"ms": (time.perf_counter() - start) * 1000, "hit": hit}}))
+"""
+
+
+def run_once(cache_dir: str, use_cache: bool) -> dict:
+    code = CHILD.format(src=str(SRC_DIR), me=str(SRC_DIR / "Me"), cache_dir=cache_dir, use_cache=use_cache)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        uncached = [run_once(cache_dir, False)["ms"] for _ in range(args.runs)]
+        run_once(cache_dir, True)  # prime the cache
+        cached = []
+        for _ in range(args.runs):
+            result = run_once(cache_dir, True)
+            assert result["hit"], "expected a warm cache"
+            cached.append(result["ms"])
+
+    for label, samples in (("no cache", uncached), ("warm cache", cached)):
+        print(f"{label:>10}: median {statistics.median(samples):8.1f} ms  "
+              f"min {min(samples):8.1f} ms  max {max(samples):8.1f} ms")
+    print(f"speedup: {statistics.median(uncached) / statistics.median(cached):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Per-sentence vs adaptive TTS chunking, for the XTTS and ElevenLabs profiles.
+
+An LLM stream (`--tokens-per-second`) feeds the segmenter; one fake TTS worker
+takes `overhead + rtf x audio` per call and a simulated client plays chunks back to
+back. Reports time to first audio, TTS calls, total playback stalls and when
+playback ends. `--time-scale` compresses wall time (durations are reported
+unscaled).
+
+    python Test/Benchmarks/bench_chunk_policy.py --time-scale 4
+"""
+import argparse
+import dataclasses
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from chunk_policy import ELEVENLABS_PROFILE, XTTS_PROFILE, AdaptiveChunker, RTFEstimator  # noqa: E402
+from sentence_buffer import SentenceBuffer  # noqa: E402
+from tts_pipeline import TTSWorkerPool  # noqa: E402
+
+ANSWER = (
+    "Sure, I'd be happy to walk you through my background, starting with how I got into data "
+    "engineering and where it led. I started out in data engineering, building batch pipelines "
+    "for a retail analytics team. Then I moved into machine learning, mostly forecasting and NLP. "
+    "Right now I work as a Data Scientist. I build GenAI pipelines in Python. "
+    "That includes speech-to-text, summarization and agentic workflows. Yes. "
+    "I also mentor two junior engineers. Outside work, I'm training for a marathon. "
+    "Feel free to ask about any project in more detail!"
+)
+
+
+def run(policy, profile, rtf, tokens_per_second, scale):
+    # Everything runs `scale` times faster than reality
+    scaled = dataclasses.replace(profile, overhead=profile.overhead / scale,
+                                 chars_per_second=profile.chars_per_second * scale)
+    estimator = RTFEstimator(scaled)
+    calls = []
+
+    def synthesize(text):
+        audio = len(text) / scaled.chars_per_second
+        synth = scaled.overhead + rtf * audio
+        time.sleep(synth)
+        estimator.observe(len(text), synth, audio)
+        calls.append(text)
+        return np.zeros(max(1, int(audio * 10000)))
+
+    chunker = AdaptiveChunker(estimator) if policy == "adaptive" else None
+    segmenter = chunker or SentenceBuffer()
+    lock = threading.Lock()
+    playback = {"first": None, "cursor": 0.0, "stalls": 0.0}
+    start = time.perf_counter()
+
+    def emit_audio(seq, text, audio, part=0):
+        seconds = len(audio) / 10000
+        now = time.perf_counter() - start
+        with lock:
+            if playback["first"] is None:
+                playback["first"] = playback["cursor"] = now
+            elif now > playback["cursor"]:
+                playback["stalls"] += now - playback["cursor"]
+                playback["cursor"] = now
+            playback["cursor"] += seconds
+        if chunker:
+            chunker.on_audio(seconds, len(text) if part == 0 else 0)
+
+    stream = TTSWorkerPool(synthesize, workers=1).open_stream(emit_audio)
+    token_delay = 1 / (tokens_per_second * scale)
+    for i in range(0, len(ANSWER), 4):
+        time.sleep(token_delay)
+        for chunk in segmenter.add_text(ANSWER[i:i + 4]):
+            stream.submit(chunk)
+    remaining = segmenter.flush()
+    if remaining:
+        stream.submit(remaining)
+    stream.finish()
+    return {
+        "ttfa": playback["first"] * scale,
+        "calls": len(calls),
+        "stalls": playback["stalls"] * scale,
+        "end": playback["cursor"] * scale,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens-per-second", type=float, default=40)
+    parser.add_argument("--xtts-rtf", type=float, default=0.6)
+    parser.add_argument("--elevenlabs-rtf", type=float, default=0.15)
+    parser.add_argument("--time-scale", type=float, default=4)
+    args = parser.parse_args()
+
+    for profile, rtf in ((XTTS_PROFILE, args.xtts_rtf), (ELEVENLABS_PROFILE, args.elevenlabs_rtf)):
+        print(f"{profile.name} (rtf {rtf}, overhead {profile.overhead}s)")
+        for policy in ("sentence", "adaptive"):
+            r = run(policy, profile, rtf, args.tokens_per_second, args.time_scale)
+            print(f"  {policy:9s} first audio {r['ttfa']:5.2f}s  calls {r['calls']:2d}  "
+                  f"stalls {r['stalls']:5.2f}s  playback ends {r['end']:5.1f}s")
+
+
+if __name__ == "__main__":
+    main()
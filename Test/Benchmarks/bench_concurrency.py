@@ -0,0 +1,130 @@
+"""Concurrency benchmark: Flask/gunicorn (sync) vs the asyncio serving mode.
+
+Starts the fake OpenAI server, boots the app in the requested mode against it,
+then fires N simultaneous /chat requests and reports time-to-first-token and
+total stream time per request.
+
+    python Test/Benchmarks/bench_concurrency.py --clients 200 --mode flask asgi
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_openai import start_server  # noqa: E402
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+SERVER_COMMANDS = {
+    # Mirrors the Render start command
+    "flask": ["gunicorn", "-w", "1", "-b", "127.0.0.1:{port}", "--timeout", "120", "app:app"],
+    "asgi": ["uvicorn", "asgi_app:app", "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning"],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def one_chat(port: int, results: list, start_barrier: threading.Barrier):
+    start_barrier.wait()
+    started = time.perf_counter()
+    ttft = None
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+        conn.request("POST", "/chat", body=json.dumps({"message": "Tell me about your career"}),
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        for line in response:
+            if ttft is None and b"text_chunk" in line:
+                ttft = time.perf_counter() - started
+        conn.close()
+        results.append({"ok": True, "ttft": ttft, "total": time.perf_counter() - started})
+    except Exception as e:
+        results.append({"ok": False, "error": str(e), "total": time.perf_counter() - started})
+
+
+def pct(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else float("nan")
+
+
+def run_mode(mode: str, clients: int, openai_port: int) -> dict:
+    port = free_port()
+    # Every client asks the same question, so the answer cache must be off to measure streaming
+    env = dict(os.environ, OPENAI_API_KEY="sk-fake", OPENAI_BASE_URL=f"http://127.0.0.1:{openai_port}/v1",
+               ANSWER_CACHE_SIZE="0")
+    command = [part.format(port=port) for part in SERVER_COMMANDS[mode]]
+    server = subprocess.Popen(command, cwd=SRC_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        results = []
+        barrier = threading.Barrier(clients)
+        threads = [threading.Thread(target=one_chat, args=(port, results, barrier)) for _ in range(clients)]
+        wall_start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - wall_start
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    ok = [r for r in results if r["ok"]]
+    ttfts = [r["ttft"] for r in ok if r["ttft"] is not None]
+    totals = [r["total"] for r in ok]
+    return {
+        "mode": mode,
+        "clients": clients,
+        "ok": len(ok),
+        "failed": len(results) - len(ok),
+        "wall_s": wall,
+        "streams_per_s": len(ok) / wall if wall else 0.0,
+        "ttft_p50_s": statistics.median(ttfts) if ttfts else float("nan"),
+        "ttft_p95_s": pct(ttfts, 0.95),
+        "total_p95_s": pct(totals, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--tokens", type=int, default=80)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--mode", nargs="+", default=["flask", "asgi"], choices=sorted(SERVER_COMMANDS))
+    args = parser.parse_args()
+
+    fake = start_server(tokens=args.tokens, token_delay=args.token_delay)
+    for mode in args.mode:
+        r = run_mode(mode, args.clients, fake.server_port)
+        print(f"{r['mode']:>6}: {r['ok']}/{r['clients']} ok in {r['wall_s']:.1f}s "
+              f"({r['streams_per_s']:.1f} streams/s)  TTFT p50 {r['ttft_p50_s']:.2f}s "
+              f"p95 {r['ttft_p95_s']:.2f}s  total p95 {r['total_p95_s']:.2f}s")
+    fake.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Sequential vs concurrent ElevenLabs synthesis for one answer, against fake_elevenlabs.py.
+
+All sentences of an answer are submitted at once (as a fast LLM would produce
+them) to a TTSWorkerPool over a pooled ElevenLabsStreamer. With one worker every
+sentence waits for the previous one; with several, later sentences are
+synthesized while earlier ones stream and the pool re-orders blocks by seq. The
+fake server answers every `--fail-every`th request with 503 and enforces
+`--provider-limit` concurrent requests with 429, so retries and the concurrency
+cap are exercised. Checks that blocks arrive in order and that no audio is lost.
+
+    python Test/Benchmarks/bench_elevenlabs_concurrency.py --sentences 12 --fail-every 5
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from elevenlabs_stream import ElevenLabsStreamer  # noqa: E402
+from fake_elevenlabs import start_server  # noqa: E402
+from tts_pipeline import TTSWorkerPool  # noqa: E402
+
+SENTENCES = [
+    "I started out in data engineering, building batch pipelines for a retail analytics team.",
+    "Then I moved into machine learning, mostly forecasting and NLP.",
+    "Right now I work as a Data Scientist.",
+    "I build GenAI pipelines in Python, including speech-to-text and summarization.",
+]
+
+
+def run(server, texts, workers, cap, retries):
+    streamer = ElevenLabsStreamer("test", "voice", "eleven_multilingual_v2", "mp3_44100_128",
+                                  base_url=f"http://127.0.0.1:{server.server_port}",
+                                  max_connections=cap, max_concurrent=cap, retries=retries, backoff=0.05)
+    emitted = []
+    before = {"requests": server.requests, "failed": server.failed, "rejected": server.rejected}
+
+    def emit_audio(seq, text, audio, part=0):
+        emitted.append((seq, part, len(audio)))
+
+    pool = TTSWorkerPool(streamer.stream, workers=workers, streaming=True)
+    stream = pool.open_stream(emit_audio)
+    for text in texts:
+        stream.submit(text)
+    stats = stream.finish(timeout=120)
+    streamer.close()
+    order = [(seq, part) for seq, part, _ in emitted]
+    return {
+        "ttfa": stats["time_to_first_audio"],
+        "total": stats["total"],
+        "bytes": sum(size for _, _, size in emitted),
+        "ordered": order == sorted(order),
+        "sentences": len({seq for seq, _, _ in emitted}),
+        "requests": server.requests - before["requests"],
+        "failed": server.failed - before["failed"],
+        "rejected": server.rejected - before["rejected"],
+        "retried": streamer.retried,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=12)
+    parser.add_argument("--ttfb", type=float, default=0.3)
+    parser.add_argument("--rtf", type=float, default=0.15)
+    parser.add_argument("--provider-limit", type=int, default=3)
+    parser.add_argument("--fail-every", type=int, default=5)
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = [SENTENCES[i % len(SENTENCES)] for i in range(args.sentences)]
+    server = start_server(ttfb=args.ttfb, rtf=args.rtf, max_concurrent=args.provider_limit,
+                          fail_every=args.fail_every)
+    runs = (
+        ("sequential", 1, 1),
+        ("concurrent", args.provider_limit, args.provider_limit),
+        # More workers than the provider allows: the semaphore keeps requests within the limit
+        ("over-subscribed", args.provider_limit * 2, args.provider_limit),
+    )
+    for label, workers, cap in runs:
+        r = run(server, texts, workers, cap, args.retries)
+        print(f"{label:15s} workers {workers}  first audio {r['ttfa']:5.2f}s  total {r['total']:5.2f}s  "
+              f"sentences {r['sentences']}/{len(texts)}  ordered {r['ordered']}  "
+              f"requests {r['requests']} (503 {r['failed']}, 429 {r['rejected']}, retried {r['retried']})  "
+              f"{r['bytes'] / 1024:.0f} KiB")
+    print(f"peak concurrent requests at the server: {server.peak_active}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
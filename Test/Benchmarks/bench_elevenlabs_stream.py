@@ -0,0 +1,78 @@
+"""Buffered per-request ElevenLabs calls vs pooled streaming, against fake_elevenlabs.py.
+
+"buffered" opens a fresh connection per sentence and waits for the whole MP3 (what
+the SDK `convert` path did); "streaming" reuses one keep-alive client and hands
+over frame-aligned blocks as they arrive. Reports time to the first playable
+block, total time per sentence and TCP connections opened. `--handshake` stands in
+for the TLS setup every new connection pays against the real API.
+
+    python Test/Benchmarks/bench_elevenlabs_stream.py --sentences 8 --handshake 0.15
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from elevenlabs_stream import ElevenLabsStreamer  # noqa: E402
+from fake_elevenlabs import start_server  # noqa: E402
+
+SENTENCES = [
+    "I started out in data engineering, building batch pipelines for a retail analytics team.",
+    "Then I moved into machine learning, mostly forecasting and NLP.",
+    "Right now I work as a Data Scientist, building GenAI pipelines in Python.",
+    "That includes speech-to-text, summarization and agentic workflows.",
+]
+
+
+def buffered(base_url, text):
+    # New client per call: no connection reuse, body read in full
+    with httpx.Client(base_url=base_url, timeout=30) as http:
+        response = http.post("/v1/text-to-speech/voice/stream", params={"output_format": "mp3_44100_128"},
+                             json={"text": text, "model_id": "eleven_multilingual_v2"})
+        response.raise_for_status()
+        audio = response.content
+    return [audio]
+
+
+def measure(blocks_for, texts):
+    first, total, size = [], [], 0
+    for text in texts:
+        start = time.perf_counter()
+        first_block = None
+        for block in blocks_for(text):
+            if first_block is None:
+                first_block = time.perf_counter() - start
+            size += len(block)
+        first.append(first_block)
+        total.append(time.perf_counter() - start)
+    return statistics.median(first), statistics.median(total), size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--ttfb", type=float, default=0.2)
+    parser.add_argument("--rtf", type=float, default=0.15)
+    parser.add_argument("--handshake", type=float, default=0.15, help="seconds per new connection")
+    args = parser.parse_args()
+
+    texts = [SENTENCES[i % len(SENTENCES)] for i in range(args.sentences)]
+    server = start_server(ttfb=args.ttfb, rtf=args.rtf, handshake=args.handshake)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    streamer = ElevenLabsStreamer("test", "voice", "eleven_multilingual_v2", "mp3_44100_128", base_url=base_url)
+
+    for label, blocks_for in (("buffered", lambda t: buffered(base_url, t)), ("streaming", streamer.stream)):
+        before = server.connections
+        first, total, size = measure(blocks_for, texts)
+        print(f"{label:9s} first block {first * 1000:6.0f} ms  per sentence {total * 1000:6.0f} ms  "
+              f"connections {server.connections - before:2d}  {size / 1024:6.0f} KiB")
+    streamer.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""FAQ bank: bundle size and load time, matcher latency, and routing accuracy.
+
+Builds a bundle from src/Me/faq.json offline (answers from fake_openai.py, audio from
+FakeXtts as 16-bit PCM), then routes paraphrases that should hit an FAQ and nearby
+questions that must go to the LLM. Compare against the live path's first token
+(fake OpenAI, `--token-delay`) to see what a hit saves.
+
+    python Test/Benchmarks/bench_faq_bank.py --threshold 0.8
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from faq_bank import FaqBank, build_bank, llm_answerer, load_faq_list  # noqa: E402
+from fake_openai import start_server  # noqa: E402
+from fake_xtts import FakeXtts  # noqa: E402
+
+SHOULD_HIT = [
+    ("who are you", "intro"), ("Who are you??", "intro"), ("tell me about yourself please", "intro"),
+    ("what's an ecameo", "intro"), ("What is your work experience", "career"),
+    ("can you tell me about your career", "career"), ("what's your professional background?", "career"),
+    ("what are your main skills", "skills"), ("whats your tech stack", "skills"),
+    ("What tools and languages do you use", "skills"),
+    ("will AI resumes replace traditional resumes?", "ai_resumes"),
+    ("are ai resumes the future of hiring", "ai_resumes"),
+]
+MUST_MISS = [
+    "who are you working for", "what is your salary", "will AI replace data scientists?",
+    "what skills are you learning next", "tell me about your thesis", "why did you leave your last job",
+    "will AI resumes not replace traditional resumes", "what languages do you speak",
+    "Why is a PDF resume better than an AI resume?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--tokens", type=int, default=80)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    from openai import OpenAI
+
+    server = start_server(tokens=args.tokens, token_delay=0.0)
+    client = OpenAI(base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="fake")
+    xtts = FakeXtts(rtf=0.0)
+    path = Path(tempfile.mkdtemp(prefix="faq_bank_")) / "faq_bank.bin"
+
+    def synthesize(sentence):
+        wav = xtts.inference(sentence, "en", None, None)["wav"]
+        return (wav * 32767).astype(np.int16).tobytes()
+
+    build_bank(load_faq_list(), llm_answerer(client, "gpt-4o-mini", lambda q: "prompt"), path, "prompt",
+               synthesize=synthesize, voice="fake", audio_format="pcm16", sample_rate=24000)
+    server.shutdown()
+
+    start = time.perf_counter()
+    bank = FaqBank.load(path, threshold=args.threshold)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"bundle {path.stat().st_size / 1024:.0f} KB, {len(bank.entries)} entries, load {load_ms:.1f} ms")
+
+    hits = sum(1 for q, faq_id in SHOULD_HIT if (bank.match(q) or {}).get("id") == faq_id)
+    false_hits = [q for q in MUST_MISS if bank.match(q) is not None]
+    print(f"paraphrases routed to the right FAQ: {hits}/{len(SHOULD_HIT)}")
+    print(f"off-FAQ questions wrongly served:     {len(false_hits)}/{len(MUST_MISS)} {false_hits or ''}")
+
+    for label, question in (("exact", "who are you"), ("paraphrase", "whats your tech stack"),
+                            ("miss", "what is your salary")):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            entry = bank.match(question)
+            if entry:
+                for sentence in entry["sentences"]:
+                    bank.audio(sentence)
+        print(f"{label:10} match + audio slices {(time.perf_counter() - start) / args.iterations * 1e6:7.1f} us")
+    print(f"live path first token (fake OpenAI) ~{args.token_delay * 1000:.0f} ms + request overhead, "
+          f"first audio after one sentence of TTS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Prompt history size per turn: last-N-messages vs the token-budgeted SessionMemory.
+
+Replays a conversation whose answers vary from one line to several paragraphs and
+reports the history tokens sent with each request (max and last), plus the cost of
+`add()` per message. Tokens are counted with tiktoken when installed, else ~4
+characters per token.
+
+    python Test/Benchmarks/bench_history.py --turns 40
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+from session_store import SessionMemory, count_tokens  # noqa: E402
+
+SENTENCE = "I built a retrieval pipeline over call transcripts and cut review time by half. "
+
+
+def conversation(turns, seed=0):
+    rng = random.Random(seed)
+    for i in range(turns):
+        question = f"Question {i}: can you tell me about project {i} and what you learned?"
+        yield question, SENTENCE * rng.choice((1, 2, 4, 12, 30))
+
+
+def history_tokens(history):
+    return sum(count_tokens(m["content"]) + 4 for m in history)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--max-pairs", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=1200)
+    parser.add_argument("--summary-tokens", type=int, default=200)
+    args = parser.parse_args()
+
+    legacy, budgeted = [], SessionMemory(max_tokens=args.budget, max_summary_tokens=args.summary_tokens)
+    legacy_sizes, budgeted_sizes, add_seconds = [], [], 0.0
+    for question, answer in conversation(args.turns):
+        legacy_sizes.append(history_tokens(legacy))
+        budgeted_sizes.append(history_tokens(budgeted.get()))
+        legacy = (legacy + [{"role": "user", "content": question},
+                            {"role": "assistant", "content": answer}])[-args.max_pairs * 2:]
+        start = time.perf_counter()
+        budgeted.add("user", question)
+        budgeted.add("assistant", answer)
+        add_seconds += time.perf_counter() - start
+
+    print(f"last {args.max_pairs} pairs    history tokens max {max(legacy_sizes):5d}  last {legacy_sizes[-1]:5d}")
+    print(f"token budget {args.budget}  history tokens max {max(budgeted_sizes):5d}  last {budgeted_sizes[-1]:5d}  "
+          f"(verbatim messages {len(budgeted.messages)}, summary lines {len(budgeted.summary_lines)})")
+    print(f"add(): {add_seconds / (2 * args.turns) * 1e6:.1f} us per message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Serial vs process-pool vs cached speaker-latent extraction over many clips.
+
+By default it writes `--clips` synthetic WAVs (3-15 s) and uses a fake extractor
+that decodes the clip and burns `--rtf` x its duration of CPU, standing in for
+XTTS' two conditioning passes; `--real --audio-dir DIR` runs actual XTTS instead.
+Reports wall time for a cold serial run, a cold parallel run, a warm re-run, and
+a re-run after adding one new clip.
+
+    python Test/Benchmarks/bench_latent_extraction.py --clips 60 --workers 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Voice_Cloning" / "src"))
+import latent_extraction as le  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def write_clip(path, seconds, seed):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = 0.3 * np.sin(2 * np.pi * rng.uniform(90, 220) * t) + 0.02 * rng.standard_normal(len(t))
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((audio * 32767).astype(np.int16).tobytes())
+
+
+def fake_init(threads=0):
+    pass
+
+
+def fake_extract(path):
+    with wave.open(str(path), "rb") as f:
+        audio = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16).astype(np.float32) / 32768
+        duration = f.getnframes() / f.getframerate()
+    # Read from the environment so spawned workers see it too
+    deadline = time.perf_counter() + float(os.environ["FAKE_RTF"]) * duration
+    frames = audio[:len(audio) // 1024 * 1024].reshape(-1, 1024)
+    spectrum = np.zeros(513, dtype=np.float32)
+    while time.perf_counter() < deadline:
+        spectrum += np.abs(np.fft.rfft(frames, axis=1)).mean(axis=0)
+    return {
+        "gpt_cond_latent": np.resize(spectrum, (1, 32, 1024)).astype(np.float32),
+        "speaker_embedding": spectrum[:512].reshape(1, 512, 1),
+    }
+
+
+def timed(label, files, cache, workers, init, extract):
+    start = time.perf_counter()
+    le.extract_latents(files, cache, workers=workers, init=init, extract=extract)
+    elapsed = time.perf_counter() - start
+    print(f"{label:28s} {elapsed:7.2f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clips", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rtf", type=float, default=0.05, help="fake extractor CPU seconds per audio second")
+    parser.add_argument("--real", action="store_true", help="use XTTS (needs --audio-dir)")
+    parser.add_argument("--audio-dir", type=Path)
+    args = parser.parse_args()
+    os.environ["FAKE_RTF"] = str(args.rtf)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.real:
+            files = le.find_audio_files(args.audio_dir)
+            init, extract = le.xtts_init, le.xtts_extract
+        else:
+            rng = random.Random(0)
+            clip_dir = tmp / "clips"
+            clip_dir.mkdir()
+            for i in range(args.clips):
+                write_clip(clip_dir / f"clip_{i:03d}.wav", rng.uniform(3, 15), i)
+            files = le.find_audio_files(clip_dir)
+            init, extract = fake_init, fake_extract
+        print(f"{len(files)} clips, {args.workers} workers\n")
+
+        serial = timed("serial, cold", files, None, 0, init, extract)
+        cache = le.LatentCache(tmp / "cache")
+        parallel = timed("process pool, cold", files, cache, args.workers, init, extract)
+        timed("process pool, warm cache", files, cache, args.workers, init, extract)
+        if not args.real:
+            write_clip(clip_dir / "clip_new.wav", 8, 999)
+            timed("warm cache + 1 new clip", le.find_audio_files(clip_dir), cache, args.workers, init, extract)
+        print(f"\nparallel speedup (cold): {serial / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
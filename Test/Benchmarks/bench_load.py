@@ -0,0 +1,386 @@
+"""Offline load test: N concurrent SSE or Socket.IO clients against a real server.
+
+Every upstream is faked locally: fake_openai.py streams the answer (rate and
+jitter configurable), fake_elevenlabs.py stands in for ElevenLabs and
+fake_xtts.py for the XTTS model, so nothing costs API money. Each target server
+runs in its own process. Its CPU and RSS (children included) are sampled while
+`--clients` closed-loop clients each ask `--requests` questions.
+
+Targets:
+- flask / asgi: src/ over SSE
+- xtts / elevenlabs: the Test socket apps over Socket.IO (needs python-socketio)
+
+Reports throughput, TTFT and TTFA (first text_chunk / audio_chunk) percentiles.
+Results go to JSON with `--output`; `--compare` prints changes against an earlier
+run.
+
+    python Test/Benchmarks/bench_load.py --target asgi flask --clients 50 --output asgi.json
+    python Test/Benchmarks/bench_load.py --target xtts --clients 8 --tts-rtf 0.6 --compare base.json
+"""
+import argparse
+import datetime
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_concurrency import SERVER_COMMANDS, SRC_DIR, free_port, pct, wait_for_port  # noqa: E402
+import fake_elevenlabs  # noqa: E402
+import fake_openai  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+TEST_DIR = BENCH_DIR.parent
+SSE_TARGETS = ("flask", "asgi")
+SOCKET_TARGETS = ("xtts", "elevenlabs")
+QUESTION = "Tell me about your career"
+
+# Socket apps are imported and served directly: their __main__ runs the debug reloader
+SOCKET_CHILD = {
+    "xtts": "import fake_xtts; fake_xtts.serve_app({port}, rtf={rtf})",
+    "elevenlabs": ("import app_tts_labs as target; "
+                   "target.socketio.run(target.app, host='127.0.0.1', port={port}, allow_unsafe_werkzeug=True)"),
+}
+
+
+# =============================
+# SERVER RESOURCES
+# =============================
+class ResourceSampler:
+    """CPU seconds and RSS of a process tree, sampled on a background thread.
+
+    Uses psutil when installed, else /proc (Linux); elsewhere nothing is reported.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.rss_peak = 0
+        self.cpu_start = None
+        self.cpu_end = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        try:
+            import psutil
+
+            self._psutil = psutil.Process(pid)
+        except ImportError:
+            self._psutil = None
+
+    def start(self):
+        self.cpu_start = self._cpu_rss()[0]
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.cpu_end = self._cpu_rss()[0]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = self._cpu_rss()[1]
+            if rss is not None:
+                self.rss_peak = max(self.rss_peak, rss)
+
+    def _cpu_rss(self):
+        try:
+            if self._psutil is not None:
+                procs = [self._psutil] + self._psutil.children(recursive=True)
+                cpu = sum(sum(p.cpu_times()[:2]) for p in procs)
+                return cpu, sum(p.memory_info().rss for p in procs)
+            if Path("/proc").is_dir():
+                return _proc_cpu_rss(self.pid)
+        except Exception:
+            pass
+        return None, None
+
+    def stats(self, wall: float):
+        cpu = None
+        if self.cpu_start is not None and self.cpu_end is not None:
+            cpu = self.cpu_end - self.cpu_start
+        return {
+            "server_cpu_s": cpu,
+            "server_cpu_pct": cpu / wall * 100 if cpu is not None and wall else None,
+            "server_rss_peak_mb": self.rss_peak / 2**20 if self.rss_peak else None,
+        }
+
+
+def _proc_cpu_rss(pid: int):
+    ticks = os.sysconf("SC_CLK_TCK")
+    page = os.sysconf("SC_PAGE_SIZE")
+    cpu, rss, stack = 0.0, 0, [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            stat = Path(f"/proc/{current}/stat").read_text()
+            fields = stat[stat.rindex(")") + 2:].split()
+            cpu += (int(fields[11]) + int(fields[12])) / ticks  # utime, stime
+            rss += int(fields[21]) * page
+            for task in Path(f"/proc/{current}/task").iterdir():
+                stack.extend(int(child) for child in (task / "children").read_text().split())
+        except (OSError, ValueError):
+            continue
+    return cpu, rss
+
+
+# =============================
+# CLIENTS
+# =============================
+def sse_client(port: int, requests: int, results: list, barrier: threading.Barrier):
+    barrier.wait()
+    for _ in range(requests):
+        started = time.perf_counter()
+        ttft = None
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+            conn.request("POST", "/chat", body=json.dumps({"message": QUESTION}),
+                         headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            for line in response:
+                if ttft is None and b"text_chunk" in line:
+                    ttft = time.perf_counter() - started
+                if b'"error"' in line:
+                    raise RuntimeError(line.decode(errors="replace").strip())
+            conn.close()
+            results.append({"ok": True, "ttft": ttft, "ttfa": None, "total": time.perf_counter() - started})
+        except Exception as e:
+            results.append({"ok": False, "error": str(e), "total": time.perf_counter() - started})
+
+
+def socket_client(port: int, requests: int, results: list, barrier: threading.Barrier,
+                  audio_formats: Optional[List[str]] = None):
+    """Socket.IO visitor; negotiates `audio_formats` (preference order) before asking"""
+    import socketio
+
+    client = socketio.Client()
+    state = {}
+    done = threading.Event()
+
+    def mark(name):
+        if state.get(name) is None:
+            state[name] = time.perf_counter() - state["started"]
+
+    client.on("text_chunk", lambda data: mark("ttft"))
+    client.on("audio_chunk", lambda data: mark("ttfa"))
+    client.on("response_end", lambda data: done.set())
+
+    def on_error(data):
+        state["error"] = data.get("message", "error")
+        done.set()
+
+    client.on("error", on_error)
+    negotiated = threading.Event()
+    client.on("audio_format", lambda data: negotiated.set())
+    try:
+        client.connect(f"http://127.0.0.1:{port}", wait_timeout=30)
+        if audio_formats:
+            client.emit("negotiate_audio", {"formats": audio_formats})
+            negotiated.wait(timeout=10)
+    except Exception as e:
+        barrier.wait()
+        results.extend({"ok": False, "error": f"connect: {e}", "total": 0.0} for _ in range(requests))
+        return
+    barrier.wait()
+    for _ in range(requests):
+        state.clear()
+        done.clear()
+        state["started"] = time.perf_counter()
+        client.emit("send_message", {"message": QUESTION})
+        finished = done.wait(timeout=300)
+        total = time.perf_counter() - state["started"]
+        if not finished or "error" in state:
+            results.append({"ok": False, "error": state.get("error", "timeout"), "total": total})
+        else:
+            results.append({"ok": True, "ttft": state.get("ttft"), "ttfa": state.get("ttfa"), "total": total})
+    client.disconnect()
+
+
+# =============================
+# RUN ONE TARGET
+# =============================
+def start_target(target: str, port: int, env: dict, rtf: float) -> subprocess.Popen:
+    if target in SSE_TARGETS:
+        command = [part.format(port=port) for part in SERVER_COMMANDS[target]]
+        cwd = SRC_DIR
+    else:
+        code = (f"import sys; sys.path[:0] = [{str(BENCH_DIR)!r}, {str(TEST_DIR)!r}]; "
+                + SOCKET_CHILD[target].format(port=port, rtf=rtf))
+        command, cwd = [sys.executable, "-c", code], TEST_DIR
+    return subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(target: str, port: int, timeout: float = 300):
+    wait_for_port(port, timeout)
+    if target != "xtts":
+        return
+    # Audio only starts once the TTS runtime has loaded and warmed up
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/tts/status")
+            status = json.loads(conn.getresponse().read())
+            if status.get("ready") or status.get("error"):
+                return
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.5)
+
+
+def summarize(samples: list) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None}
+    return {"p50": pct(samples, 0.5), "p95": pct(samples, 0.95), "p99": pct(samples, 0.99)}
+
+
+def run_target(target: str, args, openai_port: int, elevenlabs_port: int) -> dict:
+    port = free_port()
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="sk-fake",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{openai_port}/v1",
+        ELEVENLABS_API_KEY="fake",
+        ELEVENLABS_BASE_URL=f"http://127.0.0.1:{elevenlabs_port}",
+        # Every client asks the same question: caches off, so every answer is streamed and synthesized
+        ANSWER_CACHE_SIZE="0",
+        AUDIO_CACHE_MEMORY_MB="0",
+        AUDIO_CACHE_DIR="",
+        # ... and coalescing off, so concurrent identical questions are not collapsed into one
+        SINGLE_FLIGHT="0",
+    )
+    server = start_target(target, port, env, args.tts_rtf)
+    try:
+        wait_until_ready(target, port)
+        results = []
+        client = sse_client if target in SSE_TARGETS else socket_client
+        kwargs = {} if target in SSE_TARGETS else {"audio_formats": args.audio_formats}
+        barrier = threading.Barrier(args.clients)
+        threads = [threading.Thread(target=client, args=(port, args.requests, results, barrier), kwargs=kwargs)
+                   for _ in range(args.clients)]
+        sampler = ResourceSampler(server.pid).start()
+        wall_start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - wall_start
+        sampler.stop()
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    ok = [r for r in results if r["ok"]]
+    errors = sorted({r["error"] for r in results if not r["ok"]})
+    return {
+        "target": target,
+        "clients": args.clients,
+        "requests": len(results),
+        "ok": len(ok),
+        "failed": len(results) - len(ok),
+        "errors": errors[:5],
+        "wall_s": wall,
+        "answers_per_s": len(ok) / wall if wall else 0.0,
+        "ttft_s": summarize([r["ttft"] for r in ok if r["ttft"] is not None]),
+        "ttfa_s": summarize([r["ttfa"] for r in ok if r["ttfa"] is not None]),
+        "total_s": summarize([r["total"] for r in ok]),
+        **sampler.stats(wall),
+    }
+
+
+# =============================
+# REPORTING
+# =============================
+def fmt(value, unit="s"):
+    if value is None:
+        return "   -  "
+    return f"{value * 1000:5.0f}ms" if unit == "s" else f"{value:6.1f}"
+
+
+def print_result(r: dict):
+    print(f"{r['target']:>10}: {r['ok']}/{r['requests']} ok in {r['wall_s']:.1f}s "
+          f"({r['answers_per_s']:.1f} answers/s)  server cpu {fmt(r['server_cpu_pct'], '%')}%  "
+          f"rss {fmt(r['server_rss_peak_mb'], 'MB')} MB")
+    for label in ("ttft_s", "ttfa_s", "total_s"):
+        p = r[label]
+        if p["p50"] is None:
+            continue  # e.g. no audio over SSE
+        print(f"{'':12}{label[:-2]:5s} p50 {fmt(p['p50'])}  p95 {fmt(p['p95'])}  p99 {fmt(p['p99'])}")
+    for error in r["errors"]:
+        print(f"{'':12}error: {error}")
+
+
+def compare(results: list, baseline_path: str):
+    baseline = {r["target"]: r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    print(f"\nvs {baseline_path}:")
+    for r in results:
+        old = baseline.get(r["target"])
+        if old is None:
+            continue
+        changes = []
+        for key, label in (("answers_per_s", "answers/s"), ("server_cpu_pct", "cpu%"),
+                           ("server_rss_peak_mb", "rss MB")):
+            if r.get(key) is not None and old.get(key):
+                changes.append(f"{label} {(r[key] / old[key] - 1) * 100:+.0f}%")
+        for key in ("ttft_s", "ttfa_s"):
+            for q in ("p50", "p95", "p99"):
+                if r[key][q] is not None and old[key][q]:
+                    changes.append(f"{key[:-2]} {q} {(r[key][q] / old[key][q] - 1) * 100:+.0f}%")
+        print(f"{r['target']:>10}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", nargs="+", default=["asgi"], choices=SSE_TARGETS + SOCKET_TARGETS)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=1, help="questions per client, back to back")
+    parser.add_argument("--tokens", type=int, default=80)
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    parser.add_argument("--jitter", type=float, default=0.3, help="+/- fraction of the token interval")
+    parser.add_argument("--tts-rtf", type=float, default=0.6, help="fake XTTS real-time factor")
+    parser.add_argument("--elevenlabs-rtf", type=float, default=0.15)
+    parser.add_argument("--elevenlabs-ttfb", type=float, default=0.3)
+    parser.add_argument("--audio-formats", nargs="*", default=["opus", "mp3", "wav"],
+                        help="socket targets: formats the client can play, best first (none: base64)")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    if any(t in SOCKET_TARGETS for t in args.target):
+        try:
+            import socketio  # noqa: F401
+        except ImportError:
+            sys.exit("Socket.IO targets need the client: pip install 'python-socketio[client]'")
+
+    openai = fake_openai.start_server(tokens=args.tokens, token_delay=1 / args.tokens_per_second,
+                                      jitter=args.jitter)
+    elevenlabs = fake_elevenlabs.start_server(ttfb=args.elevenlabs_ttfb, rtf=args.elevenlabs_rtf,
+                                              max_concurrent=max(4, args.clients))
+    results = []
+    for target in args.target:
+        results.append(run_target(target, args, openai.server_port, elevenlabs.server_port))
+        print_result(results[-1])
+    openai.shutdown()
+    elevenlabs.shutdown()
+
+    if args.output:
+        report = {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+            "config": vars(args),
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Prompt-size and scoring-latency benchmark for the profile retrieval index.
+
+Compares the full system prompt with the per-question retrieval prompt and times
+index build and top-k scoring. Token counts use tiktoken when it is installed and
+a 4-characters-per-token estimate otherwise.
+
+    python Test/Benchmarks/bench_retrieval.py --top-k 6
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+sys.path.insert(0, str(SRC_DIR))
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+QUESTIONS = [
+    "Who are you?",
+    "Tell me about your career so far",
+    "What programming languages and frameworks do you use?",
+    "Have you worked with LLMs or computer vision?",
+    "Where did you study?",
+    "What do you do outside of work?",
+    "Do you think AI resumes will replace traditional resumes?",
+    "What projects are you most proud of?",
+]
+
+
+def token_counter():
+    import session_store
+
+    name = "tiktoken o200k_base" if session_store._encoding is not None else "chars/4 estimate"
+    return session_store.count_tokens, name
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=6)
+    parser.add_argument("--chunk-words", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    import app
+    from retrieval import build_index, format_context
+
+    count_tokens, counter_name = token_counter()
+
+    start = time.perf_counter()
+    index = build_index({"Summary": app.summary, "Resume": app.resume, "LinkedIn": app.linkedin},
+                        max_words=args.chunk_words)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    full_tokens = count_tokens(app.system_prompt)
+    retrieval_tokens = []
+    for question in QUESTIONS:
+        prompt = app.build_retrieval_prompt(app.name, format_context(index.top_k(question, args.top_k)))
+        retrieval_tokens.append(count_tokens(prompt))
+
+    per_query_us = []
+    for question in QUESTIONS:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            index.top_k(question, args.top_k)
+        per_query_us.append((time.perf_counter() - start) / args.repeat * 1e6)
+
+    mean_retrieval = statistics.mean(retrieval_tokens)
+    print(f"tokens counted with {counter_name}")
+    print(f"index: {len(index)} chunks, {len(index.vocab)} terms, built in {build_ms:.2f} ms")
+    print(f"full prompt:       {full_tokens:6d} tokens")
+    print(f"retrieval prompt:  {mean_retrieval:8.1f} tokens mean (top-{args.top_k}), "
+          f"{1 - mean_retrieval / full_tokens:.0%} fewer")
+    print(f"top-k scoring:     {statistics.median(per_query_us):8.1f} us median per query, "
+          f"{max(per_query_us):.1f} us max")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Per-token cost of the incremental SentenceBuffer vs the old rescanning one.
+
+Streams long answers in 4-character tokens (roughly OpenAI delta size) and reports
+microseconds per token. The "run-on" answer has no terminators for long stretches
+(lists, code, tables), which is where rescanning the whole buffer on every token
+goes quadratic.
+
+    python Test/Benchmarks/bench_sentence_buffer.py --words 2000
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sentence_buffer import SentenceBuffer  # noqa: E402
+
+SENTENCE = ("I have worked on speech-to-text, LLM summarization and agentic workflows, "
+            "e.g. call-center analytics at 3.5x the previous throughput. ")
+
+
+class LegacySentenceBuffer:
+    """The previous implementation, kept for comparison"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.sentence_pattern = re.compile(r'([.!?]+)(?:\s+|$)')
+
+    def add_text(self, text):
+        self.buffer += text
+        sentences = []
+        matches = list(self.sentence_pattern.finditer(self.buffer))
+        if matches:
+            end_pos = matches[-1].end()
+            completed = self.buffer[:end_pos]
+            self.buffer = self.buffer[end_pos:]
+            parts = self.sentence_pattern.split(completed)
+            for i in range(0, len(parts) - 1, 2):
+                if parts[i].strip():
+                    sentences.append(parts[i].strip() + parts[i + 1])
+        return sentences
+
+
+def tokens_for(text, size=4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def per_token_us(factory, tokens, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        buffer = factory()
+        start = time.perf_counter()
+        for token in tokens:
+            buffer.add_text(token)
+        best = min(best, time.perf_counter() - start)
+    return best / len(tokens) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    sentence_words = len(SENTENCE.split())
+    prose = SENTENCE * (args.words // sentence_words)
+    run_on = " ".join(f"item_{i} uses PyTorch, NumPy, FastAPI" for i in range(args.words // 5)) + "."
+    for label, text in (("prose", prose), ("run-on", run_on)):
+        tokens = tokens_for(text)
+        legacy = per_token_us(LegacySentenceBuffer, tokens, args.repeats)
+        incremental = per_token_us(SentenceBuffer, tokens, args.repeats)
+        clauses = per_token_us(lambda: SentenceBuffer(clause_min_chars=30), tokens, args.repeats)
+        print(f"{label:7s} {len(tokens):6d} tokens  legacy {legacy:7.2f} us/token  "
+              f"incremental {incremental:5.2f} us/token  with clauses {clauses:5.2f} us/token")
+
+    print()
+    sample = "I scored 3.5 GPA, e.g. at IIT. See example.com for more."
+    for label, factory in (("legacy", LegacySentenceBuffer), ("incremental", SentenceBuffer)):
+        buffer = factory()
+        print(f"{label:12s}", [s for token in tokens_for(sample + " ") for s in buffer.add_text(token)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Cross-session micro-batching vs one-at-a-time synthesis under load.
+
+`--sessions` visitors each submit `--sentences` sentences at random intervals. The
+fake model charges a fixed per-call overhead plus `rtf` x the longest sentence, with
+`--batch-cost` extra per additional batch row. This is a sleep-based cost model, not
+XTTS: real gains depend on the hardware and must be measured with the model. As in
+the app, sentences are bucketed by length (here `--bucket-words`, standing in for
+TTS_BATCH_BUCKET_TOKENS) and padded within a batch; `--bucket-words 0` batches any
+lengths together. Reports seconds of speech per wall-second and p50/p95 per-sentence
+latency.
+
+    python Test/Benchmarks/bench_tts_batching.py --sessions 8 --window-ms 30 --max-batch 4
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tts_batcher import MicroBatcher  # noqa: E402
+
+SECONDS_PER_WORD = 0.4
+
+
+def speech_seconds(text):
+    return SECONDS_PER_WORD * len(text.split())
+
+
+def fake_batch_fn(rtf, overhead, batch_cost):
+    lock = threading.Lock()  # one model, one call at a time
+
+    def batch_fn(texts):
+        with lock:
+            longest = max(speech_seconds(t) for t in texts)
+            time.sleep(overhead + rtf * longest * (1 + batch_cost * (len(texts) - 1)))
+        return [[0.0] * len(t) for t in texts]
+    return batch_fn
+
+
+def run(synthesize, sessions, sentences, seed):
+    rng = random.Random(seed)
+    plans = [[(rng.uniform(0, 0.3), " ".join(["word"] * rng.randint(4, 14))) for _ in range(sentences)]
+             for _ in range(sessions)]
+    latencies = []
+    lock = threading.Lock()
+
+    def session(plan):
+        for delay, text in plan:
+            time.sleep(delay)
+            start = time.perf_counter()
+            synthesize(text)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session, args=(plan,)) for plan in plans]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+    speech = sum(speech_seconds(text) for plan in plans for _, text in plan)
+    latencies.sort()
+    return speech / wall, statistics.median(latencies), latencies[int(0.95 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--sentences", type=int, default=4)
+    parser.add_argument("--rtf", type=float, default=0.3)
+    parser.add_argument("--overhead", type=float, default=0.15, help="fixed seconds per model call")
+    parser.add_argument("--batch-cost", type=float, default=0.2, help="extra cost per additional row")
+    parser.add_argument("--window-ms", type=float, default=30)
+    parser.add_argument("--max-batch", type=int, default=4)
+    parser.add_argument("--bucket-words", type=int, default=8, help="length bucket width; 0: any length")
+    args = parser.parse_args()
+
+    batch_fn = fake_batch_fn(args.rtf, args.overhead, args.batch_cost)
+    single = run(lambda text: batch_fn([text]), args.sessions, args.sentences, seed=1)
+    batcher = MicroBatcher(batch_fn, window_ms=args.window_ms, max_batch=args.max_batch,
+                           batch_key=(lambda text: len(text.split()) // args.bucket_words) if args.bucket_words else None)
+    batched = run(batcher.synthesize, args.sessions, args.sentences, seed=1)
+
+    for label, (throughput, p50, p95) in (("one-at-a-time", single), ("micro-batched", batched)):
+        print(f"{label:>14}: {throughput:5.2f} s speech / wall-s  latency p50 {p50:5.2f}s  p95 {p95:5.2f}s")
+    print(f"mean batch size: {batcher.items / max(1, batcher.batches):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Inline vs pipelined TTS latency with a simulated LLM stream and synthesizer.
+
+The fake synthesizer sleeps for `rtf` x the spoken duration of each sentence
+(~0.4 s per word), standing in for XTTS on CPU; the streaming variant yields the
+same audio in decoded chunks like `inference_stream`. Like the real XTTS model, the
+fake one runs a single inference at a time behind a lock (`--parallel-model` drops
+it, which no real XTTS instance allows), so extra workers only overlap queueing.
+Reports when the last text chunk left the server, time-to-first-audio and total
+response time.
+
+    python Test/Benchmarks/bench_tts_pipeline.py --rtf 0.5 --workers 1 2
+"""
+import argparse
+import contextlib
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tts_pipeline import TTSWorkerPool  # noqa: E402
+
+SENTENCES = [
+    "I'm Jai's eCameo.",
+    "I recently graduated and now work as a Data Scientist.",
+    "Most of my work is building GenAI pipelines in Python.",
+    "That includes speech-to-text, LLM summarization and agentic workflows.",
+    "Outside work I'm training for a marathon.",
+    "Happy to walk you through any project in more detail!",
+]
+SECONDS_PER_WORD = 0.4
+
+
+def model_lock(parallel):
+    return contextlib.nullcontext() if parallel else threading.Lock()
+
+
+def fake_synthesize(rtf, lock=None):
+    lock = lock or contextlib.nullcontext()
+
+    def synthesize(text):
+        with lock:
+            time.sleep(rtf * SECONDS_PER_WORD * len(text.split()))
+        return [0.0] * len(text)
+    return synthesize
+
+
+def fake_stream_synthesize(rtf, chunk_seconds, lock=None):
+    lock = lock or contextlib.nullcontext()
+
+    def synthesize(text):
+        with lock:
+            remaining = SECONDS_PER_WORD * len(text.split())
+            while remaining > 0:
+                step = min(chunk_seconds, remaining)
+                time.sleep(rtf * step)
+                remaining -= step
+                yield [0.0] * int(step * 100)
+    return synthesize
+
+
+def stream_words(token_delay):
+    """(word, completed_sentence_or_None) pairs at LLM speed"""
+    for sentence in SENTENCES:
+        words = sentence.split()
+        for i, word in enumerate(words):
+            time.sleep(token_delay)
+            yield word, sentence if i == len(words) - 1 else None
+
+
+def run_inline(rtf, token_delay):
+    synthesize = fake_synthesize(rtf)
+    start = time.perf_counter()
+    first_audio = None
+    for _, sentence in stream_words(token_delay):
+        if sentence:
+            synthesize(sentence)
+            first_audio = first_audio or time.perf_counter() - start
+    text_done = time.perf_counter() - start
+    return text_done, first_audio, time.perf_counter() - start
+
+
+def run_pipelined(rtf, token_delay, workers, chunk_seconds=None, parallel_model=False):
+    lock = model_lock(parallel_model)
+    if chunk_seconds:
+        pool = TTSWorkerPool(fake_stream_synthesize(rtf, chunk_seconds, lock), workers=workers, streaming=True)
+    else:
+        pool = TTSWorkerPool(fake_synthesize(rtf, lock), workers=workers)
+    start = time.perf_counter()
+    stream = pool.open_stream(lambda seq, text, audio, part=0: None)
+    for _, sentence in stream_words(token_delay):
+        if sentence:
+            stream.submit(sentence)
+    text_done = time.perf_counter() - start
+    stats = stream.finish()
+    return text_done, stats["time_to_first_audio"], stats["total"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtf", type=float, default=0.5, help="synthesis seconds per second of speech")
+    parser.add_argument("--token-delay", type=float, default=0.03)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--chunk-seconds", type=float, default=0.5,
+                        help="audio per decoded chunk in the streaming variant")
+    parser.add_argument("--parallel-model", action="store_true",
+                        help="let workers synthesize concurrently (not safe with one XTTS instance)")
+    args = parser.parse_args()
+
+    rows = [("inline", run_inline(args.rtf, args.token_delay))]
+    for workers in args.workers:
+        rows.append((f"pipelined x{workers}",
+                     run_pipelined(args.rtf, args.token_delay, workers, parallel_model=args.parallel_model)))
+    rows.append(("streaming x1", run_pipelined(args.rtf, args.token_delay, 1, args.chunk_seconds,
+                                               parallel_model=args.parallel_model)))
+    for label, (text_done, first_audio, total) in rows:
+        print(f"{label:>14}: text done {text_done:5.2f}s  first audio {first_audio:5.2f}s  total {total:5.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Whole-recording vs VAD-selected reference audio for speaker-latent extraction.
+
+By default it builds `--clips` synthetic voice memos: one synthetic "speaker"
+(harmonic bursts with a fixed spectral envelope) between long pauses, each memo
+with its own background noise. The fake extractor charges `--rtf` x the seconds it
+is fed (XTTS truncates at 30 s) and returns a band-energy embedding. `--real
+--audio-dir DIR` uses XTTS' speaker embeddings instead.
+
+Reports segmenter speed, extraction time, and latent consistency (mean cosine
+similarity of each clip's embedding to the normalized mean) before and after.
+
+    python Test/Benchmarks/bench_vad.py --clips 12
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Voice_Cloning" / "src"))
+import latent_extraction as le  # noqa: E402
+from vad import trim_reference  # noqa: E402
+
+SR = le.LOAD_SR
+
+
+def synthetic_memo(rng, seconds):
+    noise_kind = rng.integers(3)
+    t = np.arange(int(seconds * SR)) / SR
+    if noise_kind == 0:
+        background = 0.01 * rng.standard_normal(len(t))
+    elif noise_kind == 1:
+        background = 0.02 * np.sin(2 * np.pi * 60 * t) + 0.004 * rng.standard_normal(len(t))
+    else:
+        background = 0.02 * np.convolve(rng.standard_normal(len(t)), np.ones(40) / 40, mode="same")
+    audio = background
+    pos = int(rng.uniform(1, 4) * SR)
+    while pos < len(t) - SR:
+        dur = int(rng.uniform(1, 5) * SR)
+        tt = np.arange(min(dur, len(t) - pos)) / SR
+        f0 = 120 * (1 + 0.05 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * tt))
+        phase = 2 * np.pi * np.cumsum(f0) / SR
+        voice = sum(np.sin(k * phase) / k ** 1.2 for k in range(1, 16))
+        audio[pos:pos + len(tt)] += 0.15 * voice * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * tt))
+        pos += len(tt) + int(rng.uniform(2, 8) * SR)
+    return audio.astype(np.float32)
+
+
+def fake_embedding(audio, rtf):
+    fed = audio[:SR * le.MAX_REF_SECONDS]
+    time.sleep(rtf * len(fed) / SR)
+    spectrum = np.abs(np.fft.rfft(fed[:len(fed) // 2048 * 2048].reshape(-1, 2048), axis=1)).mean(axis=0)
+    bands = np.log10(np.add.reduceat(spectrum, np.geomspace(1, len(spectrum) - 1, 33).astype(int)[:-1]) + 1e-8)
+    return bands - bands.mean()
+
+
+def consistency(embeddings):
+    unit = np.array([e / np.linalg.norm(e) for e in embeddings])
+    mean = unit.mean(axis=0)
+    return float(np.mean(unit @ (mean / np.linalg.norm(mean))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clips", type=int, default=12)
+    parser.add_argument("--rtf", type=float, default=0.02, help="fake extractor seconds per fed second")
+    parser.add_argument("--real", action="store_true", help="use XTTS (needs --audio-dir)")
+    parser.add_argument("--audio-dir", type=Path)
+    args = parser.parse_args()
+
+    if args.real:
+        le.xtts_init()
+        memos = [le.decode_audio(path) for path in le.find_audio_files(args.audio_dir)]
+
+        def embed(audio):
+            return le.xtts_latents_from_audio(le._model, audio)["speaker_embedding"].flatten()
+    else:
+        rng = np.random.default_rng(0)
+        memos = [synthetic_memo(rng, rng.uniform(40, 120)) for _ in range(args.clips)]
+
+        def embed(audio):
+            return fake_embedding(audio, args.rtf)
+
+    total = sum(len(m) for m in memos) / SR
+    print(f"{len(memos)} clips, {total:.0f}s of audio\n")
+
+    start = time.perf_counter()
+    whole = [embed(m) for m in memos]
+    whole_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trimmed = [trim_reference(m, SR, budget_seconds=le.VAD_BUDGET_SECONDS, max_seconds=le.VAD_MAX_SEGMENT_SECONDS)
+               for m in memos]
+    vad_time = time.perf_counter() - start
+    start = time.perf_counter()
+    selected = [embed(m) for m in trimmed]
+    selected_time = time.perf_counter() - start
+
+    kept = sum(len(m) for m in trimmed) / SR
+    print(f"VAD: {vad_time * 1000:.0f} ms for {total:.0f}s ({total / vad_time:.0f}x real time), kept {kept:.0f}s")
+    print(f"{'':16s}{'extract':>10s}{'consistency':>14s}")
+    print(f"{'whole clips':16s}{whole_time:9.2f}s{consistency(whole):14.4f}")
+    print(f"{'VAD selected':16s}{vad_time + selected_time:9.2f}s{consistency(selected):14.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""fp32 vs fast (int8 GPT / bf16) XTTS on CPU, with a quality guardrail.
+
+Each mode runs in its own subprocess so peak RSS and thread settings don't leak
+between them. Both synthesize the same sentences with the same seeds; the parent
+reports RTF and peak RSS per mode and the spectral distance (dB) of every fast
+output from its fp32 reference, and exits non-zero if the worst one exceeds
+`--max-distance`.
+
+    python Test/Benchmarks/bench_xtts_fast.py --latents jai_voice_latents.pt --threads 4
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SENTENCES = [
+    "My name is Jai Goswami, and I am from Delhi, India.",
+    "I build data platforms and machine learning systems.",
+    "Feel free to ask me about my experience or the projects I have worked on.",
+]
+SAMPLE_RATE = 24000
+
+
+def run_mode(mode, latents_path, threads, out_path):
+    os.environ["XTTS_FAST"] = "1" if mode == "fast" else "0"
+    os.environ["TORCH_INTRA_THREADS"] = str(threads)
+    os.environ["TORCH_INTER_THREADS"] = "1"
+
+    import torch
+    from TTS.api import TTS
+    from xtts_fast import fast_mode_from_env, precision_context, threads_from_env
+
+    threads_from_env()
+    model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").synthesizer.tts_model
+    settings = fast_mode_from_env(model)
+    latents = torch.load(latents_path, map_location="cpu")
+
+    wavs, synth, audio = [], 0.0, 0.0
+    for i, text in enumerate(SENTENCES):
+        torch.manual_seed(i)
+        start = time.perf_counter()
+        with torch.inference_mode(), precision_context(settings["bf16"]):
+            out = model.inference(text=text, language="en", gpt_cond_latent=latents["gpt_cond_latent"],
+                                  speaker_embedding=latents["speaker_embedding"])
+        synth += time.perf_counter() - start
+        wav = np.asarray(out["wav"], dtype=np.float32).flatten()
+        audio += len(wav) / SAMPLE_RATE
+        wavs.append(wav)
+
+    np.savez(out_path, *wavs)
+    print(json.dumps({
+        "mode": mode,
+        "settings": settings,
+        "rtf": synth / audio,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latents", required=True)
+    parser.add_argument("--threads", type=int, default=os.cpu_count())
+    parser.add_argument("--max-distance", type=float, default=3.0, help="dB; guardrail threshold")
+    parser.add_argument("--mode", choices=["fp32", "fast"], help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.latents, args.threads, args.out)
+        return
+
+    from xtts_fast import spectral_distance
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("fp32", "fast"):
+            out = Path(tmp) / f"{mode}.npz"
+            proc = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--out", str(out),
+                 "--latents", args.latents, "--threads", str(args.threads)],
+                capture_output=True, text=True, check=True,
+            )
+            results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+            with np.load(out) as data:
+                results[mode]["wavs"] = [data[k] for k in data.files]
+
+    for mode in ("fp32", "fast"):
+        r = results[mode]
+        print(f"{mode:5s} RTF {r['rtf']:.2f}  peak RSS {r['peak_rss_mb']:.0f} MB  {r['settings']}")
+    distances = [spectral_distance(ref, cand) for ref, cand in zip(results["fp32"]["wavs"], results["fast"]["wavs"])]
+    print(f"speedup {results['fp32']['rtf'] / results['fast']['rtf']:.2f}x, "
+          f"spectral distance mean {np.mean(distances):.2f} dB, worst {max(distances):.2f} dB")
+    if max(distances) > args.max_distance:
+        print(f"FAIL: fast mode exceeds the {args.max_distance} dB guardrail")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Local stand-in for ElevenLabs' streaming text-to-speech endpoint.
+
+Answers POST /v1/text-to-speech/<voice_id>/stream with silent 128 kbps / 44.1 kHz
+MP3 frames: the first frame after `ttfb` seconds, the rest paced at `rtf` x real
+time, ~14 characters of text per second of audio. Each new TCP connection waits
+`handshake` seconds first, standing in for the TLS setup a pooled client avoids.
+More than `max_concurrent` simultaneous requests get a 429 like the real API, and
+with `fail_every` N every Nth request gets a 503, to exercise retries. Keep-alive
+is supported and new TCP connections are counted, so connection reuse is visible.
+
+Point the app at it with ELEVENLABS_BASE_URL=http://127.0.0.1:<port>.
+
+    python Test/Benchmarks/fake_elevenlabs.py --port 8902 --ttfb 0.3 --rtf 0.15
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FRAME = bytes([0xFF, 0xFB, 0x90, 0x00]) + bytes(413)  # 417 bytes = 26.12 ms
+FRAME_SECONDS = 1152 / 44100
+CHARS_PER_SECOND = 14.0
+
+
+class FakeElevenLabs(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, ttfb: float, rtf: float, max_concurrent: int, handshake: float = 0.0,
+                 fail_every: int = 0):
+        super().__init__(address, Handler)
+        self.ttfb = ttfb
+        self.rtf = rtf
+        self.max_concurrent = max_concurrent
+        self.handshake = handshake
+        self.fail_every = fail_every
+        self.lock = threading.Lock()
+        self.active = 0
+        self.requests = 0
+        self.connections = 0
+        self.rejected = 0
+        self.failed = 0
+        self.peak_active = 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if "/v1/text-to-speech/" not in self.path or "/stream" not in self.path:
+            self._error(404, "not_found")
+            return
+        with server.lock:
+            server.requests += 1
+            fail = bool(server.fail_every) and server.requests % server.fail_every == 0
+            if fail:
+                server.failed += 1
+                busy = False
+            elif server.active >= server.max_concurrent:
+                server.rejected += 1
+                busy = True
+            else:
+                server.active += 1
+                server.peak_active = max(server.peak_active, server.active)
+                busy = False
+        if fail:
+            self._error(503, "service_unavailable")
+            return
+        if busy:
+            self._error(429, "too_many_concurrent_requests")
+            return
+        try:
+            self._stream_audio(body.get("text", ""))
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _stream_audio(self, text):
+        server = self.server
+        frames = max(1, int(len(text) / CHARS_PER_SECOND / FRAME_SECONDS))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(server.ttfb)
+        started = time.perf_counter()
+        # ~100 ms of audio per write, released no faster than rtf x real time
+        per_write = 4
+        for sent in range(0, frames, per_write):
+            count = min(per_write, frames - sent)
+            delay = started + server.rtf * (sent + count) * FRAME_SECONDS - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._write_chunk(FRAME * count)
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _error(self, status, code):
+        body = json.dumps({"detail": {"status": code}}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(port: int = 0, ttfb: float = 0.3, rtf: float = 0.15, max_concurrent: int = 4,
+                 handshake: float = 0.0, fail_every: int = 0) -> FakeElevenLabs:
+    """Start the fake server on a daemon thread and return it (server.server_port holds the port)"""
+    server = FakeElevenLabs(("127.0.0.1", port), ttfb, rtf, max_concurrent, handshake, fail_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8902)
+    parser.add_argument("--ttfb", type=float, default=0.3)
+    parser.add_argument("--rtf", type=float, default=0.15)
+    parser.add_argument("--max-concurrent", type=int, default=4)
+    parser.add_argument("--handshake", type=float, default=0.0, help="seconds per new connection")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with 503")
+    args = parser.parse_args()
+    server = start_server(args.port, args.ttfb, args.rtf, args.max_concurrent, args.handshake, args.fail_every)
+    print(f"Fake ElevenLabs listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
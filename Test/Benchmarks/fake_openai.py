@@ -0,0 +1,89 @@
+"""Local stand-in for the OpenAI streaming chat-completions endpoint.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any
+OPENAI_API_KEY; no request ever leaves the machine. Each delta waits `token_delay`
+seconds, varied uniformly by +/- `jitter` (a fraction of the delay), so streams
+don't arrive in lockstep.
+
+    python Test/Benchmarks/fake_openai.py --port 8901 --tokens 80 --token-delay 0.02 --jitter 0.5
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = ("I'm Jai's eCameo. I recently graduated and now work as a Data Scientist, "
+          "building GenAI systems with Python, LLMs and retrieval pipelines. ")
+
+
+def make_handler(tokens: int, token_delay: float, jitter: float = 0.0):
+    words = (ANSWER * (tokens // len(ANSWER.split()) + 1)).split()[:tokens]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            if not self.path.endswith("/chat/completions"):
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            rng = random.Random()
+            for i, word in enumerate(words):
+                time.sleep(token_delay * (1 + jitter * rng.uniform(-1, 1)) if jitter else token_delay)
+                self._write_event(self._chunk({"content": ("" if i == 0 else " ") + word}))
+            self._write_event(self._chunk({}, finish_reason="stop"))
+            self._write_raw(b"data: [DONE]\n\n")
+            self._write_raw(b"")
+
+        def _chunk(self, delta, finish_reason=None):
+            return {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": "gpt-4o-mini",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        def _write_event(self, payload):
+            self._write_raw(f"data: {json.dumps(payload)}\n\n".encode())
+
+        def _write_raw(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def start_server(port: int = 0, tokens: int = 80, token_delay: float = 0.02,
+                 jitter: float = 0.0) -> ThreadingHTTPServer:
+    """Start the fake server on a daemon thread and return it (server.server_port holds the port)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(tokens, token_delay, jitter))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--tokens", type=int, default=80)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- fraction of the token delay")
+    args = parser.parse_args()
+    server = start_server(args.port, args.tokens, args.token_delay, args.jitter)
+    print(f"Fake OpenAI listening on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
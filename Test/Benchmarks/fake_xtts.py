@@ -0,0 +1,107 @@
+"""Stand-in XTTS model: silent audio produced at a configurable real-time factor.
+
+`FakeXtts` answers `inference()` and `inference_stream()` like the real model, taking
+`rtf` seconds per second of audio (~14 characters of text per second). `install()`
+registers a fake `TTS.api` so Test/xtts_app.py boots unmodified with it in place of
+the real model, and `serve_app()` does that plus dummy speaker latents and starts
+the socket server. Everything else in the app (OpenAI, pipeline, caches, metrics)
+is real; point OPENAI_BASE_URL at fake_openai.py to keep it offline. Cross-session
+batching falls back to one call per sentence, as it does for any batch failure.
+
+    python Test/Benchmarks/fake_xtts.py --rtf 0.6 --port 5001
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+
+TEST_DIR = Path(__file__).resolve().parents[1]
+SAMPLE_RATE = 24000
+CHARS_PER_SECOND = 14.0
+GPT_TOKENS_PER_SECOND = 21.5  # XTTS audio codes per second of speech
+
+
+class FakeXtts:
+    device = "cpu"
+    gpt = None
+
+    def __init__(self, rtf: float = 0.6, chars_per_second: float = CHARS_PER_SECOND):
+        self.rtf = rtf
+        self.chars_per_second = chars_per_second
+        self.calls = 0
+
+    def _samples(self, text: str) -> int:
+        return max(1, int(len(text) / self.chars_per_second * SAMPLE_RATE))
+
+    def inference(self, text, language, gpt_cond_latent, speaker_embedding, **kwargs):
+        self.calls += 1
+        samples = self._samples(text)
+        time.sleep(self.rtf * samples / SAMPLE_RATE)
+        return {"wav": np.zeros(samples, dtype=np.float32)}
+
+    def inference_stream(self, text, language, gpt_cond_latent, speaker_embedding,
+                         stream_chunk_size: int = 20, **kwargs):
+        self.calls += 1
+        samples = self._samples(text)
+        chunk = max(1, int(stream_chunk_size / GPT_TOKENS_PER_SECOND * SAMPLE_RATE))
+        started = time.perf_counter()
+        for sent in range(0, samples, chunk):
+            count = min(chunk, samples - sent)
+            delay = started + self.rtf * (sent + count) / SAMPLE_RATE - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield np.zeros(count, dtype=np.float32)
+
+
+def install(rtf: float = 0.6) -> FakeXtts:
+    """Make `from TTS.api import TTS` hand out a FakeXtts; returns the shared instance"""
+    model = FakeXtts(rtf)
+
+    class TTS:
+        def __init__(self, *args, **kwargs):
+            self.synthesizer = types.SimpleNamespace(tts_model=model)
+
+    api = types.ModuleType("TTS.api")
+    api.TTS = TTS
+    package = types.ModuleType("TTS")
+    package.api = api
+    sys.modules["TTS"] = package
+    sys.modules["TTS.api"] = api
+    return model
+
+
+def write_latents(path) -> Path:
+    """Dummy speaker latents with XTTS v2 shapes"""
+    sys.path.insert(0, str(TEST_DIR))
+    from tts_runtime import save_latents
+
+    return save_latents({
+        "gpt_cond_latent": np.zeros((1, 32, 1024), dtype=np.float32),
+        "speaker_embedding": np.zeros((1, 512, 1), dtype=np.float32),
+    }, path)
+
+
+def serve_app(port: int = 5001, rtf: float = 0.6, host: str = "127.0.0.1"):
+    """Run Test/xtts_app.py on FakeXtts (blocks)"""
+    if "XTTS_LATENTS" not in os.environ:
+        latents_dir = tempfile.mkdtemp(prefix="fake_xtts_")
+        os.environ["XTTS_LATENTS"] = str(write_latents(Path(latents_dir) / "latents.safetensors"))
+    install(rtf)
+    sys.path.insert(0, str(TEST_DIR))
+    os.chdir(TEST_DIR)
+    import xtts_app
+
+    xtts_app.socketio.run(xtts_app.app, host=host, port=port, allow_unsafe_werkzeug=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--rtf", type=float, default=0.6)
+    args = parser.parse_args()
+    serve_app(args.port, args.rtf)
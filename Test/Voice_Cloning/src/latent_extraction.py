@@ -0,0 +1,183 @@
+"""Per-clip XTTS conditioning latents: in-memory decode, process pool, content-hash cache.
+
+Each worker process loads XTTS once and handles whole clips (decode + both latent
+passes). Results are cached per clip under the SHA-256 of the file's bytes plus the
+extraction settings, so re-runs only touch new or changed recordings.
+"""
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vad import trim_reference
+
+LOAD_SR = 22050  # XTTS reads reference audio at 22.05 kHz
+MAX_REF_SECONDS = 30
+GPT_COND_LEN = 6
+GPT_COND_CHUNK_LEN = 6
+# Bump when anything that changes the latents changes
+EXTRACTION_SETTINGS = f"xtts_v2:sr={LOAD_SR}:ref={MAX_REF_SECONDS}:gpt={GPT_COND_LEN}x{GPT_COND_CHUNK_LEN}"
+# Voiced audio kept per clip after VAD: best-SNR segments of at most 8 s, 24 s in total
+VAD_BUDGET_SECONDS = 24.0
+VAD_MAX_SEGMENT_SECONDS = 8.0
+
+
+def vad_extraction_settings(budget_seconds: float = VAD_BUDGET_SECONDS,
+                            max_segment_seconds: float = VAD_MAX_SEGMENT_SECONDS, top_n: int = 0) -> str:
+    """Cache-key settings string for xtts_extract_vad with these trimming parameters"""
+    settings = f"{EXTRACTION_SETTINGS}:vad={budget_seconds}/{max_segment_seconds}"
+    return f"{settings}/top{top_n}" if top_n else settings
+
+
+VAD_EXTRACTION_SETTINGS = vad_extraction_settings()
+
+SUPPORTED_EXTS = (".wav", ".m4a", ".mp3")
+
+
+def find_audio_files(audio_dir) -> List[Path]:
+    return sorted(p for p in Path(audio_dir).iterdir() if p.suffix.lower() in SUPPORTED_EXTS)
+
+
+def content_hash(path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def decode_audio(path, sample_rate: int = LOAD_SR) -> np.ndarray:
+    """Mono float32 in [-1, 1] at `sample_rate`, decoded in memory (no temp WAVs)"""
+    from pydub import AudioSegment
+
+    segment = AudioSegment.from_file(path).set_channels(1).set_frame_rate(sample_rate)
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    return samples / float(1 << (8 * segment.sample_width - 1))
+
+
+# =============================
+# PER-CLIP CACHE
+# =============================
+class LatentCache:
+    """One .npz per clip at <dir>/<key[:2]>/<key>.npz"""
+
+    def __init__(self, cache_dir, settings: str = EXTRACTION_SETTINGS):
+        self.cache_dir = Path(cache_dir)
+        self.settings = settings
+
+    def key(self, digest: str) -> str:
+        return hashlib.sha256(f"{self.settings}\0{digest}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        try:
+            with np.load(self._path(key)) as data:
+                return {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, latents: Dict[str, np.ndarray]):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, **latents)
+        os.replace(tmp_path, path)
+
+
+# =============================
+# XTTS WORKERS
+# =============================
+_model = None
+
+
+def xtts_init(threads: int = 0):
+    """Process-pool initializer: one XTTS instance per worker"""
+    global _model
+    import torch
+    from TTS.api import TTS
+
+    if threads:
+        torch.set_num_threads(threads)
+    _model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").synthesizer.tts_model
+
+
+def xtts_latents_from_audio(model, audio: np.ndarray) -> Dict[str, np.ndarray]:
+    """`Xtts.get_conditioning_latents` for one clip, from samples instead of a path"""
+    import torch
+
+    with torch.inference_mode():
+        wav = torch.from_numpy(np.ascontiguousarray(audio[:LOAD_SR * MAX_REF_SECONDS]))[None].to(model.device)
+        speaker_embedding = model.get_speaker_embedding(wav, LOAD_SR)
+        gpt_cond_latent = model.get_gpt_cond_latents(wav, LOAD_SR, length=GPT_COND_LEN,
+                                                     chunk_length=GPT_COND_CHUNK_LEN)
+    return {
+        "gpt_cond_latent": gpt_cond_latent.cpu().numpy(),
+        "speaker_embedding": speaker_embedding.cpu().numpy(),
+    }
+
+
+def xtts_extract(path) -> Dict[str, np.ndarray]:
+    return xtts_latents_from_audio(_model, decode_audio(path))
+
+
+def xtts_extract_vad(path, budget_seconds: float = VAD_BUDGET_SECONDS,
+                     max_segment_seconds: float = VAD_MAX_SEGMENT_SECONDS, top_n: int = 0) -> Dict[str, np.ndarray]:
+    """Silence trimmed and only the cleanest voiced segments fed to XTTS (bind the
+    trimming parameters with functools.partial; it stays picklable for worker pools)"""
+    audio = trim_reference(decode_audio(path), LOAD_SR, budget_seconds=budget_seconds, top_n=top_n,
+                           max_seconds=max_segment_seconds)
+    return xtts_latents_from_audio(_model, audio)
+
+
+# =============================
+# PIPELINE
+# =============================
+def extract_latents(files: Sequence[Path], cache: Optional[LatentCache], workers: int = 0,
+                    init: Callable = xtts_init, extract: Callable = xtts_extract,
+                    threads_per_worker: int = 0,
+                    digests: Optional[Sequence[str]] = None) -> List[Tuple[Path, str, Dict[str, np.ndarray]]]:
+    """(path, content hash, latents) for every file, in input order.
+
+    Cached clips are read back; the rest run in `workers` processes (0 = in this process).
+    """
+    started = time.perf_counter()
+    digests = list(digests) if digests is not None else [content_hash(path) for path in files]
+    results: Dict[int, Dict[str, np.ndarray]] = {}
+    todo = []
+    for i, digest in enumerate(digests):
+        cached = cache.get(cache.key(digest)) if cache else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            todo.append(i)
+
+    if todo:
+        if workers > 0:
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo)), initializer=init,
+                                     initargs=(threads_per_worker,)) as pool:
+                outputs = pool.map(extract, [files[i] for i in todo])
+                for i, latents in zip(todo, outputs):
+                    results[i] = latents
+                    if cache:
+                        cache.put(cache.key(digests[i]), latents)
+        else:
+            init(threads_per_worker)
+            for i in todo:
+                results[i] = extract(files[i])
+                if cache:
+                    cache.put(cache.key(digests[i]), results[i])
+
+    print(f"[LATENTS] {len(files)} clips: {len(files) - len(todo)} cached, {len(todo)} extracted "
+          f"in {time.perf_counter() - started:.1f}s")
+    return [(files[i], digests[i], results[i]) for i in range(len(files))]
+
+
+def default_workers() -> int:
+    # Each worker holds a full XTTS model (~2 GB), so stay conservative
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
@@ -1,29 +1,44 @@
+import os
+import sys
+import time
 import torch
 import numpy as np
 import soundfile as sf
 from pathlib import Path
 from TTS.api import TTS
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from tts_runtime import load_latents  # noqa: E402
+from xtts_fast import fast_mode_from_env, precision_context, threads_from_env  # noqa: E402
+
 # ---------- PATHS ----------
-LATENTS_FILE = "/Users/jg/projects/ecameo/Voice_Cloning/src/jai_voice_latents.pt"
-OUTPUT_WAV = "/Users/jg/projects/ecameo/Voice_Cloning/Outputs/jai_voice_cloned.wav"
+BASE_DIR = Path(__file__).resolve().parents[1]
+# Written by speaker_embeddings.py, along with its .safetensors sibling
+LATENTS_FILE = os.getenv("XTTS_LATENTS", BASE_DIR / "src" / "jai_voice_latents.pt")
+OUTPUT_WAV = BASE_DIR / "Outputs" / "jai_voice_cloned.wav"
 
 Path(OUTPUT_WAV).parent.mkdir(parents=True, exist_ok=True)
 
 # ---------- LOAD MODEL ----------
+threads_from_env()  # TORCH_INTRA_THREADS / TORCH_INTER_THREADS, before the model exists
 tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
 xtts_model = tts.synthesizer.tts_model
+# XTTS_FAST=1 for int8 GPT / bf16 CPU inference
+fast_mode = fast_mode_from_env(xtts_model)
 
 # ---------- LOAD LATENTS ----------
-latents = torch.load(LATENTS_FILE, map_location="cpu")
+latents = load_latents(LATENTS_FILE)  # prefers a .safetensors sibling
 
 # ---------- INFERENCE ----------
-out = xtts_model.inference(
-    text="My name is Jai Goswami, and I am from Delhi, India.",
-    language="en",
-    gpt_cond_latent=latents["gpt_cond_latent"],
-    speaker_embedding=latents["speaker_embedding"],
-)
+start = time.perf_counter()
+with precision_context(fast_mode["bf16"]):
+    out = xtts_model.inference(
+        text="My name is Jai Goswami, and I am from Delhi, India.",
+        language="en",
+        gpt_cond_latent=latents["gpt_cond_latent"],
+        speaker_embedding=latents["speaker_embedding"],
+    )
+elapsed = time.perf_counter() - start
 
 # ---------- NORMALIZE OUTPUT (CRITICAL FIX) ----------
 # Handle dict output
@@ -55,3 +70,4 @@ wav = wav.astype(np.float32).flatten()
 # ---------- SAVE ----------
 sf.write(OUTPUT_WAV, wav, sr)
 print("Done →", OUTPUT_WAV)
+print(f"Synthesis {elapsed:.2f}s, RTF {elapsed / (len(wav) / sr):.2f}")
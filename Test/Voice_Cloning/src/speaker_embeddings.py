@@ -1,61 +1,93 @@
+import argparse
+import functools
+import sys
 import torch
 from pathlib import Path
-from pydub import AudioSegment
-from TTS.api import TTS
+
+from latent_extraction import (
+    EXTRACTION_SETTINGS,
+    VAD_BUDGET_SECONDS,
+    VAD_MAX_SEGMENT_SECONDS,
+    LatentCache,
+    content_hash,
+    default_workers,
+    extract_latents,
+    find_audio_files,
+    xtts_extract,
+    vad_extraction_settings,
+    xtts_extract_vad,
+)
+from voice_profile import VoiceProfile, clip_names
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from tts_runtime import save_latents  # noqa: E402
 
 # ---------- PATHS ----------
 BASE_DIR = Path(__file__).resolve().parents[1]
 AUDIO_DIR = BASE_DIR / "Raw_data"
-TMP_WAV_DIR = BASE_DIR / "src" / "tmp_wavs"
+CACHE_DIR = BASE_DIR / "src" / ".latent_cache"
+PROFILE_DIR = BASE_DIR / "src" / "voice_profile"
 OUTPUT_FILE = BASE_DIR / "src" / "jai_voice_latents.pt"
 
-TMP_WAV_DIR.mkdir(exist_ok=True)
-
-print("Audio directory :", AUDIO_DIR)
-
-# ---------- LOAD MODEL ----------
-tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-
-# ---------- COLLECT AUDIO ----------
-SUPPORTED_EXTS = ("*.wav", "*.m4a", "*.mp3", "*.M4A")
-audio_files = []
-for ext in SUPPORTED_EXTS:
-    audio_files.extend(AUDIO_DIR.glob(ext))
-
-print(f"Found {len(audio_files)} audio files")
-if not audio_files:
-    raise RuntimeError("No audio files found")
-
-# ---------- ACCESS INTERNAL XTTS MODEL ----------
-xtts_model = tts.synthesizer.tts_model
-
-speaker_embeddings = []
-gpt_cond_latent = None
-
-for audio_file in audio_files:
-    wav_path = TMP_WAV_DIR / f"{audio_file.stem}.wav"
-
-    AudioSegment.from_file(audio_file).export(wav_path, format="wav")
-
-    gpt_cond, speaker_emb = xtts_model.get_conditioning_latents(
-        audio_path=str(wav_path)
-    )
-
-    speaker_embeddings.append(speaker_emb)
-
-    if gpt_cond_latent is None:
-        gpt_cond_latent = gpt_cond  # take once
-
-# ---------- FINALIZE ----------
-speaker_embedding = torch.mean(torch.stack(speaker_embeddings), dim=0)
-speaker_embedding = speaker_embedding / torch.norm(speaker_embedding)
-
-torch.save(
-    {
-        "gpt_cond_latent": gpt_cond_latent,
-        "speaker_embedding": speaker_embedding,
-    },
-    OUTPUT_FILE,
-)
 
-print("Saved voice latents →", OUTPUT_FILE)
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--audio-dir", type=Path, default=AUDIO_DIR)
+    parser.add_argument("--workers", type=int, default=default_workers(), help="0 = extract in this process")
+    parser.add_argument("--threads-per-worker", type=int, default=0)
+    parser.add_argument("--no-vad", action="store_true", help="feed whole recordings, silence included")
+    parser.add_argument("--vad-budget", type=float, default=VAD_BUDGET_SECONDS,
+                        help="seconds of voiced audio kept per clip")
+    parser.add_argument("--vad-max-segment", type=float, default=VAD_MAX_SEGMENT_SECONDS,
+                        help="longest single voiced segment, in seconds")
+    parser.add_argument("--vad-top-n", type=int, default=0, help="keep at most this many segments (0 = no limit)")
+    parser.add_argument("--rebuild", action="store_true", help="start the profile over from every clip")
+    args = parser.parse_args()
+
+    print("Audio directory :", args.audio_dir)
+
+    # ---------- COLLECT AUDIO ----------
+    audio_files = find_audio_files(args.audio_dir)
+    print(f"Found {len(audio_files)} audio files")
+    if not audio_files:
+        raise RuntimeError("No audio files found")
+
+    # ---------- UPDATE PROFILE (only new clips are extracted, removed ones subtracted) ----------
+    # The settings string is part of every cache key, so every mode can share the cache
+    if args.no_vad:
+        settings, extract_clip = EXTRACTION_SETTINGS, xtts_extract
+    else:
+        settings = vad_extraction_settings(args.vad_budget, args.vad_max_segment, args.vad_top_n)
+        extract_clip = functools.partial(xtts_extract_vad, budget_seconds=args.vad_budget,
+                                         max_segment_seconds=args.vad_max_segment, top_n=args.vad_top_n)
+    cache = LatentCache(CACHE_DIR, settings)
+    profile = VoiceProfile(PROFILE_DIR, cache)
+    if args.rebuild:
+        profile.reset()
+    digests = [content_hash(path) for path in audio_files]
+    by_digest = dict(zip(digests, audio_files))
+
+    def extract(new_digests):
+        clips = extract_latents([by_digest[d] for d in new_digests], cache, workers=args.workers,
+                                extract=extract_clip,
+                                threads_per_worker=args.threads_per_worker, digests=new_digests)
+        return {digest: latents for _, digest, latents in clips}
+
+    changes = profile.sync(clip_names(audio_files, digests), extract)
+    print(f"Profile: +{changes['added']} -{changes['removed']} → {changes['clips']} clips")
+
+    version_path = profile.commit(save_latents)
+    if version_path is None:
+        print(f"Voice profile unchanged (v{profile.version})")
+        return
+
+    # ---------- PUBLISH ----------
+    latents = {key: torch.from_numpy(value) for key, value in profile.latents().items()}
+    torch.save(latents, OUTPUT_FILE)
+    save_latents(latents, OUTPUT_FILE.with_suffix(".safetensors"))
+    print("Saved voice profile version →", version_path)
+    print("Saved voice latents →", OUTPUT_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Energy-based voice activity detection for reference clips, vectorized in NumPy.
+
+Frames are scored by RMS level in dB against an adaptive noise floor (a low
+percentile of the clip's own frame levels). The voiced mask is closed over short
+pauses and opened to drop clicks, cut into segments of at most `max_seconds`, and
+the segments with the best SNR are kept until the duration budget is spent.
+"""
+from typing import List, NamedTuple
+
+import numpy as np
+
+FRAME_MS = 30
+HOP_MS = 10
+
+
+class Segment(NamedTuple):
+    start: int  # samples
+    end: int
+    snr_db: float
+
+
+def frame_levels_db(audio: np.ndarray, sample_rate: int, frame_ms: int = FRAME_MS,
+                    hop_ms: int = HOP_MS) -> np.ndarray:
+    frame = sample_rate * frame_ms // 1000
+    hop = sample_rate * hop_ms // 1000
+    if len(audio) < frame:
+        audio = np.pad(audio, (0, frame - len(audio)))
+    frames = np.lib.stride_tricks.sliding_window_view(audio, frame)[::hop]
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+def _run_filter(mask: np.ndarray, width: int, fill: bool) -> np.ndarray:
+    """Binary closing (fill=True: bridge gaps up to `width` frames) or opening (drop runs shorter)"""
+    if width <= 1:
+        return mask
+    kernel = np.ones(width, dtype=np.int32)
+    target = mask if fill else ~mask
+    # dilate then erode the target runs
+    dilated = np.convolve(target.astype(np.int32), kernel, mode="same") > 0
+    eroded = np.convolve((~dilated).astype(np.int32), kernel, mode="same") == 0
+    return eroded if fill else ~eroded
+
+
+def voiced_segments(audio: np.ndarray, sample_rate: int, margin_db: float = 12.0,
+                    min_speech_ms: int = 150, max_pause_ms: int = 300, max_seconds: float = 8.0,
+                    min_seconds: float = 1.0, floor_percentile: float = 10.0) -> List[Segment]:
+    levels = frame_levels_db(audio, sample_rate)
+    noise_floor = np.percentile(levels, floor_percentile)
+    mask = levels > max(noise_floor + margin_db, levels.max() - 50)
+    mask = _run_filter(mask, max_pause_ms // HOP_MS, fill=True)
+    mask = _run_filter(mask, min_speech_ms // HOP_MS, fill=False)
+
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    hop = sample_rate * HOP_MS // 1000
+    frame = sample_rate * FRAME_MS // 1000
+    max_frames = max(1, int(max_seconds * 1000 // HOP_MS))
+    min_frames = int(min_seconds * 1000 // HOP_MS)
+
+    segments = []
+    for start, end in zip(starts, ends):
+        for piece_start in range(start, end, max_frames):
+            piece_end = min(piece_start + max_frames, end)
+            if piece_end - piece_start < min_frames:
+                continue
+            # mean power in dB over the piece, relative to the floor
+            power = np.mean(10 ** (levels[piece_start:piece_end] / 10))
+            segments.append(Segment(
+                int(piece_start * hop),
+                int(min(len(audio), (piece_end - 1) * hop + frame)),
+                float(10 * np.log10(power) - noise_floor),
+            ))
+    return segments
+
+
+def select_segments(segments: List[Segment], sample_rate: int, budget_seconds: float = 24.0,
+                    top_n: int = 0) -> List[Segment]:
+    """Best-SNR segments that fit the budget (at most `top_n` if set), back in time order"""
+    budget = int(budget_seconds * sample_rate)
+    chosen, used = [], 0
+    for segment in sorted(segments, key=lambda s: s.snr_db, reverse=True):
+        length = segment.end - segment.start
+        if used + length > budget:
+            continue
+        chosen.append(segment)
+        used += length
+        if top_n and len(chosen) >= top_n:
+            break
+    return sorted(chosen)
+
+
+def trim_reference(audio: np.ndarray, sample_rate: int, budget_seconds: float = 24.0, top_n: int = 0,
+                   **segment_kwargs) -> np.ndarray:
+    """Selected voiced audio concatenated; the whole clip if nothing qualifies"""
+    chosen = select_segments(voiced_segments(audio, sample_rate, **segment_kwargs), sample_rate,
+                             budget_seconds, top_n)
+    if not chosen:
+        return audio
+    return np.concatenate([audio[s.start:s.end] for s in chosen])
@@ -0,0 +1,163 @@
+"""Incremental voice profile: running sums over per-clip latents, versioned outputs.
+
+The profile keeps float64 sums of every member clip's speaker embedding and GPT
+conditioning latent, so adding a clip costs one extraction and removing one costs
+none. Per-clip latents live in the shared LatentCache (needed to subtract a clip
+back out). The published voice is the normalized mean speaker embedding and the
+mean conditioning latent; every change is written as a new numbered version.
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from latent_extraction import LatentCache
+
+LATENT_KEYS = ("gpt_cond_latent", "speaker_embedding")
+
+
+class VoiceProfile:
+    def __init__(self, root, cache: LatentCache):
+        self.root = Path(root)
+        self.cache = cache
+        self.versions_dir = self.root / "versions"
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        self.clips: Dict[str, str] = {}  # content hash -> clip name
+        self.sums: Dict[str, np.ndarray] = {}
+        self.version = 0
+        self._dirty = False
+        self._load()
+
+    @property
+    def count(self) -> int:
+        return len(self.clips)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.clips
+
+    def add(self, digest: str, latents: Dict[str, np.ndarray], name: str = "") -> bool:
+        if digest in self.clips:
+            return False
+        for key in LATENT_KEYS:
+            value = np.asarray(latents[key], dtype=np.float64)
+            self.sums[key] = self.sums[key] + value if key in self.sums else value.copy()
+        self.clips[digest] = name
+        self._dirty = True
+        return True
+
+    def remove(self, digest: str) -> bool:
+        if digest not in self.clips:
+            return False
+        latents = self.cache.get(self.cache.key(digest))
+        del self.clips[digest]
+        if not self.clips:
+            self.sums = {}
+        elif latents is None:
+            print(f"[PROFILE] Latents for {digest[:12]} are gone from the cache; rebuilding sums")
+            self._rebuild()
+        else:
+            for key in LATENT_KEYS:
+                self.sums[key] -= latents[key]
+        self._dirty = True
+        return True
+
+    def reset(self):
+        """Drop every member; the version counter keeps going"""
+        self.clips = {}
+        self.sums = {}
+        self._dirty = True
+
+    def sync(self, present: Dict[str, str], extract) -> Dict[str, int]:
+        """Match membership to `present` (content hash -> name).
+
+        `extract(digests)` is called once with only the new hashes and returns
+        {digest: latents}; clips that disappeared are subtracted without any model call.
+        """
+        removed = [d for d in self.clips if d not in present]
+        for digest in removed:
+            self.remove(digest)
+        new = [d for d in present if d not in self.clips]
+        if new:
+            for digest, latents in extract(new).items():
+                self.add(digest, latents, present[digest])
+        return {"added": len(new), "removed": len(removed), "clips": self.count}
+
+    def latents(self) -> Dict[str, np.ndarray]:
+        if not self.clips:
+            raise RuntimeError("Voice profile has no clips")
+        speaker = self.sums["speaker_embedding"] / self.count
+        return {
+            "gpt_cond_latent": (self.sums["gpt_cond_latent"] / self.count).astype(np.float32),
+            "speaker_embedding": (speaker / np.linalg.norm(speaker)).astype(np.float32),
+        }
+
+    def commit(self, save_latents) -> Optional[Path]:
+        """Write a new version if membership changed; `save_latents(latents, path)` writes the file"""
+        if not self._dirty:
+            return None
+        self.version += 1
+        path = self.versions_dir / f"voice_v{self.version:04d}.safetensors"
+        save_latents(self.latents(), path)
+        manifest = {"version": self.version, "created": time.time(), "clips": self.clips}
+        (self.versions_dir / f"voice_v{self.version:04d}.json").write_text(json.dumps(manifest, indent=2))
+        self._save()
+        self._dirty = False
+        return path
+
+    # ---------- persistence ----------
+    def _state_path(self) -> Path:
+        return self.root / "profile.json"
+
+    def _sums_path(self) -> Path:
+        return self.root / "sums.npz"
+
+    def _save(self):
+        tmp_sums = self.root / "sums.tmp.npz"
+        np.savez(tmp_sums, **self.sums)
+        os.replace(tmp_sums, self._sums_path())
+        tmp_state = self._state_path().with_suffix(".tmp")
+        tmp_state.write_text(json.dumps({"version": self.version, "settings": self.cache.settings,
+                                          "count": self.count, "clips": self.clips}))
+        os.replace(tmp_state, self._state_path())
+
+    def _load(self):
+        try:
+            state = json.loads(self._state_path().read_text())
+        except (OSError, ValueError):
+            return
+        self.version = state["version"]
+        if state.get("settings", self.cache.settings) != self.cache.settings:
+            # Latents from different extraction settings don't mix; re-add every clip
+            print("[PROFILE] Extraction settings changed; rebuilding from scratch")
+            self._dirty = True
+            return
+        self.clips = state["clips"]
+        try:
+            with np.load(self._sums_path()) as data:
+                self.sums = {key: data[key] for key in data.files}
+        except (OSError, ValueError):
+            self.sums = {}
+        if self.clips and (state.get("count") != self.count or set(self.sums) != set(LATENT_KEYS)):
+            print("[PROFILE] Sums out of step with the clip list; rebuilding")
+            self._rebuild()
+
+    def _rebuild(self):
+        """Recompute sums from cached per-clip latents; members whose latents are gone are dropped"""
+        sums: Dict[str, np.ndarray] = {}
+        for digest in list(self.clips):
+            latents = self.cache.get(self.cache.key(digest))
+            if latents is None:
+                del self.clips[digest]
+                continue
+            for key in LATENT_KEYS:
+                value = np.asarray(latents[key], dtype=np.float64)
+                sums[key] = sums[key] + value if key in sums else value.copy()
+        self.sums = sums
+        self._dirty = True
+
+
+def clip_names(paths: Iterable[Path], digests: Iterable[str]) -> Dict[str, str]:
+    return {digest: path.name for path, digest in zip(paths, digests)}
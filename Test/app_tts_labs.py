@@ -1,30 +1,61 @@
 import os
+import sys
 import json
-import queue
-import threading
+import time
+import itertools
 import base64
-from typing import List, Dict, Optional
+from typing import Dict, Optional
 from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 from dotenv import load_dotenv
 from openai import OpenAI
 from pypdf import PdfReader
 from pydantic import BaseModel, Field
-import torch
-import numpy as np
 from pathlib import Path
 from elevenlabs.client import ElevenLabs
-from elevenlabs.play import play
-import re
-import io
-import wave
+from audio_cache import AudioCache, audio_key, voice_digest
+from audio_transport import negotiate
+from chunk_policy import ELEVENLABS_PROFILE, AdaptiveChunker, RTFEstimator
+from elevenlabs_stream import ElevenLabsStreamer
+from sentence_buffer import SentenceBuffer, split_sentences
+from tts_pipeline import TTSWorkerPool
+# Request tracing and the /metrics format are shared with the main app in src/
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+from metrics import (  # noqa: E402
+    REQUEST_ID_HEADER, RTF_BUCKETS, Metrics, RequestTrace, format_timings, request_id_from,
+)
+from session_store import SessionMemory  # noqa: E402
+from answer_cache import AnswerCache, split_for_replay, text_digest  # noqa: E402
+from faq_bank import DEFAULT_THRESHOLD, build_bank, llm_answerer, open_bank  # noqa: E402
+from single_flight import SingleFlight  # noqa: E402
 
 # =============================
 # CONFIG
 # =============================
 load_dotenv(override=True)
 MODEL = "gpt-4o-mini"
-MAX_QNA_PAIRS = 5
+# Recent turns stay verbatim within this many tokens; older ones fold into a short summary
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 1200))
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", 200))
+TTS_CLAUSE_MIN_CHARS = int(os.getenv("TTS_CLAUSE_MIN_CHARS", 0))  # >0 also splits at , ; : past this length
+# "adaptive": short opener, then chunks sized to the measured RTF and buffered playback
+TTS_CHUNK_POLICY = os.getenv("TTS_CHUNK_POLICY", "sentence")
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", Path(__file__).parent / ".audio_cache")
+AUDIO_CACHE_MEMORY_MB = int(os.getenv("AUDIO_CACHE_MEMORY_MB", 64))
+AUDIO_CACHE_DISK_MB = int(os.getenv("AUDIO_CACHE_DISK_MB", 512))
+# Forward MP3 frames as ElevenLabs produces them instead of waiting for the whole file
+ELEVENLABS_STREAMING = os.getenv("ELEVENLABS_STREAMING", "1") == "1"
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL")  # e.g. a local fake_elevenlabs.py
+ELEVENLABS_MAX_CONNECTIONS = int(os.getenv("ELEVENLABS_MAX_CONNECTIONS", 4))
+ELEVENLABS_TIMEOUT = float(os.getenv("ELEVENLABS_TIMEOUT", 15))
+# Sentences synthesized at once across all sessions; keep within the plan's concurrency limit
+ELEVENLABS_CONCURRENCY = int(os.getenv("ELEVENLABS_CONCURRENCY", 3))
+ELEVENLABS_RETRIES = int(os.getenv("ELEVENLABS_RETRIES", 3))
+# Identical questions asked at the same time share one LLM stream and one synthesis
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") == "1"
+# Precomputed FAQ answers + audio, built with: python src/faq_bank.py build --app elevenlabs --out <path>
+FAQ_BANK_PATH = os.getenv("FAQ_BANK_PATH")
+FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", DEFAULT_THRESHOLD))
 client = ElevenLabs(
     api_key=os.getenv("ELEVENLABS_API_KEY")
 )
@@ -46,7 +77,11 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 # =============================
 # LOAD LINKEDIN PDF
 # =============================
-reader = PdfReader("/Users/jg/projects/ecameo/LLM/Me/linkedin.pdf")
+# Same profile files and env overrides as src/app.py
+Base_dir = Path(__file__).parent.parent
+linkedin_path = os.getenv("LINKEDIN_PDF_PATH", Base_dir / "src" / "Me" / "linkedin.pdf")
+summary_path = os.getenv("SUMMARY_TXT_PATH", Base_dir / "src" / "Me" / "summary.txt")
+reader = PdfReader(linkedin_path)
 linkedin = ""
 for page in reader.pages:
     text = page.extract_text()
@@ -56,7 +91,7 @@ for page in reader.pages:
 # =============================
 # LOAD TEXTUAL INFO
 # =============================
-with open("/Users/jg/projects/ecameo/LLM/Me/summary.txt", "r") as f:
+with open(summary_path, "r") as f:
     summary = f.read()
 
 name = "Jai Goswami"
@@ -143,41 +178,75 @@ TOOLS = [
 # =============================
 # SESSION MEMORY
 # =============================
-class SessionMemory:
-    def __init__(self):
-        self.messages: List[Dict] = []
-
-    def add(self, role, content):
-        self.messages.append({"role": role, "content": content})
-        self.messages = self.messages[-MAX_QNA_PAIRS * 2:]
-
-    def get(self):
-        return self.messages
-
-    def summary(self):
-        out = []
-        for i in range(0, len(self.messages), 2):
-            q = self.messages[i]["content"]
-            a = self.messages[i + 1]["content"]
-            out.append(f"Q: {q}\nA: {a}")
-        return "\n".join(out)
-
-
 # Global session (in production, use session management)
-session = SessionMemory()
+session = SessionMemory(max_tokens=HISTORY_TOKEN_BUDGET, max_summary_tokens=HISTORY_SUMMARY_TOKENS)
+system_prompt_digest = text_digest(system_prompt)
+single_flight = SingleFlight()
+# Near-duplicates of the expected FAQ are answered from an offline-built bundle
+faq_bank = open_bank(FAQ_BANK_PATH, system_prompt_digest, threshold=FAQ_MATCH_THRESHOLD)
 
 # =============================
 # TTS PROCESSOR FOR WEB
 # =============================
 class WebTTSProcessor:
-    def __init__(self, model, voice_id, output_format):
+    def __init__(self, model, voice_id, output_format, cache: Optional[AudioCache] = None,
+                 rtf: Optional[RTFEstimator] = None, streamer: Optional[ElevenLabsStreamer] = None):
         self.model = model
         self.voice_id = voice_id
         self.output_format = output_format
         self.sample_rate = 44100  # Add this line
+        self.bitrate = int(output_format.rsplit("_", 1)[-1]) * 1000  # mp3_44100_128 -> 128 kbps
+        self.cache = cache
+        self.rtf = rtf
+        self.streamer = streamer
+        self.voice = voice_digest(voice_id, model, output_format)
 
     def process_text_to_speech(self, text: str) -> bytes:
-        """Convert text to speech and return audio bytes"""
+        """Convert text to speech and return audio bytes (served from the audio cache when possible)"""
+        key = audio_key(text, "en", "elevenlabs", self.voice)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached[:]
+        started = time.perf_counter()
+        audio_bytes = self._synthesize(text)
+        if self.rtf is not None:
+            self.rtf.observe(len(text), time.perf_counter() - started, self.audio_seconds(audio_bytes))
+        if self.cache is not None and audio_bytes:
+            self.cache.put(key, audio_bytes)
+        return audio_bytes
+
+    def stream_text_to_speech(self, text: str):
+        """Yield MP3 blocks as they arrive (one block for a cache hit)"""
+        key = audio_key(text, "en", "elevenlabs", self.voice)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached[:]
+                return
+        started = time.perf_counter()
+        blocks = []
+        try:
+            for block in self.streamer.stream(text):
+                blocks.append(block)
+                yield block
+        except Exception as e:
+            print(f"[TTS ERROR] Failed to stream audio: {e}")
+            return
+        # Only complete syntheses are measured and cached
+        audio_bytes = b''.join(blocks)
+        if self.rtf is not None:
+            self.rtf.observe(len(text), time.perf_counter() - started, self.audio_seconds(audio_bytes))
+        if self.cache is not None and audio_bytes:
+            self.cache.put(key, audio_bytes)
+    
+    def _synthesize(self, text: str) -> bytes:
+        if self.streamer is not None:
+            try:
+                return b''.join(self.streamer.stream(text))
+            except Exception as e:
+                print(f"[TTS ERROR] Failed to generate audio: {e}")
+                return b''
         try:
             # ElevenLabs returns an iterator of audio chunks
             audio_stream = client.text_to_speech.convert(
@@ -195,64 +264,233 @@ class WebTTSProcessor:
             print(f"[TTS ERROR] Failed to generate audio: {e}")
             return b''
     
+    def audio_seconds(self, audio_bytes) -> float:
+        """Constant-bitrate MP3, so duration follows from size"""
+        return len(audio_bytes) * 8 / self.bitrate
+    
     def audio_to_base64(self, audio_bytes: bytes) -> str:
         """Convert audio bytes to base64"""
         return base64.b64encode(audio_bytes).decode('utf-8')
-
-
-class SentenceBuffer:
-    """Buffers streaming text and detects complete sentences"""
-    
-    def __init__(self):
-        self.buffer = ""
-        self.sentence_pattern = re.compile(r'([.!?]+)(?:\s+|$)')
     
-    def add_text(self, text: str) -> List[str]:
-        """Add text to buffer and return any complete sentences"""
-        self.buffer += text
-        sentences = []
-        
-        matches = list(self.sentence_pattern.finditer(self.buffer))
-        
-        if matches:
-            last_match = matches[-1]
-            end_pos = last_match.end()
-            
-            completed = self.buffer[:end_pos]
-            self.buffer = self.buffer[end_pos:]
-            
-            sentence_parts = self.sentence_pattern.split(completed)
-            
-            for i in range(0, len(sentence_parts) - 1, 2):
-                if sentence_parts[i].strip():
-                    sentence = sentence_parts[i].strip() + sentence_parts[i + 1]
-                    sentences.append(sentence)
-        
-        return sentences
-    
-    def flush(self) -> Optional[str]:
-        """Get any remaining text in buffer"""
-        if self.buffer.strip():
-            remaining = self.buffer.strip()
-            self.buffer = ""
-            return remaining
-        return None
+    def audio_payload(self, audio_bytes: bytes, binary: bool) -> Dict:
+        """ElevenLabs already returns MP3, so binary clients get the bytes untouched"""
+        audio = audio_bytes if binary else self.audio_to_base64(audio_bytes)
+        return {'audio': audio, 'format': 'mp3' if binary else 'mp3-b64', 'mime': 'audio/mpeg'}
 
 
 # =============================
 # WEBSOCKET HANDLERS
 # =============================
-tts_processor = WebTTSProcessor("eleven_multilingual_v2", "QtEl85LECywm4BDbmbXB", "mp3_44100_128")
+audio_cache = AudioCache(
+    disk_dir=AUDIO_CACHE_DIR,
+    max_memory_bytes=AUDIO_CACHE_MEMORY_MB << 20,
+    max_disk_bytes=AUDIO_CACHE_DISK_MB << 20,
+)
+metrics = Metrics()
+tts_rtf = RTFEstimator(ELEVENLABS_PROFILE, histogram=metrics.histogram(
+    "tts_rtf", "Synthesis seconds per audio second, per chunk", RTF_BUCKETS))
+# One pooled keep-alive client shared by every session
+tts_streamer = ElevenLabsStreamer(
+    os.getenv("ELEVENLABS_API_KEY"),
+    "QtEl85LECywm4BDbmbXB",
+    "eleven_multilingual_v2",
+    "mp3_44100_128",
+    base_url=ELEVENLABS_BASE_URL,
+    max_connections=ELEVENLABS_MAX_CONNECTIONS,
+    timeout=ELEVENLABS_TIMEOUT,
+    max_concurrent=ELEVENLABS_CONCURRENCY,
+    retries=ELEVENLABS_RETRIES,
+) if ELEVENLABS_STREAMING else None
+tts_processor = WebTTSProcessor("eleven_multilingual_v2", "QtEl85LECywm4BDbmbXB", "mp3_44100_128",
+                                cache=audio_cache, rtf=tts_rtf, streamer=tts_streamer)
+# Sentence N+1, N+2, ... are requested while N is still streaming; blocks are re-ordered by seq
+tts_pool = TTSWorkerPool(
+    tts_processor.stream_text_to_speech if tts_streamer else tts_processor.process_text_to_speech,
+    workers=ELEVENLABS_CONCURRENCY,
+    streaming=tts_streamer is not None,
+    wait_histogram=metrics.histogram("tts_queue_wait_seconds", "Time a sentence waits for a TTS worker"),
+)
+
+
+def build_faq_bank(faqs, path):
+    """Offline step: answer each FAQ through this app's prompt and voice it with the ElevenLabs voice"""
+    return build_bank(
+        faqs,
+        llm_answerer(openai_client, MODEL, lambda question: system_prompt),
+        path,
+        system_prompt_digest,
+        split=lambda text: split_sentences(text, TTS_CLAUSE_MIN_CHARS),
+        synthesize=tts_processor.process_text_to_speech,
+        voice=tts_processor.voice,
+        audio_format="mp3",
+        sample_rate=tts_processor.sample_rate,
+    )
+
+# Sockets that negotiated binary MP3; everyone else keeps base64 strings
+binary_audio_clients = set()
+
+def wants_binary_mp3(formats) -> bool:
+    return negotiate(formats, ["mp3"]) == "mp3"
+
+# X-Request-ID sent with the Socket.IO handshake (e.g. by a proxy) names the connection;
+# its n-th answer is traced as "<that id>.<n>". Other connections get a fresh id per answer.
+connection_request_ids: Dict[str, tuple] = {}
+
+def socket_request_id(sid) -> Optional[str]:
+    entry = connection_request_ids.get(sid)
+    if entry is None:
+        return None
+    base, answers = entry
+    return f"{base}.{next(answers)}"
 
 @socketio.on('connect')
 def handle_connect():
+    header = request.headers.get(REQUEST_ID_HEADER)
+    if header:
+        connection_request_ids[request.sid] = (request_id_from(header), itertools.count(1))
     print('Client connected')
     emit('status', {'message': 'Connected to Jai\'s eCameo'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    connection_request_ids.pop(request.sid, None)
+    binary_audio_clients.discard(request.sid)
     print('Client disconnected')
 
+@socketio.on('negotiate_audio')
+def handle_negotiate_audio(data):
+    """Client sends its playable formats in preference order, e.g. ["opus", "mp3", "wav"]"""
+    if wants_binary_mp3(data.get('formats')):
+        binary_audio_clients.add(request.sid)
+        emit('audio_format', {'format': 'mp3', 'mime': 'audio/mpeg'})
+    else:
+        binary_audio_clients.discard(request.sid)
+        emit('audio_format', {'format': 'mp3-b64', 'mime': 'audio/mpeg'})
+
+def serve_faq(entry, user_input, trace, binary_audio):
+    """Replay a precomputed FAQ answer; its MP3 comes from the bundle when built for this voice"""
+    request_id = trace.request_id
+    sid = request.sid
+    bundled = faq_bank.audio_format == "mp3" and faq_bank.voice == tts_processor.voice
+    audio_stream = None
+    if not bundled:
+        # Text-only bundle or another voice: voice the stored answer live
+        def emit_audio(seq, sentence, audio, part=0):
+            trace.audio()
+            payload = tts_processor.audio_payload(audio, binary_audio)
+            payload.update({'text': sentence if part == 0 else '', 'seq': seq, 'part': part,
+                            'request_id': request_id})
+            socketio.emit('audio_chunk', payload, to=sid)
+        
+        audio_stream = tts_pool.open_stream(emit_audio)
+    
+    trace.token()  # first token only: replayed pieces say nothing about throughput
+    for piece in split_for_replay(entry["answer"]):
+        emit('text_chunk', {'text': piece, 'request_id': request_id})
+    
+    for seq, sentence in enumerate(entry["sentences"]):
+        if audio_stream:
+            audio_stream.submit(sentence["text"])
+        elif sentence["length"]:
+            trace.audio()
+            payload = tts_processor.audio_payload(faq_bank.audio(sentence), binary_audio)
+            emit('audio_chunk', dict(payload, text=sentence["text"], seq=seq, part=0, request_id=request_id))
+    if audio_stream:
+        audio_stream.finish(timeout=ELEVENLABS_TIMEOUT * (ELEVENLABS_RETRIES + 1))
+    
+    session.add("user", user_input)
+    session.add("assistant", entry["answer"])
+    print(f"[CHAT {request_id}] Response replayed from faq ({entry['id']}): {format_timings(trace.finish('faq'))}")
+    emit('response_end', {'request_id': request_id})
+
+
+def generate_answer(user_input, messages, flight):
+    """Producer for one answer: LLM stream plus TTS, published to every follower.
+
+    Items are ('text_chunk', {...}) and ('audio_chunk', {'audio': mp3, ...}) in
+    emission order; each follower packs audio for its own transport. Tool calls
+    come back in the result so followers can send them after response_end.
+    """
+    chunker = AdaptiveChunker(tts_rtf) if TTS_CHUNK_POLICY == "adaptive" else None
+    sentence_buffer = chunker or SentenceBuffer(clause_min_chars=TTS_CLAUSE_MIN_CHARS)
+    
+    def emit_audio(seq, sentence, audio, part=0):
+        if chunker:
+            chunker.on_audio(tts_processor.audio_seconds(audio), len(sentence) if part == 0 else 0)
+        # Send both audio AND the text it represents for subtitle sync (first block only)
+        flight.publish(('audio_chunk', {'audio': audio, 'text': sentence if part == 0 else '',
+                                        'seq': seq, 'part': part, 'encoded': {}}))
+    
+    audio_stream = tts_pool.open_stream(emit_audio)
+    
+    stream = openai_client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        tools=TOOLS,
+        stream=True,
+    )
+    
+    full_response = ""
+    tool_calls = []
+    
+    for chunk in stream:
+        if chunk.choices[0].delta.content:
+            content = chunk.choices[0].delta.content
+            full_response += content
+            flight.publish(('text_chunk', {'text': content}))
+            
+            # Check for complete sentences and generate audio
+            complete_sentences = sentence_buffer.add_text(content)
+            for sentence in complete_sentences:
+                audio_stream.submit(sentence)
+        
+        # Check for tool calls
+        if chunk.choices[0].delta.tool_calls:
+            for tool_call_delta in chunk.choices[0].delta.tool_calls:
+                if tool_call_delta.index is not None:
+                    # New tool call
+                    if len(tool_calls) <= tool_call_delta.index:
+                        tool_calls.append({
+                            "id": tool_call_delta.id,
+                            "name": tool_call_delta.function.name if tool_call_delta.function.name else "",
+                            "arguments": tool_call_delta.function.arguments if tool_call_delta.function.arguments else ""
+                        })
+                    else:
+                        # Append to existing tool call
+                        if tool_call_delta.function.arguments:
+                            tool_calls[tool_call_delta.index]["arguments"] += tool_call_delta.function.arguments
+    
+    # Handle remaining text
+    if not tool_calls:
+        remaining = sentence_buffer.flush()
+        if remaining:
+            audio_stream.submit(remaining)
+    
+    # Every audio_chunk goes out before response_end
+    tts_stats = audio_stream.finish(timeout=ELEVENLABS_TIMEOUT * (ELEVENLABS_RETRIES + 1))
+    if tts_stats["time_to_first_audio"] is not None:
+        print(f"[TTS] {tts_stats['sentences']} sentences for {flight.subscribers} listener(s), "
+              f"queue wait {tts_stats['queue_wait'] * 1000:.0f} ms")
+    
+    # Update session (once, however many visitors shared this answer)
+    tool_payloads = []
+    if not tool_calls:
+        session.add("user", user_input)
+        session.add("assistant", full_response.strip())
+    else:
+        # Handle tool calls
+        for tool_call in tool_calls:
+            try:
+                args = json.loads(tool_call["arguments"])
+                tool_payloads.append({
+                    "tool": tool_call["name"],
+                    "data": args,
+                })
+            except json.JSONDecodeError as e:
+                print(f"Error parsing tool call arguments: {e}")
+    return {"text": full_response, "tool_calls": tool_payloads}
+
+
 @socketio.on('send_message')
 def handle_message(data):
     user_input = data.get('message', '').strip()
@@ -260,101 +498,84 @@ def handle_message(data):
     if not user_input:
         return
     
+    # Every event of this answer carries its request id
+    trace = RequestTrace(metrics, socket_request_id(request.sid))
+    request_id = trace.request_id
+    
     # Signal that we're starting to respond
-    emit('response_start', {})
+    emit('response_start', {'request_id': request_id})
     
+    if data.get('audio_formats') and wants_binary_mp3(data['audio_formats']):
+        binary_audio_clients.add(request.sid)
+    sid = request.sid
+    binary_audio = sid in binary_audio_clients
+    
+    history = session.get()
     messages = [{"role": "system", "content": system_prompt}]
-    messages.extend(session.get())
+    messages.extend(history)
     messages.append({"role": "user", "content": user_input})
     
     try:
-        stream = openai_client.chat.completions.create(
-            model=MODEL,
-            messages=messages,
-            tools=TOOLS,
-            stream=True,
-        )
+        faq_entry = faq_bank.match(user_input) if faq_bank else None
+        if faq_entry is not None:
+            serve_faq(faq_entry, user_input, trace, binary_audio)
+            return
         
-        full_response = ""
-        tool_calls = []
-        sentence_buffer = SentenceBuffer()
-        current_tool_call = None
+        # Visitors asking the same question in the same context share one answer
+        key = AnswerCache.make_key(user_input, system_prompt_digest, history) if SINGLE_FLIGHT else None
+        flight, leader = single_flight.join(key, lambda flight: generate_answer(user_input, messages, flight))
         
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
-                full_response += content
-                
-                # Send text to client
-                emit('text_chunk', {'text': content})
-                
-                # Check for complete sentences and generate audio
-                complete_sentences = sentence_buffer.add_text(content)
-                for sentence in complete_sentences:
-                    audio = tts_processor.process_text_to_speech(sentence)
-                    if len(audio) > 0:
-                        audio_b64 = tts_processor.audio_to_base64(audio)
-                        # Send both audio AND the text it represents for subtitle sync
-                        emit('audio_chunk', {'audio': audio_b64, 'text': sentence})
-            
-            # Check for tool calls
-            if chunk.choices[0].delta.tool_calls:
-                for tool_call_delta in chunk.choices[0].delta.tool_calls:
-                    if tool_call_delta.index is not None:
-                        # New tool call
-                        if len(tool_calls) <= tool_call_delta.index:
-                            tool_calls.append({
-                                "id": tool_call_delta.id,
-                                "name": tool_call_delta.function.name if tool_call_delta.function.name else "",
-                                "arguments": tool_call_delta.function.arguments if tool_call_delta.function.arguments else ""
-                            })
-                        else:
-                            # Append to existing tool call
-                            if tool_call_delta.function.arguments:
-                                tool_calls[tool_call_delta.index]["arguments"] += tool_call_delta.function.arguments
+        for event, payload in flight.follow():
+            if event == 'audio_chunk':
+                trace.audio()
+                # Followers with the same transport share one packed payload
+                packed = payload['encoded'].get(binary_audio)
+                if packed is None:
+                    packed = payload['encoded'][binary_audio] = tts_processor.audio_payload(payload['audio'], binary_audio)
+                out = dict(packed, text=payload['text'], seq=payload['seq'], part=payload['part'])
+            else:
+                trace.token()
+                out = dict(payload)
+            out['request_id'] = request_id
+            emit(event, out)
         
-        # Handle remaining text
-        if not tool_calls:
-            remaining = sentence_buffer.flush()
-            if remaining:
-                audio = tts_processor.process_text_to_speech(remaining)
-                if len(audio) > 0:
-                    audio_b64 = tts_processor.audio_to_base64(audio)
-                    # Send both audio AND text for subtitle sync
-                    emit('audio_chunk', {'audio': audio_b64, 'text': remaining})
+        source = 'openai' if leader else 'coalesced'
+        print(f"[CHAT {request_id}] Response complete ({source}): {format_timings(trace.finish(source))}")
         
         # Signal completion
-        emit('response_end', {})
+        emit('response_end', {'request_id': request_id})
         
-        # Update session
-        if not tool_calls:
-            session.add("user", user_input)
-            session.add("assistant", full_response.strip())
-        else:
-            # Handle tool calls
-            for tool_call in tool_calls:
-                try:
-                    args = json.loads(tool_call["arguments"])
-                    payload = {
-                        "tool": tool_call["name"],
-                        "data": args,
-                    }
-                    emit('tool_call', payload)
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing tool call arguments: {e}")
+        for payload in flight.result["tool_calls"]:
+            emit('tool_call', dict(payload, request_id=request_id))
             
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error [{request_id}]: {e}")
         import traceback
         traceback.print_exc()
-        emit('error', {'message': str(e)})
+        trace.finish('error')
+        emit('error', {'message': str(e), 'request_id': request_id})
 
 # =============================
 # ROUTES
 # =============================
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of the request and TTS histograms"""
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/faq/stats')
+def faq_stats():
+    """Questions answered from the FAQ bank vs routed to the LLM"""
+    return jsonify(faq_bank.stats() if faq_bank else {'enabled': False})
+
+@app.route('/inflight/stats')
+def inflight_stats():
+    """Answers started vs messages that joined one already in flight"""
+    return jsonify(single_flight.stats())
+
 if __name__ == '__main__':
     socketio.run(app, debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -0,0 +1,169 @@
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+
+def normalize_text(text: str) -> str:
+    """NFC + collapsed whitespace; case and punctuation are kept because they change prosody"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def voice_digest(*parts) -> str:
+    """Stable hash of whatever identifies a voice: latent tensors, arrays, ids, settings"""
+    h = hashlib.sha256()
+    for part in parts:
+        if hasattr(part, "detach"):
+            part = part.detach().cpu().numpy()
+        if hasattr(part, "tobytes"):
+            h.update(str(getattr(part, "dtype", "")).encode())
+            h.update(str(getattr(part, "shape", "")).encode())
+            h.update(part.tobytes())
+        else:
+            h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def audio_key(text: str, language: str, engine: str, voice: str) -> str:
+    return hashlib.sha256(f"{engine}\0{voice}\0{language}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+# =============================
+# AUDIO CACHE
+# =============================
+class AudioCache:
+    """Two-tier content-addressed cache of synthesized audio blobs.
+
+    The memory tier is an LRU of bytes bounded by bytes. The disk tier stores one file
+    per key (fanned out by the first two hex digits), is also bounded by bytes and
+    evicts least-recently-used files; a disk hit is read once and promoted to memory,
+    so no file descriptor or mapping outlives the read.
+    """
+
+    def __init__(self, disk_dir=None, max_memory_bytes: int = 64 << 20, max_disk_bytes: int = 512 << 20):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._memory: "OrderedDict[str, object]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    def get(self, key: str):
+        """The blob as bytes, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            if key not in self._disk:
+                self.misses += 1
+                return None
+            self._disk.move_to_end(key)
+        data = self._read(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, data)
+            return data
+
+    def put(self, key: str, data: bytes):
+        if not data:
+            return
+        data = bytes(data)
+        with self._lock:
+            self._remember(key, data)
+        if self.disk_dir:
+            self._write(key, data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.bin"
+
+    def _remember(self, key: str, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _read(self, key: str):
+        try:
+            with open(self._path(key), "rb") as f:
+                os.utime(f.fileno())  # access order survives restarts
+                data = f.read()
+            if data:
+                return data
+        except OSError:
+            pass
+        # Missing or truncated: forget it
+        with self._lock:
+            size = self._disk.pop(key, None)
+            if size is not None:
+                self._disk_bytes -= size
+        return None
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[AUDIO CACHE] Could not write {path}: {e}")
+            return
+        evicted = []
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                self._path(old_key).unlink()
+            except OSError:
+                pass
+
+    def _scan_disk(self):
+        entries = []
+        for path in self.disk_dir.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
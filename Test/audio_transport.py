@@ -0,0 +1,89 @@
+import base64
+import io
+import shutil
+import wave
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Preference order when the client accepts several; "wav-b64" is the legacy transport
+# (base64 WAV string inside the event) and is always available.
+FORMATS: Dict[str, Dict] = {
+    "opus": {"mime": "audio/ogg; codecs=opus", "binary": True, "encoder": True},
+    "mp3": {"mime": "audio/mpeg", "binary": True, "encoder": True},
+    "wav": {"mime": "audio/wav", "binary": True, "encoder": False},
+    "wav-b64": {"mime": "audio/wav", "binary": False, "encoder": False},
+}
+DEFAULT_FORMAT = "wav-b64"
+
+
+def encoder_available() -> bool:
+    """Opus/MP3 go through pydub, which needs a local ffmpeg binary"""
+    try:
+        from pydub import AudioSegment
+    except ImportError:
+        return False
+    return shutil.which(AudioSegment.converter) is not None or shutil.which("ffmpeg") is not None
+
+
+def available_formats() -> list:
+    has_encoder = encoder_available()
+    return [name for name, spec in FORMATS.items() if has_encoder or not spec["encoder"]]
+
+
+def negotiate(requested: Optional[Iterable[str]], available: Optional[list] = None) -> str:
+    """First format in the client's preference list that this server can produce"""
+    available = available if available is not None else available_formats()
+    for name in requested or ():
+        if name in available:
+            return name
+    return DEFAULT_FORMAT
+
+
+def float_to_pcm16(audio: np.ndarray) -> bytes:
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+
+def pcm16_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)  # 16-bit
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class AudioEncoder:
+    """Encodes float32 mono audio for one negotiated transport format"""
+
+    def __init__(self, fmt: str, sample_rate: int, bitrate: str = "32k"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown audio format: {fmt}")
+        self.format = fmt
+        self.sample_rate = sample_rate
+        self.bitrate = bitrate
+        self.mime = FORMATS[fmt]["mime"]
+        self.binary = FORMATS[fmt]["binary"]
+
+    def encode(self, audio: np.ndarray):
+        """bytes for binary formats (sent as Socket.IO attachments), str for wav-b64"""
+        pcm = float_to_pcm16(audio)
+        if self.format in ("wav", "wav-b64"):
+            data = pcm16_to_wav(pcm, self.sample_rate)
+            return data if self.binary else base64.b64encode(data).decode('utf-8')
+
+        from pydub import AudioSegment
+
+        segment = AudioSegment(data=pcm, sample_width=2, frame_rate=self.sample_rate, channels=1)
+        buffer = io.BytesIO()
+        if self.format == "opus":
+            # Opus only runs at 48/24/16/12/8 kHz; XTTS' 24 kHz maps directly
+            segment.export(buffer, format="ogg", codec="libopus", bitrate=self.bitrate)
+        else:
+            segment.export(buffer, format="mp3", bitrate=self.bitrate)
+        return buffer.getvalue()
+
+    def payload(self, audio: np.ndarray) -> Dict:
+        """Fields to merge into an audio_chunk event"""
+        return {'audio': self.encode(audio), 'format': self.format, 'mime': self.mime}
@@ -0,0 +1,139 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sentence_buffer import SentenceBuffer
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """Starting assumptions and limits for one TTS engine"""
+    name: str
+    first_chunk_chars: int  # opener is cut at the first , ; : past this length
+    min_chars: int
+    max_chars: int
+    rtf: float  # synthesis seconds per audio second, before any measurement
+    overhead: float  # fixed seconds per call (model setup, HTTP round trip)
+    chars_per_second: float = 14.0  # speaking rate
+
+
+# XTTS degrades past ~250 characters per call and runs around real time on CPU
+XTTS_PROFILE = EngineProfile("xtts", first_chunk_chars=20, min_chars=40, max_chars=240, rtf=1.0, overhead=0.25)
+# ElevenLabs is much faster than real time but every request pays a network round trip
+ELEVENLABS_PROFILE = EngineProfile("elevenlabs", first_chunk_chars=30, min_chars=60, max_chars=400,
+                                   rtf=0.15, overhead=0.35)
+
+
+class RTFEstimator:
+    """Running (EWMA) estimate of an engine's real-time factor and speaking rate.
+
+    Shared by every response on an engine; fed only by real synthesis calls, never
+    by cache hits. Each call's raw synthesis/audio ratio also goes to
+    `histogram.observe()` when one is given.
+    """
+
+    def __init__(self, profile: EngineProfile, alpha: float = 0.2, histogram=None):
+        self.profile = profile
+        self.alpha = alpha
+        self.histogram = histogram
+        self.rtf = profile.rtf
+        self.chars_per_second = profile.chars_per_second
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def observe(self, chars: int, synth_seconds: float, audio_seconds: float):
+        if chars <= 0 or audio_seconds <= 0:
+            return
+        if self.histogram is not None:
+            self.histogram.observe(synth_seconds / audio_seconds)
+        rtf = max(0.01, (synth_seconds - self.profile.overhead) / audio_seconds)
+        with self._lock:
+            self.rtf += self.alpha * (rtf - self.rtf)
+            self.chars_per_second += self.alpha * (chars / audio_seconds - self.chars_per_second)
+            self.samples += 1
+
+    def audio_seconds(self, chars: int) -> float:
+        return chars / self.chars_per_second
+
+    def synth_seconds(self, chars: int) -> float:
+        return self.profile.overhead + self.rtf * self.audio_seconds(chars)
+
+
+class AdaptiveChunker:
+    """Groups SentenceBuffer segments into TTS requests for one response.
+
+    The opener goes out at the first clause boundary to minimize time to first
+    audio. After that, segments accumulate until the chunk is as large as it can be
+    while still finishing synthesis (behind everything already in flight) before the
+    client's buffered playback runs out; a larger chunk pays the per-call overhead
+    once for more speech. Whenever TTS would otherwise sit idle, whatever is pending
+    goes out immediately. Drop-in for SentenceBuffer (`add_text` / `flush`); call
+    `on_audio(seconds, chars)` as audio for this response is delivered, with the
+    chunk's length on its first block and 0 on later blocks.
+    """
+
+    def __init__(self, estimator: RTFEstimator):
+        self.estimator = estimator
+        self.profile = estimator.profile
+        self.sentences = SentenceBuffer(clause_min_chars=self.profile.first_chunk_chars)
+        self.pending = ""
+        self.chunks = 0
+        self._submitted_chars = 0
+        self._delivered_chars = 0
+        self._delivered_seconds = 0.0
+        self._playback_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add_text(self, text: str) -> List[str]:
+        chunks = []
+        for segment in self.sentences.add_text(text):
+            if self.pending and len(self.pending) + 1 + len(segment) > self.profile.max_chars:
+                chunks.append(self._take())
+            self.pending = f"{self.pending} {segment}" if self.pending else segment
+            if len(self.pending) >= self.target_chars():
+                chunks.append(self._take())
+        if self.pending and self._idle():
+            chunks.append(self._take())
+        return chunks
+
+    def flush(self) -> Optional[str]:
+        remaining = self.sentences.flush()
+        if remaining:
+            self.pending = f"{self.pending} {remaining}" if self.pending else remaining
+        return self._take() if self.pending else None
+
+    def on_audio(self, seconds: float, chars: int = 0):
+        with self._lock:
+            if self._playback_started is None:
+                self._playback_started = time.perf_counter()
+            self._delivered_seconds += seconds
+            self._delivered_chars += chars
+
+    def target_chars(self) -> int:
+        """Largest chunk whose audio should be ready before playback runs dry"""
+        if self.chunks == 0:
+            return 0  # the opener leaves with its first segment
+        est = self.estimator
+        with self._lock:
+            buffered = 0.0
+            if self._playback_started is not None:
+                buffered = max(0.0, self._playback_started + self._delivered_seconds - time.perf_counter())
+            in_flight = self._submitted_chars - self._delivered_chars
+        queued = est.audio_seconds(in_flight) - est.synth_seconds(in_flight) if in_flight > 0 else 0.0
+        slack = buffered + queued - est.profile.overhead
+        budget = int(max(0.0, slack) / max(est.rtf, 0.01) * est.chars_per_second)
+        return max(self.profile.min_chars, min(self.profile.max_chars, budget))
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return self._submitted_chars <= self._delivered_chars
+
+    def _take(self) -> str:
+        chunk, self.pending = self.pending, ""
+        self.chunks += 1
+        # Only the opener is cut at clause boundaries
+        self.sentences.clause_min_chars = 0
+        with self._lock:
+            self._submitted_chars += len(chunk)
+        return chunk
@@ -0,0 +1,147 @@
+"""Streaming ElevenLabs text-to-speech over a pooled keep-alive HTTP client.
+
+`ElevenLabsStreamer.stream(text)` posts to the `/stream` endpoint and yields MP3
+blocks as they arrive, cut on frame boundaries so every block decodes on its own.
+At most `max_concurrent` requests are in flight at once (ElevenLabs rejects more
+with 429, the limit depends on the plan); throttled and 5xx responses are retried
+with exponential backoff as long as no audio has been yielded yet.
+Set ELEVENLABS_BASE_URL to point it at a local stand-in
+(Test/Benchmarks/fake_elevenlabs.py).
+"""
+import threading
+import time
+from typing import Iterator, Optional
+
+import httpx
+
+DEFAULT_BASE_URL = "https://api.elevenlabs.io"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# MPEG-1 Layer III bitrates (kbps) and sample rates, by header index
+_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0)
+_SAMPLE_RATES = (44100, 48000, 32000, 0)
+
+
+def _frame_length(header: bytes) -> int:
+    """Byte length of the MPEG-1 Layer III frame starting with `header`, or 0 if not one"""
+    if header[0] != 0xFF or header[1] & 0xFE != 0xFA:  # sync, MPEG-1, Layer III
+        return 0
+    bitrate = _BITRATES[header[2] >> 4]
+    sample_rate = _SAMPLE_RATES[(header[2] >> 2) & 0x3]
+    if not bitrate or not sample_rate:
+        return 0
+    return 144000 * bitrate // sample_rate + ((header[2] >> 1) & 0x1)
+
+
+class Mp3Framer:
+    """Re-chunks an MP3 byte stream into blocks of whole frames, at least `min_bytes` each"""
+
+    def __init__(self, min_bytes: int = 4096):
+        self.min_bytes = min_bytes
+        self._buffer = bytearray()
+        self._ready = 0  # bytes at the front of _buffer that are whole frames
+        self._id3_checked = False
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        self._buffer += data
+        if not self._id3_checked:
+            if len(self._buffer) < 10:
+                return
+            self._id3_checked = True
+            if self._buffer[:3] == b"ID3":
+                size = 10 + (self._buffer[6] << 21 | self._buffer[7] << 14 | self._buffer[8] << 7 | self._buffer[9])
+                self._ready = size  # tag travels with the first block
+        while self._ready + 4 <= len(self._buffer):
+            length = _frame_length(self._buffer[self._ready:self._ready + 4])
+            if length == 0:
+                # Lost sync: hand over what we have untouched rather than guess
+                self._ready = len(self._buffer)
+                break
+            if self._ready + length > len(self._buffer):
+                break
+            self._ready += length
+        if self.min_bytes <= self._ready <= len(self._buffer):
+            yield self._take()
+
+    def flush(self) -> Optional[bytes]:
+        self._ready = len(self._buffer)
+        return self._take() or None
+
+    def _take(self) -> bytes:
+        block = bytes(self._buffer[:self._ready])
+        del self._buffer[:self._ready]
+        self._ready = 0
+        return block
+
+
+class ElevenLabsStreamer:
+    """One shared httpx client: connections are reused across sentences and sessions.
+
+    `timeout` bounds each whole request (connect to last byte), not just each read.
+    """
+
+    def __init__(self, api_key: str, voice_id: str, model_id: str, output_format: str,
+                 base_url: Optional[str] = None, max_connections: int = 4, timeout: float = 15.0,
+                 min_block_bytes: int = 4096, max_concurrent: Optional[int] = None,
+                 retries: int = 3, backoff: float = 0.25):
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.output_format = output_format
+        self.min_block_bytes = min_block_bytes
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.slots = threading.BoundedSemaphore(max_concurrent or max_connections)
+        self.retried = 0
+        self.http = httpx.Client(
+            base_url=base_url or DEFAULT_BASE_URL,
+            headers={"xi-api-key": api_key or ""},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                keepalive_expiry=60),
+            timeout=httpx.Timeout(timeout, connect=5.0),
+        )
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        """MP3 blocks for `text` as ElevenLabs produces them"""
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            yielded = False
+            try:
+                with self.slots:
+                    for block in self._request(text):
+                        yielded = True
+                        yield block
+                return
+            except httpx.HTTPStatusError as e:
+                # Once audio has gone out a retry would repeat it, so only clean failures retry
+                if yielded or e.response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    raise
+                retry_after = e.response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            except (httpx.TransportError, TimeoutError):
+                if yielded or attempt == self.retries:
+                    raise
+            self.retried += 1
+            time.sleep(delay)
+
+    def _request(self, text: str) -> Iterator[bytes]:
+        deadline = time.monotonic() + self.timeout
+        framer = Mp3Framer(self.min_block_bytes)
+        with self.http.stream(
+            "POST",
+            f"/v1/text-to-speech/{self.voice_id}/stream",
+            params={"output_format": self.output_format},
+            json={"text": text, "model_id": self.model_id},
+        ) as response:
+            response.raise_for_status()
+            for data in response.iter_bytes():
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"ElevenLabs request exceeded {self.timeout:.0f}s")
+                yield from framer.feed(data)
+        tail = framer.flush()
+        if tail:
+            yield tail
+
+    def close(self):
+        self.http.close()
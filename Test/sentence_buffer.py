@@ -0,0 +1,118 @@
+import re
+from typing import List, Optional
+
+TERMINATORS = ".!?"
+CLAUSE_MARKS = ",;:"
+CLOSERS = "\"')]}”’»"
+OPENERS = "\"'([{“‘«"
+# Lower-cased words that keep their period mid-sentence. Ambiguous ones that often end
+# a sentence ("etc.", "no.", "a.m.") are deliberately left out.
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "e.g", "i.e", "cf", "approx",
+    "dept", "fig", "inc", "ltd", "univ", "b.sc", "m.sc", "ph.d", "b.tech", "m.tech", "u.s", "u.k",
+})
+
+_CANDIDATE = re.compile(r"[.!?,;:\n]")
+
+
+class SentenceBuffer:
+    """Incremental sentence (and optional clause) segmenter for streamed LLM text.
+
+    Each `add_text` scans only characters that have not been scanned before; a
+    terminator right at the end of the buffer is re-checked once the next character
+    arrives, so "3.5", "e.g. this" and "example.com" never split. Newlines end a
+    segment too (list items, paragraphs). With `clause_min_chars` > 0, a comma,
+    semicolon or colon followed by a space also ends a segment once the segment is
+    at least that long; the attribute may be changed between calls.
+    """
+
+    def __init__(self, clause_min_chars: int = 0):
+        self.buffer = ""
+        self.clause_min_chars = clause_min_chars
+        self._scanned = 0  # buffer[:_scanned] holds no boundary
+
+    def add_text(self, text: str) -> List[str]:
+        """Add text to buffer and return any complete sentences"""
+        self.buffer += text
+        buf = self.buffer
+        n = len(buf)
+        segments = []
+        start = 0
+        pos = self._scanned
+        while True:
+            match = _CANDIDATE.search(buf, pos)
+            if match is None:
+                pos = n
+                break
+            i = match.start()
+            char = buf[i]
+
+            if char == "\n":
+                self._emit(segments, buf[start:i])
+                start = pos = i + 1
+                continue
+
+            if char in CLAUSE_MARKS:
+                if i + 1 == n:
+                    pos = i  # wait for the next character
+                    break
+                pos = i + 1
+                if (self.clause_min_chars and buf[i + 1].isspace()
+                        and i + 1 - start >= self.clause_min_chars):
+                    self._emit(segments, buf[start:i + 1])
+                    start = pos
+                continue
+
+            end = i
+            while end < n and buf[end] in TERMINATORS:
+                end += 1
+            while end < n and buf[end] in CLOSERS:
+                end += 1
+            if end == n:
+                pos = i
+                break
+            pos = end
+            if not buf[end].isspace():
+                continue  # decimal, URL, domain, "e.g" inside a word
+            if buf[i:end] == "." and self._keeps_period(buf, start, i):
+                continue
+            self._emit(segments, buf[start:end])
+            start = end
+
+        self.buffer = buf[start:]
+        self._scanned = pos - start
+        return segments
+
+    @staticmethod
+    def _keeps_period(buf: str, start: int, dot: int) -> bool:
+        """Abbreviation, initial ("J. Goswami") or list number ("1. ") before a lone period"""
+        word_start = max(buf.rfind(" ", start, dot), buf.rfind("\n", start, dot), start - 1) + 1
+        word = buf[word_start:dot].lstrip(OPENERS)
+        if not word:
+            return False
+        if word.lower() in ABBREVIATIONS:
+            return True
+        if len(word) == 1 and word.isupper():
+            return True
+        return word.isdigit() and not buf[start:word_start].strip()
+
+    @staticmethod
+    def _emit(segments: List[str], text: str):
+        text = text.strip()
+        if text:
+            segments.append(text)
+
+    def flush(self) -> Optional[str]:
+        """Get any remaining text in buffer"""
+        remaining = self.buffer.strip()
+        self.buffer = ""
+        self._scanned = 0
+        return remaining or None
+
+
+def split_sentences(text: str, clause_min_chars: int = 0) -> List[str]:
+    """Segments of a complete text, exactly as a stream of it would be split"""
+    buffer = SentenceBuffer(clause_min_chars=clause_min_chars)
+    segments = buffer.add_text(text)
+    remaining = buffer.flush()
+    return segments + [remaining] if remaining else segments
@@ -0,0 +1,204 @@
+import contextlib
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Collects synthesis requests from every session into small batches.
+
+    The first request opens a window of `window_ms`; everything that arrives before it
+    closes (up to `max_batch` requests) runs as one `batch_fn(texts) -> [audio, ...]`
+    call on the scheduler thread, and each caller's future gets its own output back.
+    With `batch_key`, a batch only holds requests whose key equals the oldest one's;
+    the rest wait for a later batch. `wait_histogram.observe(seconds)` gets each
+    request's wait before its batch runs.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[str]], List], window_ms: float = 30, max_batch: int = 4,
+                 wait_histogram=None, batch_key: Optional[Callable[[str], Any]] = None):
+        self.batch_fn = batch_fn
+        self.batch_key = batch_key
+        self.wait_histogram = wait_histogram
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self._pending = []
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.items = 0
+        self._thread = threading.Thread(target=self._run, name="tts-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        key = self.batch_key(text) if self.batch_key else None
+        with self._cond:
+            self._pending.append((text, future, time.perf_counter(), key))
+            self._cond.notify()
+        return future
+
+    def synthesize(self, text: str):
+        """Blocking convenience wrapper for worker threads"""
+        return self.submit(text).result()
+
+    def _matching(self, key):
+        return [item for item in self._pending if item[3] == key][:self.max_batch]
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            key = self._pending[0][3]
+            deadline = time.monotonic() + self.window
+            while len(self._matching(key)) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._matching(key)
+            taken = set(map(id, batch))
+            self._pending = [item for item in self._pending if id(item) not in taken]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            texts = [text for text, _, _, _ in batch]
+            if self.wait_histogram is not None:
+                started = time.perf_counter()
+                for _, _, queued_at, _ in batch:
+                    self.wait_histogram.observe(started - queued_at)
+            try:
+                outputs = self.batch_fn(texts)
+            except Exception as e:
+                for _, future, _, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future, _, _), output in zip(batch, outputs):
+                future.set_result(output)
+
+
+def xtts_batch_inference(model, latents, language: str = "en", temperature: float = 0.75,
+                         top_k: int = 50, top_p: float = 0.85, repetition_penalty: float = 10.0,
+                         length_penalty: float = 1.0, bf16: bool = False,
+                         lock: Optional[threading.Lock] = None) -> Callable[[List[str]], List[np.ndarray]]:
+    """batch_fn running XTTS' GPT over a batch of sentences of any length.
+
+    Mirrors `Xtts.inference` for a single voice. Each row's prefix (conditioning latent,
+    then its text embedding with its own positions) is left-padded to the longest row
+    and the padding masked out, so every row starts generating audio codes at the same
+    step with the same audio positions. Generated codes are trimmed at each row's first
+    stop-audio token before the per-row latent pass and HiFi-GAN decode. A single
+    sentence, or a batch whose batched call fails, goes through `model.inference`.
+    `bf16` runs both paths under CPU autocast; `lock` is held for the whole call, since
+    XTTS keeps per-call state on the model. Check the output with `batched_distance`.
+    """
+    import torch
+
+    gpt = model.gpt
+    device = model.device
+    gpt_cond_latent = latents["gpt_cond_latent"].to(device)
+    speaker_embedding = latents["speaker_embedding"].to(device)
+
+    def encode(text):
+        return model.tokenizer.encode(text.strip().lower(), lang=language)
+
+    def single(text):
+        out = model.inference(text=text, language=language, gpt_cond_latent=gpt_cond_latent,
+                              speaker_embedding=speaker_embedding)
+        wav = out["wav"] if isinstance(out, dict) else out
+        if isinstance(wav, torch.Tensor):
+            wav = wav.detach().cpu().numpy()
+        return np.asarray(wav, dtype=np.float32).flatten()
+
+    @torch.inference_mode()
+    def batched(tokens: List[List[int]]) -> List[np.ndarray]:
+        """One masked GPT pass over left-padded prefixes (what `gpt.generate` does per row)"""
+        prefixes = []
+        for ids in tokens:
+            text = torch.tensor([[gpt.start_text_token, *ids, gpt.stop_text_token]], device=device)
+            text_emb = gpt.text_embedding(text) + gpt.text_pos_embedding(text)
+            prefixes.append(torch.cat([gpt_cond_latent.to(text_emb.dtype), text_emb], dim=1)[0])
+        width = max(len(prefix) for prefix in prefixes)
+        prefix_emb = prefixes[0].new_zeros(len(tokens), width, prefixes[0].shape[-1])
+        # +1 column for the start-audio token every row begins generating from
+        attention_mask = torch.zeros(len(tokens), width + 1, dtype=torch.long, device=device)
+        for row, prefix in enumerate(prefixes):
+            prefix_emb[row, width - len(prefix):] = prefix
+            attention_mask[row, width - len(prefix):] = 1
+        gpt_inputs = torch.ones(len(tokens), width + 1, dtype=torch.long, device=device)
+        gpt_inputs[:, -1] = gpt.start_audio_token
+        gpt.gpt_inference.store_prefix_emb(prefix_emb)
+
+        codes = gpt.gpt_inference.generate(
+            gpt_inputs,
+            attention_mask=attention_mask,
+            bos_token_id=gpt.start_audio_token,
+            pad_token_id=gpt.stop_audio_token,
+            eos_token_id=gpt.stop_audio_token,
+            max_length=gpt.max_gen_mel_tokens + gpt_inputs.shape[-1],
+            do_sample=True,
+            top_p=top_p,
+            top_k=top_k,
+            temperature=temperature,
+            num_return_sequences=1,
+            num_beams=1,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            output_attentions=False,
+        )[:, gpt_inputs.shape[1]:]
+
+        wavs = []
+        for row, ids in enumerate(tokens):
+            row_codes = codes[row]
+            stops = (row_codes == gpt.stop_audio_token).nonzero()
+            if len(stops):
+                row_codes = row_codes[:stops[0, 0] + 1]
+            row_codes = row_codes.unsqueeze(0)
+            gpt_latents = gpt(
+                torch.tensor([ids], dtype=torch.int32, device=device),
+                torch.tensor([len(ids)], device=device),
+                row_codes,
+                torch.tensor([row_codes.shape[-1] * gpt.code_stride_len], device=device),
+                cond_latents=gpt_cond_latent,
+                return_attentions=False,
+                return_latent=True,
+            )
+            wav = model.hifigan_decoder(gpt_latents, g=speaker_embedding)
+            wavs.append(wav.detach().cpu().numpy().astype(np.float32).flatten())
+        return wavs
+
+    def batch_fn(texts: List[str]) -> List[np.ndarray]:
+        with lock or contextlib.nullcontext(), torch.autocast("cpu", dtype=torch.bfloat16, enabled=bf16):
+            if len(texts) > 1:
+                try:
+                    return batched([encode(text) for text in texts])
+                except Exception as e:
+                    print(f"[TTS BATCH] Batched inference failed ({e}); falling back to one at a time")
+            return [single(text) for text in texts]
+
+    return batch_fn
+
+
+def xtts_length_bucket(model, language: str = "en", bucket_tokens: int = 16) -> Callable[[str], int]:
+    """MicroBatcher batch_key: sentences within `bucket_tokens` text tokens share a batch,
+    which bounds the padding each row carries"""
+    return lambda text: len(model.tokenizer.encode(text.strip().lower(), lang=language)) // max(1, bucket_tokens)
+
+
+def batched_distance(batch_fn: Callable[[List[str]], List[np.ndarray]], single: Callable[[str], np.ndarray],
+                     texts: List[str]) -> float:
+    """Worst spectral distance (dB) between batched rows and one-at-a-time synthesis.
+
+    All `texts` run as one batch, so give sentences of different lengths to exercise
+    the padding.
+    """
+    from xtts_fast import spectral_distance
+
+    rows = batch_fn(list(texts))
+    return max(spectral_distance(single(text), row) for text, row in zip(texts, rows))
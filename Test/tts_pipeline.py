@@ -0,0 +1,140 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class OrderedAudioStream:
+    """One response's sentences: submitted in order, synthesized by the pool, emitted in order.
+
+    A sentence may arrive as several partial blocks (streaming synthesis); blocks of the
+    current sentence are emitted as soon as they land, later sentences wait their turn.
+    """
+
+    def __init__(self, pool: "TTSWorkerPool", emit_audio: Callable[..., None]):
+        self.pool = pool
+        self.emit_audio = emit_audio
+        self.started = time.perf_counter()
+        self.first_audio_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.queue_wait = 0.0
+        self.synth_time = 0.0
+        self._next_seq = 0
+        self._next_emit = 0
+        self._ready: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._emit_lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    def submit(self, text: str) -> int:
+        """Queue a sentence without blocking the caller; returns its sequence number"""
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+        self.pool.jobs.put((self, seq, text, time.perf_counter()))
+        return seq
+
+    def _deliver(self, seq: int, text: str, audio: Any, final: bool = True):
+        with self._lock:
+            entry = self._ready.setdefault(seq, {"text": text, "parts": deque(), "emitted": 0, "final": False})
+            if audio is not None and len(audio) > 0:
+                entry["parts"].append(audio)
+            entry["final"] = entry["final"] or final
+        self._drain()
+
+    def _drain(self):
+        # Only one worker drains at a time, so chunks leave strictly in sequence order;
+        # the emit itself runs outside _lock so submit() never waits on the socket.
+        with self._emit_lock:
+            while True:
+                with self._lock:
+                    entry = self._ready.get(self._next_emit)
+                    if entry is None:
+                        break
+                    seq = self._next_emit
+                    if not entry["parts"]:
+                        if not entry["final"]:
+                            break
+                        del self._ready[seq]
+                        self._next_emit += 1
+                        if self._next_emit == self._next_seq:
+                            self._done.notify_all()
+                        continue
+                    audio = entry["parts"].popleft()
+                    part = entry["emitted"]
+                    entry["emitted"] += 1
+                if self.first_audio_at is None:
+                    self.first_audio_at = time.perf_counter()
+                try:
+                    self.emit_audio(seq, entry["text"], audio, part=part)
+                except Exception as e:
+                    print(f"[TTS ERROR] Failed to emit audio chunk {seq}.{part}: {e}")
+
+    def finish(self, timeout: Optional[float] = None) -> Dict[str, float]:
+        """Block until every submitted sentence has been emitted, then return timings"""
+        with self._lock:
+            self._done.wait_for(lambda: self._next_emit == self._next_seq, timeout=timeout)
+            self.finished_at = time.perf_counter()
+            return self.stats()
+
+    def stats(self) -> Dict[str, float]:
+        end = self.finished_at or time.perf_counter()
+        return {
+            "sentences": self._next_seq,
+            "time_to_first_audio": (self.first_audio_at - self.started) if self.first_audio_at else None,
+            "total": end - self.started,
+            "queue_wait": self.queue_wait,
+            "synth_time": self.synth_time,
+        }
+
+
+class TTSWorkerPool:
+    """Shared synthesis workers so the LLM token loop never waits on TTS.
+
+    Producers call `open_stream(emit)` per response and `submit()` sentences as the
+    SentenceBuffer finds them; `workers` threads run `synthesize(text)` and hand the
+    audio back to the owning stream, which emits it strictly in sentence order.
+    With `streaming=True`, `synthesize` returns an iterator of audio blocks and each
+    block is forwarded as soon as it is decoded. `wait_histogram.observe(seconds)`
+    gets each sentence's time in the queue.
+    """
+
+    def __init__(self, synthesize: Callable[[str], Any], workers: int = 1, streaming: bool = False,
+                 wait_histogram: Optional[Any] = None):
+        self.synthesize = synthesize
+        self.streaming = streaming
+        self.wait_histogram = wait_histogram
+        self.jobs: "queue.Queue" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"tts-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def open_stream(self, emit_audio: Callable[..., None]) -> OrderedAudioStream:
+        """`emit_audio(seq, text, audio, part=...)` is called once per block (part 0, 1, ...)"""
+        return OrderedAudioStream(self, emit_audio)
+
+    def _run(self):
+        while True:
+            stream, seq, text, queued_at = self.jobs.get()
+            started = time.perf_counter()
+            with stream._lock:
+                stream.queue_wait += started - queued_at
+            if self.wait_histogram is not None:
+                self.wait_histogram.observe(started - queued_at)
+            try:
+                if self.streaming:
+                    for block in self.synthesize(text):
+                        stream._deliver(seq, text, block, final=False)
+                    audio = None
+                else:
+                    audio = self.synthesize(text)
+            except Exception as e:
+                print(f"[TTS ERROR] Failed to generate audio: {e}")
+                audio = None
+            with stream._lock:
+                stream.synth_time += time.perf_counter() - started
+            stream._deliver(seq, text, audio, final=True)
@@ -0,0 +1,132 @@
+"""Background XTTS startup: the web server accepts (text-only) chat while this loads.
+
+Latents are read from safetensors when available (memory-mapped, no pickle); convert
+an existing torch file once with
+
+    python Test/tts_runtime.py convert jai_voice_latents.pt jai_voice_latents.safetensors
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+LATENT_KEYS = ("gpt_cond_latent", "speaker_embedding")
+
+
+def save_latents(latents: Dict, path) -> Path:
+    import torch
+    from safetensors.torch import save_file
+
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    # Accepts torch tensors or NumPy arrays
+    save_file({key: torch.as_tensor(latents[key]).detach().cpu().contiguous() for key in LATENT_KEYS},
+              str(tmp_path))
+    tmp_path.replace(path)
+    return path
+
+
+def load_latents(path) -> Dict:
+    """safetensors if the file (or a .safetensors sibling of a .pt path) exists, else torch.load"""
+    path = Path(path)
+    candidate = path if path.suffix == ".safetensors" else path.with_suffix(".safetensors")
+    if candidate.exists():
+        from safetensors.torch import load_file
+
+        return load_file(str(candidate), device="cpu")
+
+    import torch
+
+    try:
+        return torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    except TypeError:  # torch < 2.1 has no mmap/weights_only
+        return torch.load(path, map_location="cpu")
+
+
+class TTSRuntime:
+    """Loads the latents and model on a background thread, then builds and warms up.
+
+    `load_model()` returns the model; `build(model, latents)` wires up whatever the app
+    needs and returns a `synthesize(text)` used for warmup. `ready` flips only after
+    warmup, so the first real request doesn't pay for lazy init and allocator growth.
+    `latents` is set first, so the voice is known while the model is still loading.
+    """
+
+    def __init__(self, load_model: Callable, latents_path, build: Callable,
+                 warmup_text: str = "Hello there.", warmup_runs: int = 1,
+                 on_ready: Optional[Callable[[], None]] = None):
+        self.load_model = load_model
+        self.latents_path = latents_path
+        self.build = build
+        self.warmup_text = warmup_text
+        self.warmup_runs = warmup_runs
+        self.on_ready = on_ready
+        self.model = None
+        self.latents = None
+        self.error: Optional[BaseException] = None
+        self.timings: Dict[str, Optional[float]] = {"first_request": None}
+        self._started_at: Optional[float] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        threading.Thread(target=self._run, name="tts-runtime", daemon=True).start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _timed(self, name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.timings[name] = time.perf_counter() - start
+        return result
+
+    def _run(self):
+        try:
+            print("[TTS RUNTIME] Loading voice latents...")
+            self.latents = self._timed("load_latents", load_latents, self.latents_path)
+            print("[TTS RUNTIME] Loading TTS model...")
+            self.model = self._timed("load_model", self.load_model)
+            synthesize = self._timed("build", self.build, self.model, self.latents)
+            start = time.perf_counter()
+            for _ in range(self.warmup_runs):
+                synthesize(self.warmup_text)
+            self.timings["warmup"] = time.perf_counter() - start
+        except Exception as e:
+            self.error = e
+            print(f"[TTS RUNTIME] Failed to start, audio disabled: {e}")
+            return
+        self.timings["time_to_ready"] = time.perf_counter() - self._started_at
+        self._ready.set()
+        print("[TTS RUNTIME] Ready in {:.0f} ms ({})".format(
+            self.timings["time_to_ready"] * 1000,
+            ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in self.timings.items()
+                      if k not in ("time_to_ready", "first_request") and v is not None)))
+        if self.on_ready:
+            self.on_ready()
+
+    def note_request(self, time_to_first_audio: Optional[float]):
+        """Record the first post-ready request's time to first audio"""
+        if time_to_first_audio is None:
+            return
+        with self._lock:
+            if self.timings["first_request"] is not None:
+                return
+            self.timings["first_request"] = time_to_first_audio
+        print(f"[TTS RUNTIME] First request: first audio {time_to_first_audio * 1000:.0f} ms")
+
+    def stats(self) -> Dict:
+        return {"ready": self.ready, "error": str(self.error) if self.error else None, **self.timings}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "convert":
+        sys.exit("usage: tts_runtime.py convert <latents.pt> <latents.safetensors>")
+    print("Wrote", save_latents(load_latents(sys.argv[2]), sys.argv[3]))
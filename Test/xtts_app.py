@@ -1,9 +1,10 @@
 import os
+import sys
 import json
-import queue
 import threading
-import base64
-from typing import List, Dict, Optional
+import time
+import itertools
+from typing import Dict, Optional
 from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 from dotenv import load_dotenv
@@ -14,19 +15,61 @@ import torch
 import numpy as np
 from pathlib import Path
 from TTS.api import TTS
-import re
-import io
-import wave
+from audio_cache import AudioCache, audio_key, voice_digest
+from audio_transport import AudioEncoder, available_formats, float_to_pcm16, negotiate
+from chunk_policy import XTTS_PROFILE, AdaptiveChunker, RTFEstimator
+from tts_batcher import MicroBatcher, batched_distance, xtts_batch_inference, xtts_length_bucket
+from sentence_buffer import SentenceBuffer, split_sentences
+from tts_pipeline import TTSWorkerPool
+from tts_runtime import TTSRuntime
+from xtts_fast import fast_mode_from_env, precision_context, precision_from_env, threads_from_env
+# Request tracing and the /metrics format are shared with the main app in src/
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+from metrics import (  # noqa: E402
+    REQUEST_ID_HEADER, RTF_BUCKETS, Metrics, RequestTrace, format_timings, request_id_from,
+)
+from session_store import SessionMemory  # noqa: E402
+from answer_cache import AnswerCache, split_for_replay, text_digest  # noqa: E402
+from faq_bank import DEFAULT_THRESHOLD, build_bank, llm_answerer, open_bank  # noqa: E402
+from single_flight import SingleFlight  # noqa: E402
+
+# Force .env to override everything
+load_dotenv(override=True)
 
 # =============================
 # CONFIG
 # =============================
 MODEL = "gpt-4o-mini"
-MAX_QNA_PAIRS = 5
-LATENTS_FILE = "/Users/jg/projects/ecameo/Voice_Cloning/src/jai_voice_latents.pt"
-
-# Force .env to override everything
-load_dotenv(override=True)
+# Recent turns stay verbatim within this many tokens; older ones fold into a short summary
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 1200))
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", 200))
+# Model calls are serialized; more workers only help with audio-cache hits and encoding
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", 1))
+TTS_STREAMING = os.getenv("TTS_STREAMING", "0") == "1"  # partial audio blocks as XTTS decodes
+TTS_STREAM_BLOCK_MS = int(os.getenv("TTS_STREAM_BLOCK_MS", 250))
+TTS_STREAM_CHUNK_SIZE = int(os.getenv("TTS_STREAM_CHUNK_SIZE", 20))  # GPT tokens per decoded chunk
+TTS_BATCH_WINDOW_MS = float(os.getenv("TTS_BATCH_WINDOW_MS", 0))  # >0 batches sentences across sessions
+TTS_MAX_BATCH = int(os.getenv("TTS_MAX_BATCH", 4))
+# Sentences within this many text tokens share a batch (padding is masked, but still costs compute)
+TTS_BATCH_BUCKET_TOKENS = int(os.getenv("TTS_BATCH_BUCKET_TOKENS", 16))
+# Batching stays off unless batched audio is within this many dB of single inference at boot
+TTS_BATCH_MAX_DISTANCE = float(os.getenv("TTS_BATCH_MAX_DISTANCE", 3.0))
+TTS_CLAUSE_MIN_CHARS = int(os.getenv("TTS_CLAUSE_MIN_CHARS", 0))  # >0 also splits at , ; : past this length
+# "adaptive": short opener, then chunks sized to the measured RTF and buffered playback
+TTS_CHUNK_POLICY = os.getenv("TTS_CHUNK_POLICY", "sentence")
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", Path(__file__).parent / ".audio_cache")
+AUDIO_CACHE_MEMORY_MB = int(os.getenv("AUDIO_CACHE_MEMORY_MB", 64))
+AUDIO_CACHE_DISK_MB = int(os.getenv("AUDIO_CACHE_DISK_MB", 512))
+# A .safetensors file next to the .pt is preferred (see tts_runtime.py convert)
+LATENTS_FILE = os.getenv("XTTS_LATENTS", Path(__file__).parent / "Voice_Cloning" / "src" / "jai_voice_latents.pt")
+TTS_WARMUP_TEXT = os.getenv("TTS_WARMUP_TEXT", "Hi, thanks for stopping by.")
+TTS_WARMUP_RUNS = int(os.getenv("TTS_WARMUP_RUNS", 1))
+SAMPLE_RATE = 24000
+# Identical questions asked at the same time share one LLM stream and one synthesis
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") == "1"
+# Precomputed FAQ answers + audio, built with: python src/faq_bank.py build --app xtts --out <path>
+FAQ_BANK_PATH = os.getenv("FAQ_BANK_PATH")
+FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", DEFAULT_THRESHOLD))
 
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
@@ -41,20 +84,14 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# =============================
-# LOAD TTS MODEL & LATENTS
-# =============================
-print("Loading TTS model...")
-tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-xtts_model = tts.synthesizer.tts_model
-
-print("Loading voice latents...")
-latents = torch.load(LATENTS_FILE, map_location="cpu")
-
 # =============================
 # LOAD LINKEDIN PDF
 # =============================
-reader = PdfReader("/Users/jg/projects/ecameo/LLM/Me/linkedin.pdf")
+# Same profile files and env overrides as src/app.py
+Base_dir = Path(__file__).parent.parent
+linkedin_path = os.getenv("LINKEDIN_PDF_PATH", Base_dir / "src" / "Me" / "linkedin.pdf")
+summary_path = os.getenv("SUMMARY_TXT_PATH", Base_dir / "src" / "Me" / "summary.txt")
+reader = PdfReader(linkedin_path)
 linkedin = ""
 for page in reader.pages:
     text = page.extract_text()
@@ -64,7 +101,7 @@ for page in reader.pages:
 # =============================
 # LOAD TEXTUAL INFO
 # =============================
-with open("/Users/jg/projects/ecameo/LLM/Me/summary.txt", "r") as f:
+with open(summary_path, "r") as f:
     summary = f.read()
 
 name = "Jai Goswami"
@@ -151,49 +188,81 @@ TOOLS = [
 # =============================
 # SESSION MEMORY
 # =============================
-class SessionMemory:
-    def __init__(self):
-        self.messages: List[Dict] = []
-
-    def add(self, role, content):
-        self.messages.append({"role": role, "content": content})
-        self.messages = self.messages[-MAX_QNA_PAIRS * 2:]
-
-    def get(self):
-        return self.messages
-
-    def summary(self):
-        out = []
-        for i in range(0, len(self.messages), 2):
-            q = self.messages[i]["content"]
-            a = self.messages[i + 1]["content"]
-            out.append(f"Q: {q}\nA: {a}")
-        return "\n".join(out)
-
-
 # Global session (in production, use session management)
-session = SessionMemory()
+session = SessionMemory(max_tokens=HISTORY_TOKEN_BUDGET, max_summary_tokens=HISTORY_SUMMARY_TOKENS)
+system_prompt_digest = text_digest(system_prompt)
+single_flight = SingleFlight()
+# Near-duplicates of the expected FAQ are answered from an offline-built bundle
+faq_bank = open_bank(FAQ_BANK_PATH, system_prompt_digest, threshold=FAQ_MATCH_THRESHOLD)
+faq_payloads: Dict = {}  # (entry id, seq, format) -> encoded audio_chunk fields
+loaded_voice: Optional[str] = None  # see serving_voice()
 
 # =============================
 # TTS PROCESSOR FOR WEB
 # =============================
+def xtts_voice(latents, fast_mode: Optional[Dict] = None) -> str:
+    """Digest of the speaker latents (and reduced precision) that audio was synthesized with"""
+    voice_parts = [latents["gpt_cond_latent"], latents["speaker_embedding"]]
+    bf16 = bool(fast_mode and fast_mode.get("bf16"))
+    if fast_mode and (fast_mode.get("quantized") or bf16):
+        voice_parts.append(f"int8={fast_mode.get('quantized')},bf16={bf16}")
+    return voice_digest(*voice_parts)
+
+
 class WebTTSProcessor:
     """Processes TTS and streams audio chunks to web client"""
     
-    def __init__(self, model, latents):
+    def __init__(self, model, latents, cache: Optional[AudioCache] = None,
+                 batcher: Optional[MicroBatcher] = None, fast_mode: Optional[Dict] = None,
+                 rtf: Optional[RTFEstimator] = None, model_lock: Optional[threading.Lock] = None):
         self.model = model
+        # XTTS keeps per-call state on the model (e.g. the GPT's cached prefix embedding),
+        # so only one inference may run at a time however many TTS workers there are.
+        # Extra workers still serve audio-cache hits and encode while the model is busy.
+        self.model_lock = model_lock or threading.Lock()
         self.latents = latents
-        self.sample_rate = 24000
-        
+        self.sample_rate = SAMPLE_RATE
+        self.cache = cache
+        self.batcher = batcher
+        self.rtf = rtf
+        self.bf16 = bool(fast_mode and fast_mode.get("bf16"))
+        self.voice = xtts_voice(latents, fast_mode)
+    
+    def cache_key(self, text: str) -> str:
+        return audio_key(text, "en", "xtts_v2", self.voice)
+    
     def process_text_to_speech(self, text: str) -> np.ndarray:
-        """Convert text to speech and return audio array"""
+        """Convert text to speech and return audio array (served from the audio cache when possible)"""
+        key = self.cache_key(text)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return np.frombuffer(cached, dtype=np.float32)
+        started = time.perf_counter()
+        wav = self._synthesize_batched(text) if self.batcher is not None else self._synthesize(text)
+        if self.rtf is not None:
+            self.rtf.observe(len(text), time.perf_counter() - started, len(wav) / self.sample_rate)
+        if self.cache is not None and len(wav) > 0:
+            self.cache.put(key, wav.tobytes())
+        return wav
+    
+    def _synthesize_batched(self, text: str) -> np.ndarray:
+        """Wait for this sentence's slot in the next cross-session batch"""
         try:
-            out = self.model.inference(
-                text=text,
-                language="en",
-                gpt_cond_latent=self.latents["gpt_cond_latent"],
-                speaker_embedding=self.latents["speaker_embedding"],
-            )
+            return self.batcher.synthesize(text)
+        except Exception as e:
+            print(f"[TTS ERROR] Failed to generate audio: {e}")
+            return np.array([])
+    
+    def _synthesize(self, text: str) -> np.ndarray:
+        try:
+            with self.model_lock, precision_context(self.bf16):
+                out = self.model.inference(
+                    text=text,
+                    language="en",
+                    gpt_cond_latent=self.latents["gpt_cond_latent"],
+                    speaker_embedding=self.latents["speaker_embedding"],
+                )
             
             if isinstance(out, dict):
                 wav = out.get("wav", None)
@@ -218,74 +287,327 @@ class WebTTSProcessor:
             print(f"[TTS ERROR] Failed to generate audio: {e}")
             return np.array([])
     
-    def audio_to_base64_wav(self, audio: np.ndarray) -> str:
-        """Convert audio array to base64 encoded WAV"""
-        buffer = io.BytesIO()
-        with wave.open(buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(self.sample_rate)
-            # Convert float32 to int16
-            audio_int16 = (audio * 32767).astype(np.int16)
-            wav_file.writeframes(audio_int16.tobytes())
-        
-        buffer.seek(0)
-        return base64.b64encode(buffer.read()).decode('utf-8')
-
-
-class SentenceBuffer:
-    """Buffers streaming text and detects complete sentences"""
-    
-    def __init__(self):
-        self.buffer = ""
-        self.sentence_pattern = re.compile(r'([.!?]+)(?:\s+|$)')
-    
-    def add_text(self, text: str) -> List[str]:
-        """Add text to buffer and return any complete sentences"""
-        self.buffer += text
-        sentences = []
-        
-        matches = list(self.sentence_pattern.finditer(self.buffer))
-        
-        if matches:
-            last_match = matches[-1]
-            end_pos = last_match.end()
-            
-            completed = self.buffer[:end_pos]
-            self.buffer = self.buffer[end_pos:]
-            
-            sentence_parts = self.sentence_pattern.split(completed)
-            
-            for i in range(0, len(sentence_parts) - 1, 2):
-                if sentence_parts[i].strip():
-                    sentence = sentence_parts[i].strip() + sentence_parts[i + 1]
-                    sentences.append(sentence)
-        
-        return sentences
-    
-    def flush(self) -> Optional[str]:
-        """Get any remaining text in buffer"""
-        if self.buffer.strip():
-            remaining = self.buffer.strip()
-            self.buffer = ""
-            return remaining
-        return None
+    def stream_text_to_speech(self, text: str, block_ms: int = TTS_STREAM_BLOCK_MS):
+        """Yield fixed-size float32 blocks as XTTS decodes them (last block may be shorter)"""
+        block_samples = max(1, self.sample_rate * block_ms // 1000)
+        key = self.cache_key(text)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                wav = np.frombuffer(cached, dtype=np.float32)
+                for start in range(0, len(wav), block_samples):
+                    yield wav[start:start + block_samples]
+                return
+        pending = np.zeros(0, dtype=np.float32)
+        blocks = []
+        started = time.perf_counter()
+        try:
+            # Autocast state is per thread; the generator is always drained on one worker,
+            # which holds the model for the whole decode
+            with self.model_lock, precision_context(self.bf16):
+                chunks = self.model.inference_stream(
+                    text,
+                    "en",
+                    self.latents["gpt_cond_latent"],
+                    self.latents["speaker_embedding"],
+                    stream_chunk_size=TTS_STREAM_CHUNK_SIZE,
+                    enable_text_splitting=False,
+                )
+                for chunk in chunks:
+                    if isinstance(chunk, torch.Tensor):
+                        chunk = chunk.detach().cpu().numpy()
+                    pending = np.concatenate([pending, np.asarray(chunk, dtype=np.float32).flatten()])
+                    while len(pending) >= block_samples:
+                        blocks.append(pending[:block_samples])
+                        yield blocks[-1]
+                        pending = pending[block_samples:]
+        except Exception as e:
+            print(f"[TTS ERROR] Failed to stream audio: {e}")
+            blocks = None
+        if len(pending) > 0:
+            yield pending
+            if blocks is not None:
+                blocks.append(pending)
+        # Only complete syntheses are measured and cached
+        if self.rtf is not None and blocks:
+            self.rtf.observe(len(text), time.perf_counter() - started,
+                             sum(len(b) for b in blocks) / self.sample_rate)
+        if self.cache is not None and blocks:
+            self.cache.put(key, np.concatenate(blocks).tobytes())
 
 
 # =============================
 # WEBSOCKET HANDLERS
 # =============================
-tts_processor = WebTTSProcessor(xtts_model, latents)
+audio_cache = AudioCache(
+    disk_dir=AUDIO_CACHE_DIR,
+    max_memory_bytes=AUDIO_CACHE_MEMORY_MB << 20,
+    max_disk_bytes=AUDIO_CACHE_DISK_MB << 20,
+)
+metrics = Metrics()
+# Set by the TTS runtime once the model is loaded
+fast_mode: Dict = {}
+tts_processor: Optional[WebTTSProcessor] = None
+tts_rtf = RTFEstimator(XTTS_PROFILE, histogram=metrics.histogram(
+    "tts_rtf", "Synthesis seconds per audio second, per chunk", RTF_BUCKETS))
+tts_pool: Optional[TTSWorkerPool] = None
+
+
+def load_xtts():
+    global fast_mode
+    xtts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").synthesizer.tts_model
+    # XTTS_FAST=1: int8 GPT + bf16 autocast where the CPU supports it
+    fast_mode = fast_mode_from_env(xtts_model)
+    return xtts_model
+
+
+def build_tts(xtts_model, latents):
+    global tts_processor, tts_pool
+    # One lock for every call into the model: worker threads, the batcher and warmup
+    model_lock = threading.Lock()
+    tts_processor = WebTTSProcessor(xtts_model, latents, cache=audio_cache,
+                                    fast_mode=fast_mode, rtf=tts_rtf, model_lock=model_lock)
+    # Batching applies to whole-sentence synthesis only; streaming mode decodes per sentence
+    tts_batcher = None
+    if TTS_BATCH_WINDOW_MS > 0 and not TTS_STREAMING:
+        batch_fn = xtts_batch_inference(xtts_model, latents, bf16=fast_mode["bf16"], lock=model_lock)
+        # Two lengths in one batch, so the padded, masked path is what gets checked
+        distance = batched_distance(batch_fn, tts_processor._synthesize, [TTS_WARMUP_TEXT, "Nice to meet you."])
+        if distance <= TTS_BATCH_MAX_DISTANCE:
+            print(f"[TTS] Cross-session batching on (batched vs single: {distance:.2f} dB)")
+            tts_batcher = MicroBatcher(
+                batch_fn,
+                window_ms=TTS_BATCH_WINDOW_MS,
+                max_batch=TTS_MAX_BATCH,
+                wait_histogram=metrics.histogram("tts_batch_wait_seconds", "Time a sentence waits for its XTTS batch"),
+                batch_key=xtts_length_bucket(xtts_model, bucket_tokens=TTS_BATCH_BUCKET_TOKENS),
+            )
+            tts_processor.batcher = tts_batcher
+        else:
+            print(f"[TTS] Batched audio is {distance:.2f} dB from single inference "
+                  f"(limit {TTS_BATCH_MAX_DISTANCE}); batching disabled")
+    # Synthesis runs on worker threads; each response gets an ordered stream so text keeps
+    # flowing at LLM speed while audio chunks still arrive in sentence order.
+    tts_pool = TTSWorkerPool(
+        tts_processor.stream_text_to_speech if TTS_STREAMING else tts_processor.process_text_to_speech,
+        # Enough waiting workers to fill a batch
+        workers=max(TTS_WORKERS, TTS_MAX_BATCH) if tts_batcher else TTS_WORKERS,
+        streaming=TTS_STREAMING,
+        wait_histogram=metrics.histogram("tts_queue_wait_seconds", "Time a sentence waits for a TTS worker"),
+    )
+    # Warm up the model itself, not the audio cache
+    return tts_processor._synthesize
+
+
+# Torch thread counts are fixed once parallel work starts: set them before the model loads
+threads_from_env()
+# Chat works text-only until the model has loaded and warmed up
+tts_runtime = TTSRuntime(
+    load_xtts,
+    LATENTS_FILE,
+    build_tts,
+    warmup_text=TTS_WARMUP_TEXT,
+    warmup_runs=TTS_WARMUP_RUNS,
+    on_ready=lambda: socketio.emit('tts_status', {'ready': True}),
+).start()
+
+
+def build_faq_bank(faqs, path):
+    """Offline step: answer each FAQ through this app's prompt and voice it with the XTTS speaker"""
+    while not tts_runtime.wait(1):
+        if tts_runtime.error:
+            raise RuntimeError(f"TTS runtime failed to start: {tts_runtime.error}")
+    return build_bank(
+        faqs,
+        llm_answerer(client, MODEL, lambda question: system_prompt),
+        path,
+        system_prompt_digest,
+        split=lambda text: split_sentences(text, TTS_CLAUSE_MIN_CHARS),
+        synthesize=lambda sentence: float_to_pcm16(tts_processor.process_text_to_speech(sentence)),
+        voice=tts_processor.voice,
+        audio_format="pcm16",
+        sample_rate=SAMPLE_RATE,
+    )
+
+# Negotiated audio transport per socket; clients that never negotiate get base64 WAV.
+# Socket clients send negotiate_audio (or audio_formats on send_message), as
+# Test/Benchmarks/bench_load.py does; the SSE web UI in src/ carries no audio.
+server_audio_formats = available_formats()
+client_audio_formats: Dict[str, str] = {}
+audio_encoders = {fmt: AudioEncoder(fmt, SAMPLE_RATE) for fmt in server_audio_formats}
+
+# X-Request-ID sent with the Socket.IO handshake (e.g. by a proxy) names the connection;
+# its n-th answer is traced as "<that id>.<n>". Other connections get a fresh id per answer.
+connection_request_ids: Dict[str, tuple] = {}
+
+def socket_request_id(sid) -> Optional[str]:
+    entry = connection_request_ids.get(sid)
+    if entry is None:
+        return None
+    base, answers = entry
+    return f"{base}.{next(answers)}"
 
 @socketio.on('connect')
 def handle_connect():
+    header = request.headers.get(REQUEST_ID_HEADER)
+    if header:
+        connection_request_ids[request.sid] = (request_id_from(header), itertools.count(1))
     print('Client connected')
     emit('status', {'message': 'Connected to Jai\'s eCameo'})
+    emit('tts_status', {'ready': tts_runtime.ready})
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    connection_request_ids.pop(request.sid, None)
+    client_audio_formats.pop(request.sid, None)
     print('Client disconnected')
 
+@socketio.on('negotiate_audio')
+def handle_negotiate_audio(data):
+    """Client sends its playable formats in preference order, e.g. ["opus", "mp3", "wav"]"""
+    fmt = negotiate(data.get('formats'), server_audio_formats)
+    client_audio_formats[request.sid] = fmt
+    emit('audio_format', {'format': fmt, 'mime': audio_encoders[fmt].mime})
+
+def serving_voice() -> Optional[str]:
+    """Voice this server synthesizes with, known once the latents load (before the model is ready)"""
+    global loaded_voice
+    if loaded_voice is None and tts_runtime.latents is not None:
+        loaded_voice = xtts_voice(tts_runtime.latents, precision_from_env())
+    return loaded_voice
+
+def serve_faq(entry, user_input, trace, fmt, encoder):
+    """Replay a precomputed FAQ answer; its audio comes from the bundle when built for this voice"""
+    request_id = trace.request_id
+    sid = request.sid
+    bundled = faq_bank.audio_format == "pcm16" and serving_voice() == faq_bank.voice
+    audio_stream = None
+    if not bundled and tts_runtime.ready:
+        # Text-only bundle or another speaker: voice the stored answer live
+        def emit_audio(seq, sentence, audio, part=0):
+            trace.audio()
+            payload = encoder.payload(audio)
+            payload.update({'text': sentence if part == 0 else '', 'seq': seq, 'part': part,
+                            'request_id': request_id})
+            socketio.emit('audio_chunk', payload, to=sid)
+        
+        audio_stream = tts_pool.open_stream(emit_audio)
+    
+    trace.token()  # first token only: replayed pieces say nothing about throughput
+    for piece in split_for_replay(entry["answer"]):
+        emit('text_chunk', {'text': piece, 'request_id': request_id})
+    
+    for seq, sentence in enumerate(entry["sentences"]):
+        if audio_stream:
+            audio_stream.submit(sentence["text"])
+        elif bundled and sentence["length"]:
+            # Encoded once per format, then shared by every visitor asking this FAQ
+            key = (entry["id"], seq, fmt)
+            payload = faq_payloads.get(key)
+            if payload is None:
+                samples = np.frombuffer(faq_bank.audio(sentence), dtype=np.int16).astype(np.float32) / 32767
+                payload = faq_payloads[key] = encoder.payload(samples)
+            trace.audio()
+            emit('audio_chunk', dict(payload, text=sentence["text"], seq=seq, part=0, request_id=request_id))
+    if audio_stream:
+        audio_stream.finish()
+    
+    session.add("user", user_input)
+    session.add("assistant", entry["answer"])
+    print(f"[CHAT {request_id}] Response replayed from faq ({entry['id']}): {format_timings(trace.finish('faq'))}")
+    emit('response_end', {'request_id': request_id})
+
+
+def generate_answer(user_input, messages, flight):
+    """Producer for one answer: LLM stream plus TTS, published to every follower.
+
+    Items are ('text_chunk', {...}) and ('audio_chunk', {'audio': samples, ...}) in
+    emission order; each follower encodes audio for its own transport. Tool calls
+    come back in the result so followers can send them after response_end.
+    """
+    chunker = AdaptiveChunker(tts_rtf) if TTS_CHUNK_POLICY == "adaptive" else None
+    sentence_buffer = chunker or SentenceBuffer(clause_min_chars=TTS_CLAUSE_MIN_CHARS)
+    
+    def emit_audio(seq, sentence, audio, part=0):
+        if chunker:
+            chunker.on_audio(len(audio) / SAMPLE_RATE, len(sentence) if part == 0 else 0)
+        # In streaming mode a sentence arrives as parts 0, 1, ...; subtitles ride on part 0
+        flight.publish(('audio_chunk', {'audio': audio, 'text': sentence if part == 0 else '',
+                                        'seq': seq, 'part': part, 'encoded': {}}))
+    
+    # None while the TTS runtime is still starting: the reply is text-only
+    audio_stream = tts_pool.open_stream(emit_audio) if tts_runtime.ready else None
+    
+    stream = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        tools=TOOLS,
+        stream=True,
+    )
+    
+    full_response = ""
+    tool_calls = []
+    
+    for chunk in stream:
+        if chunk.choices[0].delta.content:
+            content = chunk.choices[0].delta.content
+            full_response += content
+            flight.publish(('text_chunk', {'text': content}))
+            
+            # Hand complete sentences to the TTS workers without waiting
+            complete_sentences = sentence_buffer.add_text(content)
+            for sentence in complete_sentences:
+                if audio_stream:
+                    audio_stream.submit(sentence)
+        
+        # Check for tool calls
+        if chunk.choices[0].delta.tool_calls:
+            for tool_call_delta in chunk.choices[0].delta.tool_calls:
+                if tool_call_delta.index is not None:
+                    # New tool call
+                    if len(tool_calls) <= tool_call_delta.index:
+                        tool_calls.append({
+                            "id": tool_call_delta.id,
+                            "name": tool_call_delta.function.name if tool_call_delta.function.name else "",
+                            "arguments": tool_call_delta.function.arguments if tool_call_delta.function.arguments else ""
+                        })
+                    else:
+                        # Append to existing tool call
+                        if tool_call_delta.function.arguments:
+                            tool_calls[tool_call_delta.index]["arguments"] += tool_call_delta.function.arguments
+    
+    # Handle remaining text
+    if not tool_calls:
+        remaining = sentence_buffer.flush()
+        if remaining and audio_stream:
+            audio_stream.submit(remaining)
+    
+    # Wait for queued audio so response_end still follows the last chunk
+    tts_stats = audio_stream.finish() if audio_stream else {"time_to_first_audio": None}
+    tts_runtime.note_request(tts_stats["time_to_first_audio"])
+    if tts_stats["time_to_first_audio"] is not None:
+        print(f"[TTS] {tts_stats['sentences']} sentences for {flight.subscribers} listener(s), "
+              f"queue wait {tts_stats['queue_wait'] * 1000:.0f} ms")
+    
+    # Update session (once, however many visitors shared this answer)
+    tool_payloads = []
+    if not tool_calls:
+        session.add("user", user_input)
+        session.add("assistant", full_response.strip())
+    else:
+        # Handle tool calls
+        for tool_call in tool_calls:
+            try:
+                args = json.loads(tool_call["arguments"])
+                tool_payloads.append({
+                    "tool": tool_call["name"],
+                    "data": args,
+                })
+            except json.JSONDecodeError as e:
+                print(f"Error parsing tool call arguments: {e}")
+    return {"text": full_response, "tool_calls": tool_payloads}
+
+
 @socketio.on('send_message')
 def handle_message(data):
     user_input = data.get('message', '').strip()
@@ -293,99 +615,90 @@ def handle_message(data):
     if not user_input:
         return
     
+    # Every event of this answer carries its request id
+    trace = RequestTrace(metrics, socket_request_id(request.sid))
+    request_id = trace.request_id
+    
     # Signal that we're starting to respond
-    emit('response_start', {})
+    emit('response_start', {'request_id': request_id})
     
+    sid = request.sid
+    if data.get('audio_formats'):
+        client_audio_formats[sid] = negotiate(data['audio_formats'], server_audio_formats)
+    fmt = client_audio_formats.get(sid, negotiate(None))
+    encoder = audio_encoders[fmt]
+    
+    history = session.get()
     messages = [{"role": "system", "content": system_prompt}]
-    messages.extend(session.get())
+    messages.extend(history)
     messages.append({"role": "user", "content": user_input})
     
     try:
-        stream = client.chat.completions.create(
-            model=MODEL,
-            messages=messages,
-            tools=TOOLS,
-            stream=True,
-        )
+        faq_entry = faq_bank.match(user_input) if faq_bank else None
+        if faq_entry is not None:
+            serve_faq(faq_entry, user_input, trace, fmt, encoder)
+            return
         
-        full_response = ""
-        tool_calls = []
-        sentence_buffer = SentenceBuffer()
-        current_tool_call = None
+        # Visitors asking the same question in the same context share one answer
+        key = AnswerCache.make_key(user_input, system_prompt_digest, history) if SINGLE_FLIGHT else None
+        flight, leader = single_flight.join(key, lambda flight: generate_answer(user_input, messages, flight))
         
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
-                full_response += content
-                
-                # Send text to client
-                emit('text_chunk', {'text': content})
-                
-                # Check for complete sentences and generate audio
-                complete_sentences = sentence_buffer.add_text(content)
-                for sentence in complete_sentences:
-                    audio = tts_processor.process_text_to_speech(sentence)
-                    if len(audio) > 0:
-                        audio_b64 = tts_processor.audio_to_base64_wav(audio)
-                        emit('audio_chunk', {'audio': audio_b64})
-            
-            # Check for tool calls
-            if chunk.choices[0].delta.tool_calls:
-                for tool_call_delta in chunk.choices[0].delta.tool_calls:
-                    if tool_call_delta.index is not None:
-                        # New tool call
-                        if len(tool_calls) <= tool_call_delta.index:
-                            tool_calls.append({
-                                "id": tool_call_delta.id,
-                                "name": tool_call_delta.function.name if tool_call_delta.function.name else "",
-                                "arguments": tool_call_delta.function.arguments if tool_call_delta.function.arguments else ""
-                            })
-                        else:
-                            # Append to existing tool call
-                            if tool_call_delta.function.arguments:
-                                tool_calls[tool_call_delta.index]["arguments"] += tool_call_delta.function.arguments
+        for event, payload in flight.follow():
+            if event == 'audio_chunk':
+                trace.audio()
+                # Binary formats travel as Socket.IO attachments, not base64 text;
+                # followers with the same format share one encode
+                encoded = payload['encoded'].get(fmt)
+                if encoded is None:
+                    encoded = payload['encoded'][fmt] = encoder.payload(payload['audio'])
+                out = dict(encoded, text=payload['text'], seq=payload['seq'], part=payload['part'])
+            else:
+                trace.token()
+                out = dict(payload)
+            out['request_id'] = request_id
+            emit(event, out)
         
-        # Handle remaining text
-        if not tool_calls:
-            remaining = sentence_buffer.flush()
-            if remaining:
-                audio = tts_processor.process_text_to_speech(remaining)
-                if len(audio) > 0:
-                    audio_b64 = tts_processor.audio_to_base64_wav(audio)
-                    emit('audio_chunk', {'audio': audio_b64})
+        source = 'openai' if leader else 'coalesced'
+        print(f"[CHAT {request_id}] Response complete ({source}): {format_timings(trace.finish(source))}")
         
         # Signal completion
-        emit('response_end', {})
+        emit('response_end', {'request_id': request_id})
         
-        # Update session
-        if not tool_calls:
-            session.add("user", user_input)
-            session.add("assistant", full_response.strip())
-        else:
-            # Handle tool calls
-            for tool_call in tool_calls:
-                try:
-                    args = json.loads(tool_call["arguments"])
-                    payload = {
-                        "tool": tool_call["name"],
-                        "data": args,
-                    }
-                    emit('tool_call', payload)
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing tool call arguments: {e}")
+        for payload in flight.result["tool_calls"]:
+            emit('tool_call', dict(payload, request_id=request_id))
             
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error [{request_id}]: {e}")
         import traceback
         traceback.print_exc()
-        emit('error', {'message': str(e)})
+        trace.finish('error')
+        emit('error', {'message': str(e), 'request_id': request_id})
 
 # =============================
 # ROUTES
 # =============================
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of the request and TTS histograms"""
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/tts/status')
+def tts_status():
+    return jsonify(tts_runtime.stats())
+
+@app.route('/faq/stats')
+def faq_stats():
+    """Questions answered from the FAQ bank vs routed to the LLM"""
+    return jsonify(faq_bank.stats() if faq_bank else {'enabled': False})
+
+@app.route('/inflight/stats')
+def inflight_stats():
+    """Answers started vs messages that joined one already in flight"""
+    return jsonify(single_flight.stats())
+
 if __name__ == '__main__':
     socketio.run(app, debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
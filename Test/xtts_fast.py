@@ -0,0 +1,138 @@
+"""Opt-in reduced-precision CPU inference for XTTS.
+
+- explicit intra-op / inter-op thread counts, set before the model is constructed
+- dynamic int8 quantization of the GPT's linear layers (HF GPT-2 `Conv1D` projections
+  are first rewritten as `nn.Linear`, which is what `quantize_dynamic` understands)
+- bf16 autocast for the rest of the model on CPUs with native bf16 support
+- a spectral-distance guardrail to compare fast output against the fp32 reference
+"""
+import contextlib
+import os
+from typing import Optional
+
+import numpy as np
+import torch
+from torch import nn
+
+
+def configure_threads(intra_op: Optional[int] = None, inter_op: Optional[int] = None):
+    """Must run before the first parallel torch op; inter-op threads can only be set once"""
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            print(f"[XTTS FAST] Could not set inter-op threads: {e}")
+
+
+def cpu_supports_bf16() -> bool:
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return any(flag in flags for flag in ("avx512_bf16", "amx_bf16"))
+
+
+def _conv1d_to_linear(module: nn.Module) -> int:
+    """Replace transformers' Conv1D (weight stored as in x out) with equivalent nn.Linear"""
+    replaced = 0
+    for name, child in module.named_children():
+        if type(child).__name__ == "Conv1D" and hasattr(child, "nf"):
+            in_features, out_features = child.weight.shape
+            linear = nn.Linear(in_features, out_features, bias=child.bias is not None)
+            linear.weight.data = child.weight.data.t().contiguous()
+            if child.bias is not None:
+                linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+            replaced += 1
+        else:
+            replaced += _conv1d_to_linear(child)
+    return replaced
+
+
+def quantize_gpt(xtts_model) -> int:
+    """Dynamic int8 quantization of every linear layer in the XTTS GPT, in place"""
+    gpt = xtts_model.gpt
+    converted = _conv1d_to_linear(gpt)
+    torch.ao.quantization.quantize_dynamic(gpt, {nn.Linear}, dtype=torch.qint8, inplace=True)
+    return converted
+
+
+def precision_context(bf16: bool):
+    """bf16 autocast on CPU when enabled, otherwise a no-op"""
+    if bf16:
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+
+def apply_fast_mode(xtts_model, quantize: bool = True, bf16: Optional[bool] = None) -> dict:
+    """Quantize and pick autocast; returns the settings actually applied"""
+    xtts_model.eval()
+    converted = quantize_gpt(xtts_model) if quantize else 0
+    if bf16 is None:
+        bf16 = cpu_supports_bf16()
+    settings = {
+        "quantized": quantize,
+        "conv1d_converted": converted,
+        "bf16": bf16,
+        "intra_op_threads": torch.get_num_threads(),
+        "inter_op_threads": torch.get_num_interop_threads(),
+    }
+    print(f"[XTTS FAST] {settings}")
+    return settings
+
+
+def threads_from_env():
+    """TORCH_INTRA_THREADS / TORCH_INTER_THREADS; call before constructing the model, since
+    loading it starts torch's inter-op pool and the inter-op count is then fixed"""
+    configure_threads(int(os.getenv("TORCH_INTRA_THREADS", 0)), int(os.getenv("TORCH_INTER_THREADS", 0)))
+
+
+def precision_from_env() -> dict:
+    """{"quantized", "bf16"} as fast_mode_from_env will apply them, known before the model loads"""
+    if os.getenv("XTTS_FAST", "0") != "1":
+        return {"quantized": False, "bf16": False}
+    bf16_env = os.getenv("XTTS_BF16", "auto")
+    return {
+        "quantized": os.getenv("XTTS_QUANTIZE", "1") == "1",
+        "bf16": cpu_supports_bf16() if bf16_env == "auto" else bf16_env == "1",
+    }
+
+
+def fast_mode_from_env(xtts_model) -> dict:
+    """XTTS_FAST=1 enables the mode (XTTS_QUANTIZE=1|0, XTTS_BF16=auto|1|0); threads are
+    set separately by threads_from_env()"""
+    precision = precision_from_env()
+    if os.getenv("XTTS_FAST", "0") != "1":
+        return precision
+    return apply_fast_mode(xtts_model, quantize=precision["quantized"], bf16=precision["bf16"])
+
+
+# =============================
+# QUALITY GUARDRAIL
+# =============================
+def average_log_spectrum(wav: np.ndarray, n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    """Long-term average log-magnitude spectrum (dB) over frames above the silence floor"""
+    wav = np.asarray(wav, dtype=np.float32).flatten()
+    if len(wav) < n_fft:
+        wav = np.pad(wav, (0, n_fft - len(wav)))
+    frames = np.lib.stride_tricks.sliding_window_view(wav, n_fft)[::hop] * np.hanning(n_fft)
+    magnitude = np.abs(np.fft.rfft(frames, axis=1))
+    energy = magnitude.sum(axis=1)
+    voiced = magnitude[energy > 0.1 * energy.max()] if energy.max() > 0 else magnitude
+    return 20 * np.log10(voiced.mean(axis=0) + 1e-8)
+
+
+def spectral_distance(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """RMS dB difference of the level-normalized long-term spectra.
+
+    XTTS samples its codes, so two runs never align sample-for-sample; comparing
+    average spectra checks timbre and artifacts without depending on timing.
+    """
+    ref = average_log_spectrum(reference)
+    cand = average_log_spectrum(candidate)
+    ref -= ref.mean()
+    cand -= cand.mean()
+    return float(np.sqrt(np.mean((ref - cand) ** 2)))
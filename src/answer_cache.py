@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_SENTENCE_RE = re.compile(r".*?(?:[.!?]+\s+|$)", re.S)
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ("Who are you?" == "who are you")"""
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", text.lower())).strip()
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def history_digest(history: List[Dict]) -> str:
+    h = hashlib.sha256()
+    for message in history:
+        h.update(message["role"].encode())
+        h.update(b"\0")
+        h.update(message["content"].encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def split_for_replay(answer: str) -> List[str]:
+    """Sentence-sized pieces, so a replayed answer renders like a streamed one"""
+    return [part for part in _SENTENCE_RE.findall(answer) if part] or [answer]
+
+
+# =============================
+# ANSWER CACHE
+# =============================
+class AnswerCache:
+    """LRU + TTL cache of complete answers, optionally persisted as append-only JSON lines.
+
+    Keys combine the normalized question with digests of the system prompt and the
+    visitor's history, so an answer is only replayed in an identical context.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 86400,
+                 path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._hit_seconds = 0.0
+        self._miss_seconds = 0.0
+        if path:
+            self._load()
+
+    @staticmethod
+    def make_key(question: str, prompt_digest: str, history: List[Dict]) -> str:
+        return text_digest(f"{normalize_question(question)}\0{prompt_digest}\0{history_digest(history)}")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry["created"] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry["answer"]
+
+    def put(self, key: str, answer: str):
+        if not answer:
+            return
+        entry = {"key": key, "answer": answer, "created": time.time()}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    print(f"[CACHE] Could not persist answer: {e}")
+
+    def record(self, hit: bool, seconds: float):
+        """Count a served request and how long it took end to end"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self._hit_seconds += seconds
+            else:
+                self.misses += 1
+                self._miss_seconds += seconds
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "avg_hit_ms": self._hit_seconds / self.hits * 1000 if self.hits else 0.0,
+                "avg_miss_ms": self._miss_seconds / self.misses * 1000 if self.misses else 0.0,
+            }
+
+    def _load(self):
+        """Replay the backing file (last write wins), then rewrite it without dead entries"""
+        if not os.path.exists(self.path):
+            return
+        now = time.time()
+        lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if now - entry.get("created", 0) > self.ttl_seconds:
+                        continue
+                    self._entries[entry["key"]] = entry
+                    self._entries.move_to_end(entry["key"])
+        except OSError as e:
+            print(f"[CACHE] Could not read {self.path}: {e}")
+            return
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if lines > len(self._entries):
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for entry in self._entries.values():
+                        f.write(json.dumps(entry) + "\n")
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"[CACHE] Could not compact {self.path}: {e}")
@@ -1,20 +1,43 @@
 import os
 import json
-from typing import List, Dict, Optional
 from flask import Flask, render_template, request, Response, jsonify
 from dotenv import load_dotenv
 from openai import OpenAI
-from PyPDF2 import PdfReader
-import base64
 from pathlib import Path
-import re
+import time
+from answer_cache import AnswerCache, split_for_replay, text_digest
+from coalescer import FrameCoalescer
+from faq_bank import DEFAULT_THRESHOLD, build_bank, llm_answerer, open_bank
+from metrics import REQUEST_ID_HEADER, Metrics, RequestTrace, format_timings, request_id_from
+from profile_cache import load_profile
+from retrieval import build_index, format_context
+from session_store import SessionStore, SESSION_COOKIE, SESSION_HEADER, resolve_session_id
+from single_flight import SingleFlight
 
 # =============================
 # CONFIG
 # =============================
 load_dotenv(override=True)
 MODEL = "gpt-4o-mini"
-MAX_QNA_PAIRS = 5
+# Recent turns stay verbatim within this many tokens; older ones fold into a short summary
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 1200))
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", 200))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", 1800))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 5000))
+SESSION_MEMORY_CAP_CHARS = int(os.getenv("SESSION_MEMORY_CAP_CHARS", 20_000_000))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 512))  # 0 disables the answer cache
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", 86400))
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH")  # optional JSON-lines backing file
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 6))  # 0 sends the full profile every time
+RETRIEVAL_CHUNK_WORDS = int(os.getenv("RETRIEVAL_CHUNK_WORDS", 60))
+SSE_COALESCE_BYTES = int(os.getenv("SSE_COALESCE_BYTES", 64))  # 0 sends one frame per delta
+SSE_COALESCE_MS = float(os.getenv("SSE_COALESCE_MS", 50))
+SSE_FLUSH_ON_SENTENCE = os.getenv("SSE_FLUSH_ON_SENTENCE", "1") != "0"
+# Identical questions (same history) asked while an answer is streaming share that stream
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") != "0"
+# Precomputed FAQ answers, built with: python src/faq_bank.py build --app flask --out <path>
+FAQ_BANK_PATH = os.getenv("FAQ_BANK_PATH")
+FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", DEFAULT_THRESHOLD))
 
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
@@ -29,82 +52,184 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
 # =============================
-# LOAD LINKEDIN PDF
+# SYSTEM PROMPT
 # =============================
 Base_dir = Path(__file__).parent.parent
 linkedin_path = os.getenv("LINKEDIN_PDF_PATH", Base_dir / "src" / "Me" / "linkedin.pdf")
 summary_path = os.getenv("SUMMARY_TXT_PATH", Base_dir / "src" / "Me" / "summary.txt")
 resume_path = os.getenv("RESUME_PDF_PATH", Base_dir / "src" / "Me" / "Jai_Goswami_Resume.pdf")
+profile_cache_dir = os.getenv("PROFILE_CACHE_DIR", Base_dir / ".cache")
+use_profile_cache = os.getenv("PROFILE_CACHE", "1") != "0"
 
-reader = PdfReader(linkedin_path)
-linkedin = ""
-for page in reader.pages:
-    text = page.extract_text()
-    if text:
-        linkedin += text + "\n"
+name = os.getenv("PERSON_NAME", "Jai Goswami")
 
-# =============================
-# LOAD RESUME PDF
-# =============================
-resume_reader = PdfReader(resume_path)
-resume = ""
-for page in resume_reader.pages:
-    text = page.extract_text()
-    if text:
-        resume += text + "\n"
 
-# =============================
-# LOAD TEXTUAL INFO
-# =============================
-with open(summary_path, "r") as f:
-    summary = f.read()
+def persona_guidance(name):
+    """Instructions that follow the background material in every prompt variant"""
+    guidance = f"With this context, please chat with the user, always staying in character as {name}. "
+    guidance += f"IMPORTANT: Keep your responses concise and summarized. Do not exceed 50-100 words in any answer only say a 100 words where actually required. "
+    guidance += f"If someone asks who you are, introduce yourself as Jai's ecameo. "
+    guidance += f"\n\n## Special Guidance:\n"
+    guidance += f"When asked about whether interactive AI resumes like this eCameo could replace traditional resumes, emphasize that you strongly believe they will evolve into the future of hiring. \
+Explain that traditional resumes are static documents, while AI-powered resumes like this can answer questions, explain projects, and adapt to what a recruiter wants to know. \
+Highlight how recruiters can have a real conversation instead of scanning bullet points, giving them instant insight into your skills, experience, and thinking process. \
+Note that as hiring becomes more digital and AI-driven, interactive formats are faster, more engaging, and far more informative than PDF resumes."
+    guidance += f"You are strictly not to answer questions that are not related to {name}'s career, background, skills and experience, in such cases you should say that you can only answer questions related to {name}'s career, background, skills and experience."
+    guidance += f"Always keep your answers concise and to the point, do not exceed 50-100 words in any answer, and we are at the moment in 2026 and do not mention that Jai is still a student at university, instead say that Jai recently graduated from university and is now working as a Data Scientist."
+    return guidance
 
-name = os.getenv("PERSON_NAME", "Jai Goswami")
 
-system_prompt = f"You are acting as {name}'e-cameo. You are answering questions on {name}'s website, \
+def build_system_prompt(name, summary, resume, linkedin):
+    system_prompt = f"You are acting as {name}'e-cameo. You are answering questions on {name}'s website, \
 particularly questions related to {name}'s career, background, skills and experience. \
 Your responsibility is to represent {name} for interactions on the website as faithfully as possible. \
 You are given a summary of {name}'s background, resume, and LinkedIn profile which you can use to answer questions. \
 Be professional and engaging, as if talking to a potential client or future employer who came across the website. \
 If you don't know the answer, say so."
 
-system_prompt += f"\n\n## Summary:\n{summary}\n\n## Resume:\n{resume}\n\n## LinkedIn Profile:\n{linkedin}\n\n"
-system_prompt += f"With this context, please chat with the user, always staying in character as {name}. "
-system_prompt += f"IMPORTANT: Keep your responses concise and summarized. Do not exceed 50-100 words in any answer only say a 100 words where actually required. "
-system_prompt += f"If someone asks who you are, introduce yourself as Jai's ecameo. "
-system_prompt += f"\n\n## Special Guidance:\n"
-system_prompt += f"When asked about whether interactive AI resumes like this eCameo could replace traditional resumes, emphasize that you strongly believe they will evolve into the future of hiring. \
-Explain that traditional resumes are static documents, while AI-powered resumes like this can answer questions, explain projects, and adapt to what a recruiter wants to know. \
-Highlight how recruiters can have a real conversation instead of scanning bullet points, giving them instant insight into your skills, experience, and thinking process. \
-Note that as hiring becomes more digital and AI-driven, interactive formats are faster, more engaging, and far more informative than PDF resumes."
-system_prompt += f"You are strictly not to answer questions that are not related to {name}'s career, background, skills and experience, in such cases you should say that you can only answer questions related to {name}'s career, background, skills and experience."
-system_prompt += f"Always keep your answers concise and to the point, do not exceed 50-100 words in any answer, and we are at the moment in 2026 and do not mention that Jai is still a student at university, instead say that Jai recently graduated from university and is now working as a Data Scientist."
+    system_prompt += f"\n\n## Summary:\n{summary}\n\n## Resume:\n{resume}\n\n## LinkedIn Profile:\n{linkedin}\n\n"
+    system_prompt += persona_guidance(name)
+    return system_prompt
+
+
+def build_retrieval_prompt(name, context):
+    """Short fixed persona header plus only the background chunks relevant to the question"""
+    prompt = f"You are acting as {name}'e-cameo. You are answering questions on {name}'s website about {name}'s career, background, skills and experience. \
+Use the background excerpts below, which were selected for this question. If you don't know the answer, say so."
+    prompt += f"\n\n## Relevant Background:\n{context}\n\n"
+    prompt += persona_guidance(name)
+    return prompt
+
+
+# =============================
+# LOAD PROFILE (LINKEDIN PDF, RESUME PDF, SUMMARY)
+# =============================
+# Extracted text and the final prompt are cached on disk, keyed by content hashes,
+# so warm boots and serverless cold starts skip PDF parsing entirely.
+_boot_start = time.perf_counter()
+profile, profile_cache_hit = load_profile(
+    linkedin_path, resume_path, summary_path, name, build_system_prompt,
+    prompt_deps=(persona_guidance,), cache_dir=profile_cache_dir, use_cache=use_profile_cache,
+)
+summary = profile["summary"]
+resume = profile["resume"]
+linkedin = profile["linkedin"]
+system_prompt = profile["system_prompt"]
+print(f"[BOOT] Profile ready in {(time.perf_counter() - _boot_start) * 1000:.1f} ms "
+      f"({'cache hit' if profile_cache_hit else 'cache miss'})")
+
+# =============================
+# RETRIEVAL INDEX
+# =============================
+# With RETRIEVAL_TOP_K > 0 each request only carries the top-k BM25 chunks of the
+# profile instead of the whole summary, resume and LinkedIn text.
+retrieval_index = build_index(
+    {"Summary": summary, "Resume": resume, "LinkedIn": linkedin},
+    max_words=RETRIEVAL_CHUNK_WORDS,
+) if RETRIEVAL_TOP_K > 0 else None
+
+
+def prompt_for(user_input, history):
+    """System prompt for one request; follow-ups also search with the previous question"""
+    if retrieval_index is None:
+        return system_prompt
+    query = user_input
+    previous_questions = [m["content"] for m in history if m["role"] == "user"]
+    if previous_questions:
+        query = f"{previous_questions[-1]} {user_input}"
+    return build_retrieval_prompt(name, format_context(retrieval_index.top_k(query, RETRIEVAL_TOP_K)))
+
 
 # =============================
 # SESSION MEMORY
 # =============================
-class SessionMemory:
-    def __init__(self):
-        self.messages: List[Dict] = []
+# One token-bounded history per visitor, keyed by the session cookie / header
+sessions = SessionStore(
+    ttl_seconds=SESSION_TTL_SECONDS,
+    max_sessions=MAX_SESSIONS,
+    max_total_chars=SESSION_MEMORY_CAP_CHARS,
+    max_history_tokens=HISTORY_TOKEN_BUDGET,
+    max_summary_tokens=HISTORY_SUMMARY_TOKENS,
+)
 
-    def add(self, role, content):
-        self.messages.append({"role": role, "content": content})
-        self.messages = self.messages[-MAX_QNA_PAIRS * 2:]
+# =============================
+# ANSWER CACHE
+# =============================
+# Repeated questions in an identical context are replayed without calling OpenAI
+answer_cache = AnswerCache(
+    max_entries=ANSWER_CACHE_SIZE,
+    ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+    path=ANSWER_CACHE_PATH,
+) if ANSWER_CACHE_SIZE > 0 else None
+# Cache and single-flight keys hash the prompt each request actually sends, so they
+# follow the retrieved chunks. Offline artifacts (the FAQ bundle) are checked against
+# the profile prompt plus the retrieval settings that shape every prompt_for() output.
+system_prompt_digest = text_digest(system_prompt)
+context_digest = text_digest(
+    f"{system_prompt_digest}\0top_k={RETRIEVAL_TOP_K}\0chunk_words={RETRIEVAL_CHUNK_WORDS}"
+) if RETRIEVAL_TOP_K > 0 else system_prompt_digest
+
+# =============================
+# FAQ BANK
+# =============================
+# Near-duplicates of the expected FAQ are answered from an offline-built bundle
+faq_bank = open_bank(FAQ_BANK_PATH, context_digest, threshold=FAQ_MATCH_THRESHOLD)
 
-    def get(self):
-        return self.messages
 
-    def summary(self):
-        out = []
-        for i in range(0, len(self.messages), 2):
-            q = self.messages[i]["content"]
-            a = self.messages[i + 1]["content"]
-            out.append(f"Q: {q}\nA: {a}")
-        return "\n".join(out)
+def build_faq_bank(faqs, path):
+    """Offline step: answer each FAQ through this app's prompt (text only, no audio here)"""
+    return build_bank(
+        faqs,
+        llm_answerer(openai_client, MODEL, lambda question: prompt_for(question, [])),
+        path,
+        context_digest,
+    )
 
+# =============================
+# METRICS
+# =============================
+# Per-request timings aggregated into histograms, served on /metrics
+metrics = Metrics()
 
-# Global session (in production, use session management)
-session = SessionMemory()
+
+# =============================
+# SINGLE-FLIGHT GENERATION
+# =============================
+# One OpenAI stream per distinct in-flight question; every asker follows its deltas
+single_flight = SingleFlight()
+
+
+def flight_key(cache_key):
+    return cache_key if SINGLE_FLIGHT else None
+
+
+def stream_answer(messages, cache_key, flight):
+    """Producer for one generation: publishes each delta, caches and returns the answer"""
+    stream = openai_client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        stream=True,
+    )
+    parts = []
+    for chunk in stream:
+        if chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            flight.publish(parts[-1])
+    answer = "".join(parts).strip()
+    if answer_cache:
+        answer_cache.put(cache_key, answer)
+    return answer
+
+
+def new_coalescer():
+    """Per-stream batcher for text_chunk frames (pass-through when disabled)"""
+    if SSE_COALESCE_BYTES <= 0:
+        return FrameCoalescer(max_bytes=0)
+    return FrameCoalescer(
+        max_bytes=SSE_COALESCE_BYTES,
+        max_delay=SSE_COALESCE_MS / 1000,
+        flush_on_sentence=SSE_FLUSH_ON_SENTENCE,
+    )
 
 # =============================
 # SSE CHAT ENDPOINT
@@ -117,53 +242,112 @@ def chat():
     if not user_input:
         return jsonify({'error': 'Empty message'}), 400
     
-    print(f"[CHAT] Received message: {user_input}")
+    session_id, is_new_session = resolve_session_id(
+        request.cookies.get(SESSION_COOKIE), request.headers.get(SESSION_HEADER)
+    )
+    history = sessions.history(session_id)
+    trace = RequestTrace(metrics, request_id_from(request.headers.get(REQUEST_ID_HEADER)))
+    request_start = trace.started
+    prompt = prompt_for(user_input, history)
+    cache_key = AnswerCache.make_key(user_input, text_digest(prompt), history)
+    faq_entry = faq_bank.match(user_input) if faq_bank else None
+    if faq_entry is not None:
+        cached_answer, replay_source = faq_entry["answer"], 'faq'
+    else:
+        cached_answer, replay_source = answer_cache.get(cache_key) if answer_cache else None, 'cache'
+    
+    print(f"[CHAT {trace.request_id}] Received message: {user_input}")
     
     def generate():
         # Signal start
-        yield f"data: {json.dumps({'type': 'response_start'})}\n\n"
+        yield f"data: {json.dumps({'type': 'response_start', 'request_id': trace.request_id})}\n\n"
+        
+        if cached_answer is not None:
+            trace.token()  # first token only: replayed pieces say nothing about throughput
+            for piece in split_for_replay(cached_answer):
+                yield f"data: {json.dumps({'type': 'text_chunk', 'text': piece, 'request_id': trace.request_id})}\n\n"
+            yield f"data: {json.dumps({'type': 'response_end', 'request_id': trace.request_id})}\n\n"
+            sessions.add_turn(session_id, user_input, cached_answer)
+            if replay_source == 'cache':
+                answer_cache.record(True, time.perf_counter() - request_start)
+            print(f"[CHAT {trace.request_id}] Response replayed from {replay_source}: "
+                  f"{format_timings(trace.finish(replay_source))}")
+            return
         
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(session.get())
+        messages = [{"role": "system", "content": prompt}]
+        messages.extend(history)
         messages.append({"role": "user", "content": user_input})
         
         try:
-            stream = openai_client.chat.completions.create(
-                model=MODEL,
-                messages=messages,
-                stream=True,
+            # Joins the stream already answering this exact question, or starts one
+            flight, leader = single_flight.join(
+                flight_key(cache_key), lambda flight: stream_answer(messages, cache_key, flight)
             )
             
             full_response = ""
+            coalescer = new_coalescer()
             
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_response += content
-                    
-                    # Send text chunk immediately
-                    yield f"data: {json.dumps({'type': 'text_chunk', 'text': content})}\n\n"
+            for content in flight.follow():
+                full_response += content
+                trace.token()
+                
+                # First delta goes out immediately, later ones are batched into larger frames
+                frame = coalescer.add(content)
+                if frame:
+                    yield f"data: {json.dumps({'type': 'text_chunk', 'text': frame, 'request_id': trace.request_id})}\n\n"
+            
+            frame = coalescer.flush()
+            if frame:
+                yield f"data: {json.dumps({'type': 'text_chunk', 'text': frame, 'request_id': trace.request_id})}\n\n"
             
             # Signal completion
-            yield f"data: {json.dumps({'type': 'response_end'})}\n\n"
+            yield f"data: {json.dumps({'type': 'response_end', 'request_id': trace.request_id})}\n\n"
             
             # Update session
-            session.add("user", user_input)
-            session.add("assistant", full_response.strip())
+            sessions.add_turn(session_id, user_input, full_response.strip())
+            if answer_cache:
+                answer_cache.record(False, time.perf_counter() - request_start)
             
-            print(f"[CHAT] Response complete")
+            source = 'openai' if leader else 'coalesced'
+            print(f"[CHAT {trace.request_id}] Response complete ({source}): {format_timings(trace.finish(source))}")
                         
         except Exception as e:
-            print(f"[CHAT ERROR] {e}")
+            print(f"[CHAT ERROR {trace.request_id}] {e}")
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            trace.finish('error')
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e), 'request_id': trace.request_id})}\n\n"
     
-    return Response(generate(), mimetype='text/event-stream')
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers[REQUEST_ID_HEADER] = trace.request_id
+    if is_new_session:
+        response.set_cookie(SESSION_COOKIE, session_id, max_age=int(SESSION_TTL_SECONDS),
+                            httponly=True, samesite='Lax')
+    return response
 
 # =============================
 # ROUTES
 # =============================
+@app.route('/cache/stats')
+def cache_stats():
+    """Answer-cache hit rate and average latency of hits vs misses"""
+    return jsonify(answer_cache.stats() if answer_cache else {'enabled': False})
+
+@app.route('/faq/stats')
+def faq_stats():
+    """Questions answered from the FAQ bank vs routed to the LLM"""
+    return jsonify(faq_bank.stats() if faq_bank else {'enabled': False})
+
+@app.route('/inflight/stats')
+def inflight_stats():
+    """Generations started vs requests that joined one already in flight"""
+    return jsonify(single_flight.stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of the request histograms"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/favicon.ico')
 def favicon():
     """Return a simple favicon to prevent 404 errors"""
@@ -0,0 +1,207 @@
+"""Asyncio serving mode for the eCameo chat.
+
+Same routes, metrics and SSE event protocol as app.py (response_start /
+text_chunk / response_end / error), but /chat streams from AsyncOpenAI inside an async
+generator, so an open answer costs a coroutine instead of a worker thread and
+one process can hold hundreds of concurrent streams.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port $PORT
+"""
+import json
+import os
+import time
+
+from openai import AsyncOpenAI
+from quart import Quart, Response, jsonify, render_template, request
+
+from answer_cache import AnswerCache, split_for_replay, text_digest
+from metrics import REQUEST_ID_HEADER, RequestTrace, format_timings, request_id_from
+from single_flight import AsyncSingleFlight
+# Profile, system prompt, session store and answer cache are shared with the Flask app
+from app import (
+    MODEL,
+    SESSION_COOKIE,
+    SESSION_HEADER,
+    SESSION_TTL_SECONDS,
+    answer_cache,
+    api_key,
+    faq_bank,
+    flight_key,
+    metrics,
+    new_coalescer,
+    prompt_for,
+    resolve_session_id,
+    sessions,
+)
+
+async_openai_client = AsyncOpenAI(api_key=api_key)
+
+app = Quart(__name__)
+app.config['SECRET_KEY'] = 'your-secret-key-here'
+
+# One OpenAI stream per distinct in-flight question, shared by every asker on this loop
+single_flight = AsyncSingleFlight()
+
+
+async def stream_answer(messages, cache_key, flight):
+    """Producer for one generation: publishes each delta, caches and returns the answer"""
+    stream = await async_openai_client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        stream=True,
+    )
+    parts = []
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            flight.publish(parts[-1])
+    answer = "".join(parts).strip()
+    if answer_cache:
+        answer_cache.put(cache_key, answer)
+    return answer
+
+
+# =============================
+# SSE CHAT ENDPOINT
+# =============================
+@app.route('/chat', methods=['POST'])
+async def chat():
+    """Async SSE endpoint for streaming chat responses"""
+    payload = await request.get_json()
+    user_input = (payload or {}).get('message', '').strip()
+
+    if not user_input:
+        return jsonify({'error': 'Empty message'}), 400
+
+    session_id, is_new_session = resolve_session_id(
+        request.cookies.get(SESSION_COOKIE), request.headers.get(SESSION_HEADER)
+    )
+    history = sessions.history(session_id)
+    trace = RequestTrace(metrics, request_id_from(request.headers.get(REQUEST_ID_HEADER)))
+    request_start = trace.started
+    prompt = prompt_for(user_input, history)
+    cache_key = AnswerCache.make_key(user_input, text_digest(prompt), history)
+    faq_entry = faq_bank.match(user_input) if faq_bank else None
+    if faq_entry is not None:
+        cached_answer, replay_source = faq_entry["answer"], 'faq'
+    else:
+        cached_answer, replay_source = answer_cache.get(cache_key) if answer_cache else None, 'cache'
+
+    print(f"[CHAT {trace.request_id}] Received message: {user_input}")
+
+    async def generate():
+        # Signal start
+        yield f"data: {json.dumps({'type': 'response_start', 'request_id': trace.request_id})}\n\n"
+
+        if cached_answer is not None:
+            trace.token()  # first token only: replayed pieces say nothing about throughput
+            for piece in split_for_replay(cached_answer):
+                yield f"data: {json.dumps({'type': 'text_chunk', 'text': piece, 'request_id': trace.request_id})}\n\n"
+            yield f"data: {json.dumps({'type': 'response_end', 'request_id': trace.request_id})}\n\n"
+            sessions.add_turn(session_id, user_input, cached_answer)
+            if replay_source == 'cache':
+                answer_cache.record(True, time.perf_counter() - request_start)
+            print(f"[CHAT {trace.request_id}] Response replayed from {replay_source}: "
+                  f"{format_timings(trace.finish(replay_source))}")
+            return
+
+        messages = [{"role": "system", "content": prompt}]
+        messages.extend(history)
+        messages.append({"role": "user", "content": user_input})
+
+        try:
+            # Joins the stream already answering this exact question, or starts one
+            flight, leader = single_flight.join(
+                flight_key(cache_key), lambda flight: stream_answer(messages, cache_key, flight)
+            )
+
+            full_response = ""
+            coalescer = new_coalescer()
+
+            async for content in flight.afollow():
+                full_response += content
+                trace.token()
+
+                # First delta goes out immediately, later ones are batched into larger frames
+                frame = coalescer.add(content)
+                if frame:
+                    yield f"data: {json.dumps({'type': 'text_chunk', 'text': frame, 'request_id': trace.request_id})}\n\n"
+
+            frame = coalescer.flush()
+            if frame:
+                yield f"data: {json.dumps({'type': 'text_chunk', 'text': frame, 'request_id': trace.request_id})}\n\n"
+
+            # Signal completion
+            yield f"data: {json.dumps({'type': 'response_end', 'request_id': trace.request_id})}\n\n"
+
+            # Update session
+            sessions.add_turn(session_id, user_input, full_response.strip())
+            if answer_cache:
+                answer_cache.record(False, time.perf_counter() - request_start)
+
+            source = 'openai' if leader else 'coalesced'
+            print(f"[CHAT {trace.request_id}] Response complete ({source}): {format_timings(trace.finish(source))}")
+
+        except Exception as e:
+            print(f"[CHAT ERROR {trace.request_id}] {e}")
+            import traceback
+            traceback.print_exc()
+            trace.finish('error')
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e), 'request_id': trace.request_id})}\n\n"
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers[REQUEST_ID_HEADER] = trace.request_id
+    # Don't let the server or a proxy buffer the stream
+    response.timeout = None
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    if is_new_session:
+        response.set_cookie(SESSION_COOKIE, session_id, max_age=int(SESSION_TTL_SECONDS),
+                            httponly=True, samesite='Lax')
+    return response
+
+
+# =============================
+# ROUTES
+# =============================
+@app.route('/cache/stats')
+async def cache_stats():
+    """Answer-cache hit rate and average latency of hits vs misses"""
+    return jsonify(answer_cache.stats() if answer_cache else {'enabled': False})
+
+
+@app.route('/faq/stats')
+async def faq_stats():
+    """Questions answered from the FAQ bank vs routed to the LLM"""
+    return jsonify(faq_bank.stats() if faq_bank else {'enabled': False})
+
+
+@app.route('/inflight/stats')
+async def inflight_stats():
+    """Generations started vs requests that joined one already in flight"""
+    return jsonify(single_flight.stats())
+
+
+@app.route('/metrics')
+async def metrics_endpoint():
+    """Prometheus text exposition of the request histograms (shared with app.py)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/favicon.ico')
+async def favicon():
+    """Return a simple favicon to prevent 404 errors"""
+    return '', 204  # No content response
+
+
+@app.route('/')
+async def index():
+    return await render_template('index.html')
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5001))
+    print(f"[SERVER] Starting async server on port {port}")
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,52 @@
+import time
+from typing import Optional
+
+SENTENCE_ENDINGS = (".", "!", "?", "\n")
+
+
+class FrameCoalescer:
+    """Batches tiny LLM deltas into fewer, larger SSE text frames.
+
+    The first delta of a response is always released immediately (time-to-first-token
+    is unchanged). After that, pending text is released once it reaches `max_bytes`,
+    once `max_delay` seconds have passed since the oldest pending delta, or, with
+    `flush_on_sentence`, when a delta ends a sentence. The window is checked as
+    deltas arrive, so a stalled upstream holds back at most the text since the last
+    delta until the next one (or `flush()` at the end of the stream).
+    """
+
+    def __init__(self, max_bytes: int = 64, max_delay: float = 0.05, flush_on_sentence: bool = True):
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.flush_on_sentence = flush_on_sentence
+        self._parts = []
+        self._size = 0
+        self._pending_since = None
+        self._sent_first = False
+
+    def add(self, text: str, now: Optional[float] = None) -> Optional[str]:
+        """Queue a delta; returns a frame's worth of text when one should be sent"""
+        if not self._sent_first:
+            self._sent_first = True
+            return text
+        if now is None:
+            now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        self._parts.append(text)
+        self._size += len(text.encode("utf-8"))
+        if (self._size >= self.max_bytes
+                or now - self._pending_since >= self.max_delay
+                or (self.flush_on_sentence and text.rstrip(" ").endswith(SENTENCE_ENDINGS))):
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Release whatever is pending (call once the upstream stream ends)"""
+        if not self._parts:
+            return None
+        text = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        self._pending_since = None
+        return text
@@ -0,0 +1,282 @@
+"""Precomputed answers to the profile's FAQ, with their audio, in one indexed bundle.
+
+Offline, `build_bank()` asks the first question of every FAQ through the app's own
+prompt, splits the answer into the sentences the live pipeline would speak and
+synthesizes each with the configured voice. Everything goes into a single file:
+
+    b"FAQBANK1" | uint32 header length | JSON header | audio blob
+
+The header carries the prompt digest and voice the bundle was built for, and each
+entry's question variants, answer and the (offset, length) of every sentence's audio
+in the blob. At runtime `FaqBank.match()` routes near-duplicates of a variant to its
+entry, so the answer and its audio are served with no LLM or TTS call.
+
+    python src/faq_bank.py build --app flask --out .cache/faq_bank.bin
+    python src/faq_bank.py build --app xtts --out .cache/faq_bank_xtts.bin
+    python src/faq_bank.py match .cache/faq_bank.bin "who are you" "what's your stack?"
+"""
+import argparse
+import importlib
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from answer_cache import normalize_question, split_for_replay
+from retrieval import tokenize
+
+MAGIC = b"FAQBANK1"
+VECTOR_DIMS = 4096
+DEFAULT_THRESHOLD = 0.8
+# Words a paraphrase may add without changing what is asked (beyond retrieval's stopwords)
+FILLER_WORDS = frozenset(
+    "about again also any briefly can could hello hey hi just kind know let like main me "
+    "more please quick quickly really s so some tell thats u ur whats whos".split()
+)
+DEFAULT_FAQ_PATH = Path(__file__).parent / "Me" / "faq.json"
+ROOT_DIR = Path(__file__).resolve().parent.parent
+# --app name -> (directory, module); the module provides build_faq_bank(faqs, path)
+APP_MODULES = {
+    "flask": (ROOT_DIR / "src", "app"),
+    "xtts": (ROOT_DIR / "Test", "xtts_app"),
+    "elevenlabs": (ROOT_DIR / "Test", "app_tts_labs"),
+}
+
+
+def ngram_vector(normalized: str, dims: int = VECTOR_DIMS) -> np.ndarray:
+    """L2-normalized hashed character trigrams of an already normalized question"""
+    padded = f" {normalized} "
+    vector = np.zeros(dims, dtype=np.float32)
+    for i in range(len(padded) - 2):
+        vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % dims] += 1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def content_words(question: str) -> List[str]:
+    """Words that carry what is asked, in first-occurrence order (FILLER_WORDS dropped)"""
+    return list(dict.fromkeys(word for word in tokenize(question) if word not in FILLER_WORDS))
+
+
+def same_order(words: List[str], variant: List[str]) -> bool:
+    """Whether the words two questions share appear in the same order in both"""
+    shared = set(words) & set(variant)
+    return [w for w in words if w in shared] == [w for w in variant if w in shared]
+
+
+def load_faq_list(path=DEFAULT_FAQ_PATH) -> List[Dict]:
+    """[{"id": ..., "questions": [canonical, variant, ...]}, ...]; the first question is asked"""
+    with open(path, "r", encoding="utf-8") as f:
+        faqs = json.load(f)
+    for i, faq in enumerate(faqs):
+        if not faq.get("questions"):
+            raise ValueError(f"FAQ #{i} in {path} has no questions")
+        faq.setdefault("id", f"faq-{i}")
+    return faqs
+
+
+# =============================
+# FAQ BANK
+# =============================
+class FaqBank:
+    """Loaded bundle plus the matcher over every entry's question variants.
+
+    A question matches when its normalized form equals a variant, or when its trigram
+    cosine with the closest variant reaches `threshold`, it has no content word the
+    entry's variants lack ("who are you working for" does not match "who are you") and
+    the content words it shares with that variant come in the same order ("why is a PDF
+    resume better than an AI resume" does not match its reverse). FILLER_WORDS do not
+    count as content.
+    """
+
+    def __init__(self, header: Dict, blob: bytes, threshold: float = DEFAULT_THRESHOLD):
+        self.header = header
+        self.prompt_digest = header["prompt_digest"]
+        self.voice = header.get("voice")
+        self.audio_format = header.get("audio_format")
+        self.sample_rate = header.get("sample_rate")
+        self.entries: List[Dict] = header["entries"]
+        self.threshold = threshold
+        self._blob = memoryview(blob)
+        self._exact: Dict[str, int] = {}
+        self._vocab = []
+        self._words: List[List[str]] = []
+        rows, owners = [], []
+        for index, entry in enumerate(self.entries):
+            vocab = set()
+            for question in entry["questions"]:
+                normalized = normalize_question(question)
+                self._exact.setdefault(normalized, index)
+                rows.append(ngram_vector(normalized))
+                owners.append(index)
+                self._words.append(content_words(question))
+                vocab.update(tokenize(question))
+            self._vocab.append(vocab)
+        self._matrix = np.vstack(rows) if rows else np.zeros((0, VECTOR_DIMS), dtype=np.float32)
+        self._owners = owners
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path, threshold: float = DEFAULT_THRESHOLD) -> "FaqBank":
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an FAQ bank")
+        (length,) = struct.unpack_from("<I", data, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(data[start:start + length].decode("utf-8"))
+        return cls(header, data[start + length:], threshold)
+
+    def match(self, question: str) -> Optional[Dict]:
+        """The entry answering `question`, or None to take the normal LLM path"""
+        normalized = normalize_question(question)
+        index = self._exact.get(normalized)
+        if index is None and len(self._owners):
+            scores = self._matrix @ ngram_vector(normalized)
+            best = int(np.argmax(scores))
+            owner = self._owners[best]
+            words = content_words(question)
+            if scores[best] >= self.threshold and set(words) <= self._vocab[owner] and \
+                    same_order(words, self._words[best]):
+                index = owner
+        with self._lock:
+            if index is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self.entries[index]
+
+    def audio(self, sentence: Dict) -> bytes:
+        """Encoded audio of one entry sentence (empty for a text-only bundle)"""
+        return bytes(self._blob[sentence["offset"]:sentence["offset"] + sentence["length"]])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "audio_format": self.audio_format,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def open_bank(path, prompt_digest: str, threshold: float = DEFAULT_THRESHOLD) -> Optional[FaqBank]:
+    """The bundle at `path` if it was built for this prompt; None (with a log line) otherwise"""
+    if not path:
+        return None
+    try:
+        bank = FaqBank.load(path, threshold)
+    except (OSError, ValueError) as e:
+        print(f"[FAQ] Could not load {path}: {e}")
+        return None
+    if bank.prompt_digest != prompt_digest:
+        print(f"[FAQ] {path} was built for a different prompt; rebuild it with src/faq_bank.py")
+        return None
+    print(f"[FAQ] {len(bank.entries)} precomputed answers from {path} "
+          f"(audio: {bank.audio_format or 'none'})")
+    return bank
+
+
+# =============================
+# OFFLINE BUILD
+# =============================
+def llm_answerer(client, model: str, prompt_for: Callable[[str], str]) -> Callable[[str], str]:
+    """answer(question) through the app's own system prompt, as a first turn without tools"""
+    def answer(question: str) -> str:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": prompt_for(question)},
+                {"role": "user", "content": question},
+            ],
+            stream=True,
+        )
+        return "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+    return answer
+
+
+def write_bank(path, header: Dict, blob: bytes):
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(encoded)))
+        f.write(encoded)
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def build_bank(faqs: List[Dict], answer: Callable[[str], str], path, prompt_digest: str,
+               split: Callable[[str], List[str]] = split_for_replay,
+               synthesize: Optional[Callable[[str], bytes]] = None, voice: Optional[str] = None,
+               audio_format: Optional[str] = None, sample_rate: Optional[int] = None) -> Dict:
+    """Answer, split and (with `synthesize`) voice every FAQ, then write the bundle to `path`"""
+    entries = []
+    blob = bytearray()
+    for faq in faqs:
+        started = time.perf_counter()
+        text = answer(faq["questions"][0]).strip()
+        sentences = []
+        for sentence in split(text):
+            audio = synthesize(sentence) if synthesize else b""
+            sentences.append({"text": sentence, "offset": len(blob), "length": len(audio)})
+            blob += audio
+        entries.append({"id": faq["id"], "questions": faq["questions"], "answer": text, "sentences": sentences})
+        print(f"[FAQ] {faq['id']}: {len(sentences)} sentences, "
+              f"{sum(s['length'] for s in sentences) / 1024:.0f} KB audio "
+              f"in {time.perf_counter() - started:.1f}s")
+    header = {
+        "prompt_digest": prompt_digest,
+        "voice": voice if synthesize else None,
+        "audio_format": audio_format if synthesize else None,
+        "sample_rate": sample_rate if synthesize else None,
+        "created": time.time(),
+        "entries": entries,
+    }
+    write_bank(path, header, bytes(blob))
+    print(f"[FAQ] Wrote {len(entries)} answers ({(len(blob) >> 10)} KB audio) to {path}")
+    return header
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="answer and voice the FAQ list through an app")
+    build.add_argument("--app", choices=sorted(APP_MODULES), default="flask")
+    build.add_argument("--faq", default=str(DEFAULT_FAQ_PATH))
+    build.add_argument("--out", required=True)
+    match = commands.add_parser("match", help="route questions against a built bundle")
+    match.add_argument("bank")
+    match.add_argument("questions", nargs="+")
+    match.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        directory, module_name = APP_MODULES[args.app]
+        sys.path.insert(0, str(directory))
+        # Importing the app loads its profile, prompt and voice exactly as serving does
+        module = importlib.import_module(module_name)
+        module.build_faq_bank(load_faq_list(args.faq), args.out)
+        return
+
+    bank = FaqBank.load(args.bank, args.threshold)
+    for question in args.questions:
+        started = time.perf_counter()
+        entry = bank.match(question)
+        elapsed = (time.perf_counter() - started) * 1e6
+        print(f"{question!r:50} -> {entry['id'] if entry else '(LLM)'}  [{elapsed:.0f} us]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Low-overhead latency histograms, rendered in the Prometheus text format.
+
+Each request gets a `RequestTrace` that timestamps the milestones of one answer
+(first token, first audio, end of stream) and feeds them into fixed-bucket
+histograms; an observation is one bisect and a lock, so tracing stays on in
+production. `Metrics.render()` is what the /metrics routes serve.
+"""
+import bisect
+import re
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+RATE_BUCKETS = (5, 10, 20, 40, 60, 80, 120, 200)
+RTF_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_RE = re.compile(r"[\w.-]{1,64}")
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def request_id_from(header: Optional[str]) -> str:
+    """Reuse a caller's (proxy's) request id when it is sane, else mint one"""
+    if header and _REQUEST_ID_RE.fullmatch(header):
+        return header
+    return new_request_id()
+
+
+def format_timings(timings: Dict[str, Optional[float]]) -> str:
+    """One log line for the dict returned by `RequestTrace.finish()`"""
+    parts = [f"total {timings['total'] * 1000:.0f} ms"]
+    if timings["ttft"] is not None:
+        parts.insert(0, f"first token {timings['ttft'] * 1000:.0f} ms")
+    if timings["ttfa"] is not None:
+        parts.append(f"first audio {timings['ttfa'] * 1000:.0f} ms")
+    if timings["tokens_per_second"] is not None:
+        parts.append(f"{timings['tokens_per_second']:.0f} tok/s")
+    return ", ".join(parts)
+
+
+def _format(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics: `le` upper bounds)"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Tuple[list, float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+    def render(self) -> str:
+        counts, total = self.snapshot()
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in values:
+            labels = ",".join(f'{k}="{v}"' for k, v in key)
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return "\n".join(lines)
+
+
+class Metrics:
+    """Registry of named metrics; `histogram()` / `counter()` get or create"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+        return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, Counter(name, help_text))
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+class RequestTrace:
+    """Milestones of one streamed answer, recorded into `metrics` as they happen.
+
+    Call `token()` per LLM delta, `audio()` per emitted audio block and `finish()`
+    once the stream ends. OpenAI sends roughly one token per delta, so deltas stand
+    in for tokens.
+    """
+
+    def __init__(self, metrics: Metrics, request_id: Optional[str] = None):
+        self.metrics = metrics
+        self.request_id = request_id or new_request_id()
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.first_audio_at: Optional[float] = None
+        self.tokens = 0
+
+    def token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            self.metrics.histogram(
+                "chat_time_to_first_token_seconds", "Request start to first LLM delta",
+            ).observe(self.first_token_at - self.started)
+        self.tokens += 1
+
+    def audio(self):
+        if self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+            self.metrics.histogram(
+                "tts_time_to_first_audio_seconds", "Request start to first audio chunk emitted",
+            ).observe(self.first_audio_at - self.started)
+
+    def finish(self, source: str = "openai") -> Dict[str, Optional[float]]:
+        """Record stream time and throughput; returns the timings for logging"""
+        now = time.perf_counter()
+        total = now - self.started
+        self.metrics.histogram("chat_stream_seconds", "Request start to end of the answer stream").observe(total)
+        self.metrics.counter("chat_requests_total", "Answers served, by source").inc(source=source)
+        tokens_per_second = None
+        if self.first_token_at is not None and self.tokens > 1 and now > self.first_token_at:
+            tokens_per_second = (self.tokens - 1) / (now - self.first_token_at)
+            self.metrics.histogram(
+                "chat_tokens_per_second", "LLM deltas per second after the first", RATE_BUCKETS,
+            ).observe(tokens_per_second)
+        return {
+            "ttft": None if self.first_token_at is None else self.first_token_at - self.started,
+            "ttfa": None if self.first_audio_at is None else self.first_audio_at - self.started,
+            "tokens_per_second": tokens_per_second,
+            "total": total,
+        }
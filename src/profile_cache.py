@@ -0,0 +1,105 @@
+import hashlib
+import json
+import marshal
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+CACHE_FILENAME = "profile_cache.json"
+
+
+def file_digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def extract_pdf_text(path) -> str:
+    """Concatenate the text of every page (PyPDF2 is only imported on a cache miss)"""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(path)
+    out = ""
+    for page in reader.pages:
+        text = page.extract_text()
+        if text:
+            out += text + "\n"
+    return out
+
+
+def resolve_cache_dir(preferred) -> Optional[Path]:
+    """First writable directory out of `preferred` and the system temp dir"""
+    for candidate in (preferred, Path(tempfile.gettempdir()) / "ecameo-cache"):
+        if candidate is None:
+            continue
+        try:
+            path = Path(candidate)
+            path.mkdir(parents=True, exist_ok=True)
+            if os.access(path, os.W_OK):
+                return path
+        except OSError:
+            continue
+    return None
+
+
+def cache_key(linkedin_path, resume_path, summary_path, name: str,
+              build_prompt: Callable[..., str], prompt_deps: Tuple[Callable, ...] = ()) -> str:
+    """Content hash of every input, including the prompt template's bytecode and constants.
+
+    `prompt_deps` lists helpers `build_prompt` calls, so edits to them invalidate the cache too.
+    """
+    h = hashlib.sha256()
+    for path in (linkedin_path, resume_path, summary_path):
+        h.update(file_digest(path).encode())
+    h.update(name.encode())
+    for fn in (build_prompt, *prompt_deps):
+        h.update(marshal.dumps(fn.__code__))
+    return h.hexdigest()
+
+
+def load_profile(linkedin_path, resume_path, summary_path, name: str,
+                 build_prompt: Callable[..., str], prompt_deps: Tuple[Callable, ...] = (),
+                 cache_dir=None, use_cache: bool = True) -> Tuple[Dict[str, str], bool]:
+    """Return ({summary, resume, linkedin, system_prompt}, cache_hit).
+
+    On a hit the PDFs are never opened; on a miss they are parsed and the result is
+    written back atomically so the next worker boot / cold start can reuse it.
+    """
+    key = cache_key(linkedin_path, resume_path, summary_path, name, build_prompt, prompt_deps)
+    cache_path = None
+    if use_cache:
+        directory = resolve_cache_dir(cache_dir)
+        if directory is not None:
+            cache_path = directory / CACHE_FILENAME
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                if cached.get("key") == key:
+                    return cached["profile"], True
+            except (OSError, ValueError, KeyError):
+                pass
+
+    with open(summary_path, "r") as f:
+        summary = f.read()
+    resume = extract_pdf_text(resume_path)
+    linkedin = extract_pdf_text(linkedin_path)
+    profile = {
+        "summary": summary,
+        "resume": resume,
+        "linkedin": linkedin,
+        "system_prompt": build_prompt(name, summary, resume, linkedin),
+    }
+
+    if cache_path is not None:
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "created": time.time(), "profile": profile}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"[BOOT] Could not write profile cache: {e}")
+    return profile, False
@@ -0,0 +1,89 @@
+import re
+from typing import Dict, List
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+#.][a-z0-9]+)*")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by do does for from has have how i in is it its me my of on or "
+    "that the their this to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def chunk_document(source: str, text: str, max_words: int = 80, overlap: int = 20) -> List[Dict]:
+    """Split on blank lines, then window long paragraphs into overlapping word spans"""
+    chunks = []
+    step = max(1, max_words - overlap)
+    for paragraph in _PARAGRAPH_RE.split(text):
+        words = paragraph.split()
+        start = 0
+        while start < len(words):
+            chunks.append({"source": source, "text": " ".join(words[start:start + max_words])})
+            if start + max_words >= len(words):
+                break
+            start += step
+    return chunks
+
+
+# =============================
+# BM25 INDEX
+# =============================
+class BM25Index:
+    """Okapi BM25 over profile chunks, fully precomputed at build time.
+
+    The per-term BM25 weight of every (chunk, term) pair lives in a column-major
+    matrix, so scoring a query is a gather of its term columns plus one row sum.
+    """
+
+    def __init__(self, chunks: List[Dict], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        docs = [tokenize(c["text"]) for c in chunks]
+        self.vocab: Dict[str, int] = {}
+        for doc in docs:
+            for term in doc:
+                self.vocab.setdefault(term, len(self.vocab))
+
+        tf = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for term in doc:
+                tf[row, self.vocab[term]] += 1
+
+        doc_len = tf.sum(axis=1, keepdims=True)
+        avg_len = float(doc_len.mean()) if len(docs) else 0.0
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * doc_len / max(avg_len, 1e-9))
+        self.weights = np.asfortranarray(idf * tf * (k1 + 1) / (tf + norm))
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def scores(self, query: str) -> np.ndarray:
+        ids = [self.vocab[t] for t in set(tokenize(query)) if t in self.vocab]
+        if not ids:
+            return np.zeros(len(self.chunks), dtype=np.float32)
+        return self.weights[:, ids].sum(axis=1)
+
+    def top_k(self, query: str, k: int) -> List[Dict]:
+        """Best k chunks in document order (ties keep the earlier, usually summary, chunks)"""
+        if k >= len(self.chunks):
+            return list(self.chunks)
+        best = np.argsort(-self.scores(query), kind="stable")[:k]
+        return [self.chunks[i] for i in sorted(best)]
+
+
+def build_index(documents: Dict[str, str], max_words: int = 80, overlap: int = 20) -> BM25Index:
+    chunks = []
+    for source, text in documents.items():
+        chunks.extend(chunk_document(source, text, max_words, overlap))
+    return BM25Index(chunks)
+
+
+def format_context(chunks: List[Dict]) -> str:
+    return "\n\n".join(f"[{c['source']}] {c['text']}" for c in chunks)
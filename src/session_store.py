@@ -0,0 +1,232 @@
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+SESSION_COOKIE = "ecameo_sid"
+SESSION_HEADER = "X-Session-Id"
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def resolve_session_id(cookie_value: Optional[str], header_value: Optional[str]):
+    """Return (session_id, is_new). Header wins over cookie; invalid ids are replaced."""
+    for candidate in (header_value, cookie_value):
+        if candidate and _SESSION_ID_RE.match(candidate):
+            return candidate, False
+    return uuid.uuid4().hex, True
+
+
+# =============================
+# TOKEN COUNTING
+# =============================
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators per chat message
+
+
+def _load_encoding():
+    """tiktoken's o200k_base (gpt-4o family), loaded once at import.
+
+    The first load may download the vocabulary (set TIKTOKEN_CACHE_DIR to keep it),
+    so it must never happen lazily on a request path or under a session lock.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        print("[SESSION] tiktoken not installed; estimating ~4 characters per token")
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"[SESSION] Could not load tiktoken o200k_base ({e}); estimating ~4 characters per token")
+        return None
+
+
+_encoding = _load_encoding()
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in `text` with o200k_base, or ~4 characters per token if it didn't load"""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _clip(text: str, max_chars: int) -> str:
+    """First sentence of `text`, cut to `max_chars` at a word boundary"""
+    text = " ".join(text.split())
+    match = re.search(r"[.!?](?:\s|$)", text)
+    if match:
+        text = text[:match.end()].strip()
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0] + "..."
+    return text
+
+
+# =============================
+# SESSION MEMORY
+# =============================
+class SessionMemory:
+    """One visitor's history, bounded in tokens rather than turns.
+
+    Recent messages are kept verbatim while they fit in `max_tokens` (and, if
+    given, `max_messages`); older turns are folded, oldest first, into a compact
+    extractive summary: one "Q -> A" line per turn, the answer cut to its first
+    sentence. The summary is updated incrementally as turns fold and drops its
+    oldest lines past `max_summary_tokens`, so the prompt never grows beyond
+    both budgets. The latest turn always stays verbatim.
+    """
+
+    def __init__(self, max_messages: Optional[int] = None, max_tokens: int = 1200,
+                 max_summary_tokens: int = 200):
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self.messages = deque()  # {"role", "content", "tokens"}
+        self.tokens = 0
+        self.summary_lines = deque()  # (line, tokens)
+        self.summary_tokens = 0
+        self.chars = 0
+        self.last_seen = time.monotonic()
+
+    def add(self, role, content):
+        tokens = count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        self.messages.append({"role": role, "content": content, "tokens": tokens})
+        self.tokens += tokens
+        self.chars += len(content)
+        while len(self.messages) > 2 and (
+            self.tokens > self.max_tokens
+            or (self.max_messages is not None and len(self.messages) > self.max_messages)
+        ):
+            self._fold_oldest()
+
+    def get(self):
+        history = [{"role": m["role"], "content": m["content"]} for m in self.messages]
+        if self.summary_lines:
+            history.insert(0, {"role": "system", "content": self.summary_message()})
+        return history
+
+    def summary_message(self) -> str:
+        return "Earlier in this conversation:\n" + "\n".join(line for line, _ in self.summary_lines)
+
+    def summary(self):
+        """Summary of folded turns followed by the verbatim ones as Q/A pairs"""
+        out = [line for line, _ in self.summary_lines]
+        question = None
+        for message in self.messages:
+            if message["role"] == "user":
+                if question is not None:
+                    out.append(f"Q: {question}\nA:")
+                question = message["content"]
+            else:
+                out.append(f"Q: {question or ''}\nA: {message['content']}")
+                question = None
+        if question is not None:
+            out.append(f"Q: {question}\nA:")
+        return "\n".join(out)
+
+    def _pop(self):
+        message = self.messages.popleft()
+        self.tokens -= message["tokens"]
+        self.chars -= len(message["content"])
+        return message
+
+    def _fold_oldest(self):
+        first = self._pop()
+        if first["role"] == "user" and self.messages and self.messages[0]["role"] == "assistant":
+            line = f"- Q: {_clip(first['content'], 120)} -> A: {_clip(self._pop()['content'], 160)}"
+        elif first["role"] == "user":
+            line = f"- Q: {_clip(first['content'], 120)}"
+        else:
+            line = f"- A: {_clip(first['content'], 160)}"
+        tokens = count_tokens(line) + 1
+        self.summary_lines.append((line, tokens))
+        self.summary_tokens += tokens
+        self.chars += len(line)
+        while len(self.summary_lines) > 1 and self.summary_tokens > self.max_summary_tokens:
+            old, old_tokens = self.summary_lines.popleft()
+            self.summary_tokens -= old_tokens
+            self.chars -= len(old)
+
+
+# =============================
+# SESSION STORE
+# =============================
+class SessionStore:
+    """Thread-safe map of session id -> SessionMemory with idle-TTL, LRU and size caps.
+
+    Entries are kept in recency order, so expired and least-recently-used sessions
+    are always at the front and eviction never scans the whole map.
+    """
+
+    def __init__(self, max_messages: Optional[int] = None, ttl_seconds: float = 1800,
+                 max_sessions: int = 5000, max_total_chars: int = 20_000_000,
+                 max_history_tokens: int = 1200, max_summary_tokens: int = 200):
+        self.max_messages = max_messages
+        self.max_history_tokens = max_history_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_total_chars = max_total_chars
+        self._sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._total_chars = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @property
+    def total_chars(self) -> int:
+        return self._total_chars
+
+    def history(self, session_id: str) -> List[Dict]:
+        """Snapshot of the session's messages (empty for unknown or expired ids)"""
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                return []
+            memory.last_seen = now
+            self._sessions.move_to_end(session_id)
+            return memory.get()
+
+    def add_turn(self, session_id: str, user_content: str, assistant_content: str):
+        """Append a question/answer pair atomically"""
+        with self._lock:
+            now = time.monotonic()
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                memory = SessionMemory(self.max_messages, self.max_history_tokens, self.max_summary_tokens)
+                self._sessions[session_id] = memory
+            else:
+                self._sessions.move_to_end(session_id)
+            before = memory.chars
+            memory.add("user", user_content)
+            memory.add("assistant", assistant_content)
+            memory.last_seen = now
+            self._total_chars += memory.chars - before
+            self._evict_expired(now)
+            self._evict_over_capacity()
+
+    def clear(self, session_id: str):
+        with self._lock:
+            memory = self._sessions.pop(session_id, None)
+            if memory is not None:
+                self._total_chars -= memory.chars
+
+    def _evict_expired(self, now: float):
+        while self._sessions:
+            memory = next(iter(self._sessions.values()))
+            if now - memory.last_seen < self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self._total_chars -= memory.chars
+
+    def _evict_over_capacity(self):
+        # The session just written to is at the back, so it is never the one dropped
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._total_chars > self.max_total_chars
+        ):
+            _, memory = self._sessions.popitem(last=False)
+            self._total_chars -= memory.chars
@@ -0,0 +1,174 @@
+"""Single-flight: identical requests in flight at the same time share one upstream call.
+
+The first request for a key starts the work (`produce(flight)`) on a background
+thread, or task in the async app, which publishes items into a `Flight`. Every
+request for that key follows the flight, the first one included. A follower gets
+everything published so far, then the live tail, so joining late loses nothing.
+A flight leaves the registry as soon as its producer returns, so later requests
+start fresh (the answer cache serves repeats from then on). Coalescing is per
+process.
+"""
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class Flight:
+    """Append-only log of one producer's items, followed by any number of readers"""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.subscribers = 1
+        self._cond = threading.Condition()
+
+    def publish(self, item: Any):
+        with self._cond:
+            self.items.append(item)
+            self._cond.notify_all()
+
+    def finish(self, result: Any = None, error: Optional[BaseException] = None):
+        with self._cond:
+            self.result = result
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    def follow(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Every item from the first, then live ones; re-raises the producer's error at the end"""
+        index = 0
+        while True:
+            with self._cond:
+                if not self._cond.wait_for(lambda: len(self.items) > index or self.done, timeout=timeout):
+                    raise TimeoutError(f"no output for {timeout:.0f}s")
+                batch = self.items[index:]
+                done = self.done
+            index += len(batch)
+            yield from batch
+            if done:
+                break
+        if self.error is not None:
+            raise self.error
+
+
+class AsyncFlight(Flight):
+    """Flight whose producer and readers all run on one event loop"""
+
+    def __init__(self):
+        super().__init__()
+        self._changed = asyncio.Event()
+
+    def publish(self, item: Any):
+        self.items.append(item)
+        self._wake()
+
+    def finish(self, result: Any = None, error: Optional[BaseException] = None):
+        self.result = result
+        self.error = error
+        self.done = True
+        self._wake()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def afollow(self, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            changed = self._changed
+            if len(self.items) == index and not self.done:
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"no output for {timeout:.0f}s")
+                continue
+            batch = self.items[index:]
+            done = self.done
+            index += len(batch)
+            for item in batch:
+                yield item
+            if done:
+                break
+        if self.error is not None:
+            raise self.error
+
+
+class SingleFlight:
+    """Registry of in-flight work by key.
+
+    `join(key, produce)` returns `(flight, leader)`: the running flight for `key`, or a
+    new one with `produce(flight)` started on a daemon thread. `produce` publishes
+    items and returns the final result. A `None` key is never shared.
+    """
+
+    flight_class = Flight
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+
+    def join(self, key: Optional[str], produce: Callable[[Flight], Any]) -> Tuple[Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key) if key is not None else None
+            if flight is not None:
+                flight.subscribers += 1
+                self.joined += 1
+                return flight, False
+            flight = self.flight_class()
+            if key is not None:
+                self._flights[key] = flight
+            self.started += 1
+        self._start(key, flight, produce)
+        return flight, True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._flights), "started": self.started, "joined": self.joined}
+
+    def _start(self, key, flight, produce):
+        threading.Thread(target=self._run, args=(key, flight, produce), name="single-flight", daemon=True).start()
+
+    def _run(self, key, flight, produce):
+        try:
+            result = produce(flight)
+        except Exception as e:
+            self._release(key, flight)
+            flight.finish(error=e)
+            return
+        self._release(key, flight)
+        flight.finish(result)
+
+    def _release(self, key, flight):
+        # Nobody can join once the producer is done; late arrivals start a new flight
+        with self._lock:
+            if key is not None and self._flights.get(key) is flight:
+                del self._flights[key]
+
+
+class AsyncSingleFlight(SingleFlight):
+    """SingleFlight for coroutines: `produce(flight)` is awaited as a task on the running loop"""
+
+    flight_class = AsyncFlight
+
+    def __init__(self):
+        super().__init__()
+        self._tasks = set()  # the loop only keeps weak references to tasks
+
+    def _start(self, key, flight, produce):
+        task = asyncio.get_running_loop().create_task(self._arun(key, flight, produce))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _arun(self, key, flight, produce):
+        try:
+            result = await produce(flight)
+        except Exception as e:
+            self._release(key, flight)
+            flight.finish(error=e)
+            return
+        self._release(key, flight)
+        flight.finish(result)
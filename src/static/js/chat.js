@@ -139,7 +139,7 @@ async function playNextAudio() {
     if (isPlaying || audioQueue.length === 0) return;
     
     isPlaying = true;
-    const {audio, text} = audioQueue.shift();
+    const {audio, text, mime} = audioQueue.shift();
     
     console.log('[AUDIO] Playing:', {
         textLength: text.length,
@@ -158,16 +158,19 @@ async function playNextAudio() {
     }
     
     showTalkingAvatar();
-    showSubtitles(text);
+    // Partial chunks of a streamed sentence carry no text; keep the current subtitle
+    if (text) {
+        showSubtitles(text);
+    }
     
     // CRITICAL: Set up event handlers BEFORE changing src
     audioPlayer.onended = () => {
         console.log('[AUDIO] Playback ended');
         isPlaying = false;
-        hideSubtitles();
         if (audioQueue.length > 0) {
             playNextAudio();
         } else {
+            hideSubtitles();
             showStaticAvatar();
             setStatus('Ready to chat', true);
         }
@@ -191,8 +194,8 @@ async function playNextAudio() {
         }
     };
     
-    // Set the audio source with proper MIME type
-    audioPlayer.src = `data:audio/mpeg;base64,${audio}`;
+    // Set the audio source with proper MIME type (SSE frames carry base64 audio)
+    audioPlayer.src = `data:${mime};base64,${audio}`;
     
     // Force load
     audioPlayer.load();
@@ -327,7 +330,8 @@ async function sendMessage(message) {
                                 if (data.audio && data.audio.length > 0) {
                                     audioQueue.push({
                                         audio: data.audio, 
-                                        text: data.text || ''
+                                        text: data.text || '',
+                                        mime: data.mime || 'audio/mpeg'
                                     });
                                     // Don't wait - just trigger if not playing
                                     if (!isPlaying) {